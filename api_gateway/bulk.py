@@ -0,0 +1,264 @@
+# api_gateway/bulk.py
+# Streaming bulk export and import (GET /export, POST /import) of tasks and users, as NDJSON or CSV.
+# - Export reads the backends a page at a time (TaskService StreamTasks, UserService
+#   list_users_page) and writes each page as one chunk, so memory stays at about one page however
+#   many records there are. Pages are only fetched as fast as the client reads the response.
+# - Import parses the upload as it arrives and applies it in batches (TaskService ImportTasks
+#   stream, UserService import_users). The next chunk of the body is only read once the records
+#   before it have been handed to the backends, so a slow backend slows the upload down
+#   (backpressure) instead of filling the gateway's memory.
+# Records keep their IDs both ways, so an export imported into empty services restores them,
+# task 'created_by' references included. An imported ID that already exists replaces that record
+# (upsert), and the response counts the records updated that way. NDJSON lines carry a "type" ("task" or "user");
+# a CSV file holds a single resource, with a header row.
+import csv
+import io
+import json
+import os
+
+from fastapi import HTTPException, Request
+
+NDJSON = "ndjson"
+CSV = "csv"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv; charset=utf-8"}
+
+TASKS = "tasks"
+USERS = "users"
+RESOURCES = (USERS, TASKS) # Users first, so tasks' created_by references exist when imported in order
+RECORD_TYPES = {TASKS: "task", USERS: "user"}
+RESOURCE_OF_TYPE = {record_type: resource for resource, record_type in RECORD_TYPES.items()}
+COLUMNS = {
+    TASKS: ("id", "title", "description", "status", "created_by"),
+    USERS: ("user_id", "name", "email"),
+}
+
+EXPORT_PAGE_SIZE = int(os.environ.get("GATEWAY_EXPORT_PAGE_SIZE", "1000"))
+IMPORT_BATCH_SIZE = int(os.environ.get("GATEWAY_IMPORT_BATCH_SIZE", "1000"))
+# A longer line (or CSV record) is rejected rather than buffered without limit.
+MAX_RECORD_BYTES = int(os.environ.get("GATEWAY_IMPORT_MAX_RECORD_BYTES", str(1 << 20)))
+# Highest ID the backends accept on import: the next ID they assign (ID + 1) must fit an int32.
+MAX_RECORD_ID = 2**31 - 2
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False)
+
+
+def requested_format(request: Request) -> str:
+    """?format= (ndjson or csv). Without it: ndjson, or csv for an upload sent as text/csv."""
+    fmt = request.query_params.get("format")
+    if fmt is None:
+        return CSV if request.headers.get("content-type", "").startswith("text/csv") else NDJSON
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid 'format' parameter: {fmt!r}. Allowed: {', '.join(MEDIA_TYPES)}.")
+    return fmt
+
+
+def requested_resources(request: Request, fmt: str) -> tuple:
+    """Resources listed in ?resource= (default: both for NDJSON). CSV takes exactly one."""
+    raw = request.query_params.get("resource")
+    if raw is None:
+        if fmt == CSV:
+            raise HTTPException(status_code=400, detail="CSV holds a single resource: add ?resource=tasks or ?resource=users.")
+        return RESOURCES
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    if not names or names - set(RESOURCES):
+        raise HTTPException(status_code=400, detail=f"Invalid 'resource' parameter: {raw!r}. Allowed: {', '.join(RESOURCES)}.")
+    if fmt == CSV and len(names) > 1:
+        raise HTTPException(status_code=400, detail="CSV holds a single resource: use ?resource=tasks or ?resource=users.")
+    return tuple(resource for resource in RESOURCES if resource in names)
+
+
+# --- Export ---
+
+def encode_page(resource: str, records: list, fmt: str) -> bytes:
+    """One chunk of the export: a page of record dicts as NDJSON lines or CSV rows."""
+    if fmt == NDJSON:
+        record_type = RECORD_TYPES[resource]
+        encode = _json_encoder.encode
+        return "".join([encode({"type": record_type, **record}) + "\n" for record in records]).encode()
+    columns = COLUMNS[resource]
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([[record[column] for column in columns] for record in records])
+    return buffer.getvalue().encode()
+
+
+def csv_header(resource: str) -> bytes:
+    return (",".join(COLUMNS[resource]) + "\n").encode()
+
+
+async def export_chunks(resources: tuple, fmt: str, read_pages: dict, counts: dict):
+    """Body chunks for the export. read_pages[resource]() is an async iterator of record-dict
+    pages; counts[resource] is updated as records are written."""
+    for resource in resources:
+        counts[resource] = 0
+        # The CSV header goes out with the first page, so the first chunk always comes from a backend read
+        pending = csv_header(resource) if fmt == CSV else b""
+        async for page in read_pages[resource]():
+            if page:
+                counts[resource] += len(page)
+                yield pending + encode_page(resource, page, fmt)
+                pending = b""
+        if pending:
+            yield pending
+
+
+# --- Import ---
+
+async def body_lines(chunks):
+    """Lists of complete lines (bytes, without the newline) from an async iterator of body chunks."""
+    pending = b""
+    line_number = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > MAX_RECORD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Line {line_number + len(lines) + 1} is longer than {MAX_RECORD_BYTES} bytes.")
+        if lines:
+            yield line_number, lines
+            line_number += len(lines)
+    if pending.strip():
+        yield line_number, [pending]
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _record_id(value, line_number: int):
+    if value is None or value == "":
+        return None
+    try:
+        record_id = int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: invalid ID {value!r}.")
+    if record_id < 0 or record_id > MAX_RECORD_ID:
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: ID {value!r} is outside 1..{MAX_RECORD_ID}.")
+    return record_id
+
+
+def task_record(fields: dict, line_number: int) -> dict:
+    title = _text(fields.get("title"))
+    if not title:
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: a task needs a title.")
+    return {
+        "id": _record_id(fields.get("id"), line_number) or 0, # 0: the TaskService assigns one
+        "title": title,
+        "description": _text(fields.get("description")),
+        "status": _text(fields.get("status")),
+        "created_by": _text(fields.get("created_by")),
+    }
+
+
+def user_record(fields: dict, line_number: int) -> dict:
+    name, email = _text(fields.get("name")), _text(fields.get("email"))
+    if not name or not email:
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: a user needs a name and an email.")
+    return {"user_id": _record_id(fields.get("user_id"), line_number), "name": name, "email": email}
+
+
+RECORD_PARSERS = {TASKS: task_record, USERS: user_record}
+
+
+def _decode(line: bytes, line_number: int) -> str:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: not valid UTF-8.")
+
+
+async def ndjson_records(chunks, resources: tuple):
+    """(resource, record) pairs from an NDJSON upload. Lines name their resource with "type";
+    it may be left out when a single resource was requested."""
+    default = resources[0] if len(resources) == 1 else None
+    async for first_line, lines in body_lines(chunks):
+        for offset, line in enumerate(lines):
+            if not line.strip():
+                continue
+            line_number = first_line + offset + 1
+            try:
+                fields = json.loads(line)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Line {line_number}: invalid JSON ({e}).")
+            if not isinstance(fields, dict):
+                raise HTTPException(status_code=400, detail=f"Line {line_number}: expected a JSON object.")
+            resource = RESOURCE_OF_TYPE.get(fields.get("type")) if "type" in fields else default
+            if resource not in resources:
+                raise HTTPException(status_code=400, detail=f"Line {line_number}: unexpected record type {fields.get('type')!r}.")
+            yield resource, RECORD_PARSERS[resource](fields, line_number)
+
+
+async def csv_records(chunks, resource: str):
+    """(resource, record) pairs from a CSV upload with a header row. A quoted field may span
+    lines, so physical lines are joined until their quotes balance."""
+    parse = RECORD_PARSERS[resource]
+    header = None
+    partial, partial_start = None, 0
+    async for first_line, lines in body_lines(chunks):
+        rows, row_lines = [], []
+        for offset, line in enumerate(lines):
+            line_number = first_line + offset + 1
+            text = _decode(line, line_number).rstrip("\r")
+            if partial is not None:
+                text, line_number = partial + "\n" + text, partial_start
+                partial = None
+            if text.count('"') % 2:
+                if len(text) > MAX_RECORD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Line {line_number}: record is longer than {MAX_RECORD_BYTES} bytes.")
+                partial, partial_start = text, line_number
+                continue
+            if text.strip():
+                rows.append(text)
+                row_lines.append(line_number)
+        for line_number, row in zip(row_lines, csv.reader(rows)):
+            if header is None:
+                header = [column.strip() for column in row]
+                unknown = [column for column in header if column not in COLUMNS[resource]]
+                if unknown:
+                    raise HTTPException(status_code=400, detail=f"Line {line_number}: unknown {resource} columns {unknown}. "
+                                                                f"Expected: {', '.join(COLUMNS[resource])}.")
+                continue
+            if len(row) != len(header):
+                raise HTTPException(status_code=400, detail=f"Line {line_number}: expected {len(header)} fields, got {len(row)}.")
+            yield resource, parse(dict(zip(header, row)), line_number)
+    if partial is not None:
+        raise HTTPException(status_code=400, detail=f"Line {partial_start}: unterminated quoted field.")
+
+
+def upload_records(chunks, fmt: str, resources: tuple):
+    return ndjson_records(chunks, resources) if fmt == NDJSON else csv_records(chunks, resources[0])
+
+
+class BatchImporter:
+    """Groups records per resource and hands each full batch to apply[resource] (an async
+    callable), waiting for it before taking more records. An applier that returns the batch's
+    counts ({"updated": ...}) has its updated records added up in 'updated'."""
+
+    def __init__(self, apply: dict, batch_size: int = IMPORT_BATCH_SIZE):
+        self.apply = apply
+        self.batch_size = batch_size
+        self.batches = {resource: [] for resource in apply}
+        self.imported = {resource: 0 for resource in apply}
+        self.updated = {resource: 0 for resource in apply}
+
+    async def add(self, resource: str, record: dict):
+        batch = self.batches[resource]
+        batch.append(record)
+        if len(batch) >= self.batch_size:
+            await self._apply(resource)
+
+    def progress(self) -> str:
+        """'<count> <resource>, ...' applied so far, for errors that stop an import halfway."""
+        return ", ".join(f"{count} {resource}" for resource, count in self.imported.items())
+
+    async def flush(self):
+        for resource in self.batches:
+            if self.batches[resource]:
+                await self._apply(resource)
+
+    async def _apply(self, resource: str):
+        batch, self.batches[resource] = self.batches[resource], []
+        counts = await self.apply[resource](batch)
+        self.imported[resource] += len(batch)
+        if counts:
+            self.updated[resource] += counts["updated"]
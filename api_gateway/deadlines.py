@@ -0,0 +1,164 @@
+# api_gateway/deadlines.py
+# Per-request deadline budgets, propagated to the backends.
+# - The budget comes from the 'X-Request-Timeout' header (seconds) or a per-route default,
+#   capped at MAX_DEADLINE_SECONDS or the route default, whichever is larger.
+# - Backend calls use what is *left* of it as their gRPC deadline / SOAP HTTP timeout.
+# - DeadlineMiddleware cancels the handler (and with it the in-flight backend calls) when the
+#   client disconnects, and answers 504 if the budget runs out before a response was started.
+import asyncio
+import contextvars
+import logging
+import os
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+REQUEST_TIMEOUT_HEADER = "x-request-timeout"
+DEFAULT_DEADLINE_SECONDS = float(os.environ.get("GATEWAY_DEFAULT_DEADLINE_S", "5"))
+MAX_DEADLINE_SECONDS = float(os.environ.get("GATEWAY_MAX_DEADLINE_S", "30"))
+# Bulk export/import (bulk.py) streams millions of records; their budget covers the whole transfer.
+BULK_DEADLINE_SECONDS = float(os.environ.get("GATEWAY_BULK_DEADLINE_S", "3600"))
+# Extra time the middleware gives a handler past its deadline to turn a backend timeout into
+# its own error response before the middleware answers 504 itself.
+DEADLINE_GRACE_SECONDS = 0.05
+
+# (method, path prefix) -> default budget in seconds; the longest matching prefix wins.
+ROUTE_DEADLINES = {
+    ("GET", "/tasks/"): 2.0,
+    ("GET", "/users/"): 2.0,
+    ("GET", "/tasks"): DEFAULT_DEADLINE_SECONDS,
+    ("GET", "/users"): DEFAULT_DEADLINE_SECONDS,
+    ("POST", "/admin/profile"): 65.0, # Profiling sessions last up to 60s (profiling.MAX_SECONDS)
+    ("GET", "/export"): BULK_DEADLINE_SECONDS,
+    ("POST", "/import"): BULK_DEADLINE_SECONDS,
+}
+# Request body messages the middleware reads ahead of the handler. Bounded, so a streamed
+# upload (POST /import) is only read from the socket as fast as the handler consumes it.
+INBOX_MAX_MESSAGES = 4
+
+
+class Deadline:
+    def __init__(self, budget: float, client_supplied: bool = False):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.client_supplied = client_supplied # The client chose a budget below the route default
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def route_deadline(method: str, path: str) -> float:
+    best, best_length = DEFAULT_DEADLINE_SECONDS, -1
+    for (route_method, prefix), budget in ROUTE_DEADLINES.items():
+        if route_method == method and path.startswith(prefix) and len(prefix) > best_length:
+            best, best_length = budget, len(prefix)
+    return best
+
+
+def deadline_for_scope(scope) -> Deadline:
+    default = route_deadline(scope["method"], scope["path"])
+    for name, value in scope.get("headers", []):
+        if name.decode("latin-1").lower() == REQUEST_TIMEOUT_HEADER:
+            try:
+                requested = float(value)
+            except ValueError:
+                break
+            if requested > 0:
+                # Long routes (bulk export/import) keep their own, larger cap.
+                budget = min(requested, max(MAX_DEADLINE_SECONDS, default))
+                return Deadline(budget, client_supplied=budget < default)
+            break
+    return Deadline(default)
+
+
+_current_deadline = contextvars.ContextVar("gateway_deadline", default=None)
+
+
+def current_deadline() -> Deadline:
+    """Deadline of the request being handled (a default budget outside of a request)."""
+    deadline = _current_deadline.get()
+    return deadline if deadline is not None else Deadline(DEFAULT_DEADLINE_SECONDS)
+
+
+def backend_timeout() -> float:
+    """Seconds left for a backend call; 504 right away if the budget is already spent."""
+    remaining = current_deadline().remaining()
+    if remaining <= 0:
+        raise HTTPException(status_code=504, detail="Gateway Timeout: request deadline exceeded.")
+    return remaining
+
+
+def deadline_exceeded_by_client() -> bool:
+    """Whether the current request runs on a budget the client shortened. Timeouts on such
+    requests say nothing about backend health and must not trip circuit breakers."""
+    return current_deadline().client_supplied
+
+
+class DeadlineMiddleware:
+    """Pure ASGI middleware: sets the request deadline and watches for client disconnects."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = deadline_for_scope(scope)
+        token = _current_deadline.set(deadline)
+        # The middleware owns 'receive' so it can notice 'http.disconnect' while the handler is
+        # busy awaiting a backend; messages are relayed to the handler through a queue.
+        inbox = asyncio.Queue(maxsize=INBOX_MAX_MESSAGES)
+        response_started = False
+        response_complete = False
+
+        async def app_receive():
+            return await inbox.get()
+
+        async def app_send(message):
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        async def relay():
+            while True:
+                message = await receive()
+                await inbox.put(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        handler = asyncio.create_task(self.app(scope, app_receive, app_send))
+        reader = asyncio.create_task(relay())
+        try:
+            done, _ = await asyncio.wait(
+                {handler, reader},
+                timeout=max(0.0, deadline.remaining()) + DEADLINE_GRACE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if handler in done:
+                handler.result()
+            elif reader in done and not response_complete:
+                logging.info(f"Gateway: client disconnected from {scope['method']} {scope['path']}, cancelling backend calls.")
+                handler.cancel()
+                await asyncio.gather(handler, return_exceptions=True)
+            elif not response_started:
+                logging.warning(f"Gateway: {scope['method']} {scope['path']} exceeded its {deadline.budget:.3f}s deadline.")
+                handler.cancel()
+                await asyncio.gather(handler, return_exceptions=True)
+                response = JSONResponse(status_code=504, content={"detail": "Gateway Timeout: request deadline exceeded."})
+                await response(scope, receive, send)
+            else:
+                await handler # Already streaming: let it finish
+        finally:
+            reader.cancel()
+            if not handler.done():
+                handler.cancel()
+            _current_deadline.reset(token)
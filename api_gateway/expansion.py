@@ -0,0 +1,98 @@
+# api_gateway/expansion.py
+# Inline expansion of related resources (GET /tasks?expand=created_by).
+# The distinct keys of a response are resolved together with batch lookups (one backend call
+# per EXPAND_BATCH_SIZE keys, at most EXPAND_CONCURRENCY batches in flight), with a per-request
+# memo so each key is fetched at most once per response however many items reference it.
+# Expansion is best effort: a batch that fails (backend shed, timed out or down) leaves its keys
+# unresolved instead of failing the response.
+import asyncio
+import logging
+import os
+
+from fastapi import HTTPException, Request
+
+EXPAND_BATCH_SIZE = int(os.environ.get("GATEWAY_EXPAND_BATCH_SIZE", "500"))
+EXPAND_CONCURRENCY = int(os.environ.get("GATEWAY_EXPAND_CONCURRENCY", "8"))
+
+TASK_EXPANSIONS = ("created_by",)
+
+
+def requested_expansions(request: Request, allowed: tuple) -> tuple:
+    """Relations listed in ?expand=, or () when the parameter is absent."""
+    raw = request.query_params.get("expand")
+    if raw is None:
+        return ()
+    expansions = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in expansions if name not in allowed]
+    if not expansions or unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Invalid 'expand' parameter: {raw!r}. Allowed: {', '.join(allowed)}.")
+    return expansions
+
+
+def user_reference(created_by: str):
+    """User ID referenced by a task's created_by, or None if it is not a user ID (free text)."""
+    created_by = created_by.strip()
+    return int(created_by) if created_by.isdigit() else None
+
+
+class RequestMemo:
+    """Results of lookups made while serving one request, keyed by (namespace, key).
+    Every key maps to the future of the batch lookup that fetches it, so later lookups of the
+    same key share that call."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get_many(self, namespace: str, keys: list, fetch_many) -> dict:
+        """{key: future of a {key: result} dict}; the keys not seen yet are fetched with one
+        fetch_many(keys) call."""
+        missing = [key for key in keys if (namespace, key) not in self._entries]
+        if missing:
+            batch = asyncio.ensure_future(fetch_many(missing))
+            for key in missing:
+                self._entries[(namespace, key)] = batch
+        return {key: self._entries[(namespace, key)] for key in keys}
+
+
+def request_memo(request: Request) -> RequestMemo:
+    memo = getattr(request.state, "memo", None)
+    if memo is None:
+        memo = request.state.memo = RequestMemo()
+    return memo
+
+
+async def resolve_all(memo: RequestMemo, namespace: str, keys, fetch_many, batch_size: int = EXPAND_BATCH_SIZE,
+                      concurrency: int = EXPAND_CONCURRENCY) -> tuple:
+    """Fetches every distinct key (through the memo) with fetch_many(keys) -> {key: result},
+    in batches of 'batch_size', at most 'concurrency' batches at a time.
+    Returns ({key: result or None}, number of keys whose batch failed)."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(batch_keys):
+        async with semaphore:
+            return await fetch_many(batch_keys)
+
+    distinct = list(dict.fromkeys(keys))
+    futures = {}
+    for start in range(0, len(distinct), batch_size):
+        futures.update(memo.get_many(namespace, distinct[start:start + batch_size], limited))
+    batches = list(dict.fromkeys(futures.values()))
+    if batches:
+        try:
+            await asyncio.wait(batches)
+        except asyncio.CancelledError:
+            for batch in batches:
+                batch.cancel()
+            raise
+    errors = [batch.exception() for batch in batches if not batch.cancelled() and batch.exception() is not None]
+    if errors:
+        logging.warning(f"Gateway: {namespace} lookups failed ({errors[0]!r}), leaving their keys unresolved.")
+    results, failed = {}, 0
+    for key, batch in futures.items():
+        if batch.cancelled() or batch.exception() is not None:
+            results[key] = None
+            failed += 1
+        else:
+            results[key] = batch.result().get(key)
+    return results, failed
@@ -0,0 +1,126 @@
+# api_gateway/hedging.py
+# Hedged requests for idempotent reads (GetTask, get_user).
+# If the first attempt has not answered after the operation's recent p95 latency, a second
+# identical attempt is sent and whichever answers first wins; the loser is cancelled.
+# Only ~5% of requests are slower than p95, so hedging costs a few percent of extra load while
+# cutting the tail. A token budget caps hedges at HEDGE_RATIO of all hedgeable requests.
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+from deadlines import current_deadline
+
+HEDGING_ENABLED = os.environ.get("GATEWAY_HEDGED_READS", "false").lower() in ("1", "true", "yes")
+HEDGE_RATIO = float(os.environ.get("GATEWAY_HEDGE_RATIO", "0.1"))
+HEDGE_MIN_DELAY_SECONDS = float(os.environ.get("GATEWAY_HEDGE_MIN_DELAY_MS", "2")) / 1000
+HEDGE_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Recent latencies of one operation, for its p95."""
+
+    def __init__(self, size: int = 256, recompute_every: int = 16):
+        self._samples = deque(maxlen=size)
+        self._recompute_every = recompute_every
+        self._since_recompute = 0
+        self._p95 = None
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= self._recompute_every:
+            self._since_recompute = 0
+            self._p95 = None
+
+    def p95(self):
+        if len(self._samples) < HEDGE_MIN_SAMPLES:
+            return None
+        if self._p95 is None:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[int(len(ordered) * 0.95) - 1]
+        return self._p95
+
+
+class HedgePolicy:
+    """Per-operation hedging state: latency tracker, token budget and counters."""
+
+    def __init__(self, name: str, ratio: float = HEDGE_RATIO):
+        self.name = name
+        self.ratio = ratio
+        self.latency = LatencyTracker()
+        self._tokens = 0.0
+        self.counters = {"requests": 0, "hedged": 0, "hedge_won": 0}
+
+    def hedge_delay(self):
+        """Delay before hedging, or None if this request must not be hedged."""
+        if not HEDGING_ENABLED:
+            return None
+        self._tokens = min(10.0, self._tokens + self.ratio)
+        p95 = self.latency.p95()
+        if p95 is None or self._tokens < 1.0:
+            return None
+        delay = max(p95, HEDGE_MIN_DELAY_SECONDS)
+        # A hedge that cannot finish within the request deadline only adds load.
+        if current_deadline().remaining() <= delay * 2:
+            return None
+        return delay
+
+    def snapshot(self) -> dict:
+        p95 = self.latency.p95()
+        return {"enabled": HEDGING_ENABLED, "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+                **self.counters}
+
+
+async def hedged(policy: HedgePolicy, make_attempt):
+    """Runs 'await make_attempt()', hedging it with a second attempt after the policy's delay."""
+    policy.counters["requests"] += 1
+
+    lost_to_hedge = False
+
+    async def timed_primary():
+        # Only primaries feed the p95 (a hedge is sent because its primary was slow, so hedge
+        # latencies would skew it). A primary cancelled because its hedge won is recorded with
+        # its elapsed time, a lower bound, so slow attempts still push the p95 up.
+        started = time.perf_counter()
+        try:
+            result = await make_attempt()
+        except asyncio.CancelledError:
+            if lost_to_hedge:
+                policy.latency.record(time.perf_counter() - started)
+            raise
+        policy.latency.record(time.perf_counter() - started)
+        return result
+
+    primary = asyncio.ensure_future(timed_primary())
+    attempts = [primary]
+    try:
+        delay = policy.hedge_delay()
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        policy._tokens -= 1.0
+        policy.counters["hedged"] += 1
+        logging.info(f"Gateway: {policy.name} slower than {delay * 1000:.1f}ms, sending hedged request.")
+        hedge = asyncio.ensure_future(make_attempt())
+        attempts.append(hedge)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    if attempt is hedge:
+                        policy.counters["hedge_won"] += 1
+                        lost_to_hedge = True
+                    return attempt.result()
+                error = error or attempt.exception()
+        raise error
+    finally:
+        for attempt in attempts:
+            if not attempt.done():
+                attempt.cancel()
@@ -0,0 +1,214 @@
+# api_gateway/http_cache.py
+# Conditional GET (ETag / If-None-Match) and response compression for collection endpoints.
+#
+# The backends expose a cheap store version ("<epoch>.<counter>", bumped on every mutation):
+# - gRPC TaskService: 'x-store-version' initial metadata on ListTasks.
+# - SOAP UserService: 'X-Store-Version' HTTP response header on list_users.
+# When the gateway sends the version it already knows ('x-if-none-match-version'), the backend
+# answers with an empty "not modified" response instead of the whole collection.
+import gzip
+import logging
+import os
+import zlib
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+STORE_VERSION_HEADER = "x-store-version"
+IF_NONE_MATCH_VERSION_HEADER = "x-if-none-match-version"
+NOT_MODIFIED_HEADER = "x-not-modified"
+
+# Bodies smaller than this are sent uncompressed; compression would cost more than it saves.
+COMPRESSION_MIN_BYTES = int(os.environ.get("GATEWAY_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Bounds of the collection cache: at most this many (resource, variant) bodies, and this many
+# bytes of bodies (raw plus compressed) in total; the least recently used go first.
+COLLECTION_CACHE_MAX_ENTRIES = int(os.environ.get("GATEWAY_COLLECTION_CACHE_ENTRIES", "64"))
+COLLECTION_CACHE_MAX_BYTES = int(float(os.environ.get("GATEWAY_COLLECTION_CACHE_MB", "64")) * 1024 * 1024)
+
+_ENCODERS = {"gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    _ENCODERS["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+# Server preference when the client accepts several encodings with the same q-value.
+_PREFERENCE = ["br", "gzip"]
+
+
+def make_etag(resource: str, version: str, variant: str = "") -> str:
+    """Strong ETag for a collection at a given backend store version.
+
+    'variant' distinguishes representations of the same version (e.g. the base URL baked
+    into HATEOAS links, or the negotiated media type); it is hashed so the tag stays short.
+    """
+    variant_hash = f"{zlib.crc32(variant.encode()):08x}"
+    return f'"{resource}-{version}-{variant_hash}"'
+
+
+def parse_etag(etag: str):
+    """Returns (resource, version, variant_hash) from an ETag made by make_etag, or None."""
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    # Drop a content-coding suffix such as '-gzip' added by encoded_etag().
+    for encoding in _ENCODERS:
+        if tag.endswith(f"-{encoding}"):
+            tag = tag[: -len(encoding) - 1]
+            break
+    parts = tag.rsplit("-", 2)
+    if len(parts) != 3:
+        return None
+    return parts[0], parts[1], parts[2]
+
+
+def _matching_etag(request: Request, resource: str, variant: str):
+    """Returns (etag as sent by the client, version) for the first If-None-Match entry that
+    refers to this resource and variant, or (None, None)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None, None
+    expected_hash = f"{zlib.crc32(variant.encode()):08x}"
+    for candidate in header.split(","):
+        parsed = parse_etag(candidate)
+        if parsed and parsed[0] == resource and parsed[2] == expected_hash:
+            return candidate.strip(), parsed[1]
+    return None, None
+
+
+def client_version(request: Request, resource: str, variant: str = ""):
+    """Store version the client already holds for 'resource', taken from If-None-Match."""
+    return _matching_etag(request, resource, variant)[1]
+
+
+def choose_encoding(request: Request):
+    """Picks the best content-coding from Accept-Encoding among those we support, or None."""
+    header = request.headers.get("accept-encoding", "")
+    if not header:
+        return None
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in _PREFERENCE:
+        if encoding not in _ENCODERS:
+            continue
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encoded_etag(etag: str, encoding) -> str:
+    """Strong ETags must differ per content-coding, so append it inside the quotes."""
+    return etag if not encoding else f'{etag[:-1]}-{encoding}"'
+
+
+class CollectionCache:
+    """Last serialized body per (resource, variant), keyed by backend store version.
+
+    Lets the gateway ask the backend "has anything changed since version X?" and reuse the
+    serialized (and compressed) body when it has not, so polling clients cost neither
+    re-serialization nor re-compression. Bounded by entry count and total body bytes (LRU), since
+    the variants (media type, fields, links, link base) are chosen by clients.
+    """
+
+    def __init__(self, max_entries: int = COLLECTION_CACHE_MAX_ENTRIES, max_bytes: int = COLLECTION_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # (resource, variant) -> (version, {encoding: body})
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, resource: str, variant: str = ""):
+        """Returns (version, {encoding: body}) or None."""
+        entry = self._entries.get((resource, variant))
+        if entry is not None:
+            self._entries.move_to_end((resource, variant))
+        return entry
+
+    def put(self, resource: str, variant: str, version: str, body: bytes):
+        self._discard((resource, variant))
+        if len(body) > self.max_bytes:
+            return
+        self._entries[(resource, variant)] = (version, {None: body})
+        self._bytes += len(body)
+        self._evict()
+
+    def encoded_body(self, resource: str, variant: str, version: str, encoding):
+        entry = self._entries.get((resource, variant))
+        if entry is None or entry[0] != version:
+            return None
+        bodies = entry[1]
+        if encoding not in bodies:
+            bodies[encoding] = _ENCODERS[encoding](bodies[None])
+            self._bytes += len(bodies[encoding])
+            self._entries.move_to_end((resource, variant))
+            body = bodies[encoding]
+            self._evict() # May drop this very entry if it alone is over the byte bound
+            return body
+        return bodies[encoding]
+
+    def invalidate(self, resource: str = None):
+        if resource is None:
+            self._entries.clear()
+            self._bytes = 0
+        else:
+            for key in [k for k in self._entries if k[0] == resource]:
+                self._discard(key)
+
+    def snapshot(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions,
+                "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= sum(len(body) for body in entry[1].values())
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+
+collection_cache = CollectionCache()
+
+
+def not_modified_response(request: Request, resource: str, variant: str = "") -> Response:
+    """304 for a client whose If-None-Match holds the current version; echoes its ETag,
+    which already names the content-coding of the representation it has cached."""
+    etag, _ = _matching_etag(request, resource, variant)
+    return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept, Accept-Encoding"})
+
+
+def collection_response(request: Request, resource: str, variant: str, version: str,
+                        media_type: str = "application/json", *, raw: bytes) -> Response:
+    """Builds the 200 response for a collection body, compressed when worthwhile. 'raw' is the
+    uncompressed body the caller holds; the bounded cache may have dropped it by now, so only
+    its compressed encodings are looked up there."""
+    etag = make_etag(resource, version, variant)
+    encoding = choose_encoding(request) if len(raw) >= COMPRESSION_MIN_BYTES else None
+    body = raw
+    if encoding:
+        body = collection_cache.encoded_body(resource, variant, version, encoding) or _ENCODERS[encoding](raw)
+    headers = {"ETag": encoded_etag(etag, encoding), "Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        logging.debug(f"Gateway: {resource} body compressed with {encoding}: {len(raw)} -> {len(body)} bytes")
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -1,12 +1,16 @@
 # api_gateway/main.py
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import grpc
 import httpx # For SOAP calls
 import logging
 import os
 import sys
+import time
+from contextlib import asynccontextmanager
+from operator import attrgetter, itemgetter
 
 # Configure logging for the Gateway
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,7 +30,8 @@ logging.info(f"Added '{python_client_path}' to sys.path.")
 try:
     import tasks_pb2 # Importa tasks_pb2 como se estivesse na raiz do sys.path
     import tasks_pb2_grpc # Importa tasks_pb2_grpc como se estivesse na raiz do sys.path
-    logging.info("Successfully imported gRPC modules (tasks_pb2, tasks_pb2_grpc).")
+    import users_pb2 # Mensagens Protobuf para servir usuários com 'Accept: application/x-protobuf'
+    logging.info("Successfully imported gRPC modules (tasks_pb2, tasks_pb2_grpc, users_pb2).")
 except ImportError as e:
     logging.error(f"Failed to import gRPC modules. Please ensure: "
                   f"1. 'protoc' generated files are in 'python_client/'."
@@ -34,13 +39,57 @@ except ImportError as e:
                   f"3. You ran 'pip install grpcio grpcio-tools'. Error: {e}")
     sys.exit(1) # Exit if gRPC modules cannot be imported
 
+# Gateway helper modules live next to this file (api_gateway/), so the app also works
+# when started from the project root (e.g. 'uvicorn api_gateway.main:app').
+gateway_path = os.path.abspath(os.path.dirname(__file__))
+if gateway_path not in sys.path:
+    sys.path.insert(0, gateway_path)
+# The 'profiling' package (shared with the SOAP User Service) lives in the project root.
+project_root = os.path.abspath(os.path.join(gateway_path, '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from http_cache import (
+    IF_NONE_MATCH_VERSION_HEADER, NOT_MODIFIED_HEADER, STORE_VERSION_HEADER,
+    client_version, collection_cache, collection_response, not_modified_response,
+)
+from negotiation import (
+    PROTOBUF, content_type_for, document_response, negotiate_media_type, protobuf_response, render,
+)
+from resilience import Backend
+from deadlines import DeadlineMiddleware, backend_timeout, current_deadline, deadline_exceeded_by_client
+from hedging import HedgePolicy, hedged
+from expansion import TASK_EXPANSIONS, request_memo, requested_expansions, resolve_all, user_reference
+from user_client import UserServiceClient, UserServiceFault
+from bulk import (
+    EXPORT_PAGE_SIZE, MEDIA_TYPES, TASKS, USERS, BatchImporter, export_chunks, requested_format,
+    requested_resources, upload_records,
+)
+from request_tracing import TracingMiddleware, client_interceptors, tracer
+from profiling import ProfilerBusy, profile_settings, sample_process, token_matches
+from representation import (
+    LINKS_FULL, TASK_FIELDS, USER_FIELDS, collection_document, collection_items, hateoas_links, link_base,
+    link_templates, representation_key, requested_fields, requested_links, task_projector, user_projector,
+)
+import shared_state
+from shared_state import MetricsMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Backend clients are bound to the server's event loop, so they are created here, not at import.
+    await connect_task_service()
+    await connect_user_service()
+    yield
+    await close_task_service()
+    await close_user_service()
 
 app = FastAPI(
     title="API Gateway for Task and User Management",
     description="Unified API for managing tasks (gRPC) and users (SOAP), with HATEOAS.",
     version="1.0.0",
     docs_url="/swagger", # Swagger UI will be available at /swagger
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS configuration to allow requests from your web client
@@ -62,45 +111,139 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request deadline budgets ('X-Request-Timeout' header or route default) and cancellation
+# of backend calls when the client goes away.
+app.add_middleware(DeadlineMiddleware)
+
+# Request metrics (aggregated across workers in multi-process mode, see workers.py) and
+# cache invalidations published by other workers.
+app.add_middleware(MetricsMiddleware, on_invalidate=collection_cache.invalidate)
+
+# Distributed tracing (TRACE_EXPORT_FILE / TRACE_OTLP_ENDPOINT); added last so its server span
+# covers the other middlewares too.
+app.add_middleware(TracingMiddleware)
+
+def invalidate_collection(resource: str):
+    """Drops this worker's cached bodies for 'resource' and tells the other workers to do the same."""
+    collection_cache.invalidate(resource)
+    shared_state.state.publish_invalidation(resource)
+
 # --- gRPC Client Setup (for Task Service) ---
-GRPC_SERVER_ADDRESS = "localhost:50051" # Address of your Go gRPC server
-try:
-    grpc_channel = grpc.insecure_channel(GRPC_SERVER_ADDRESS)
+GRPC_SERVER_ADDRESS = os.environ.get("GRPC_SERVER_ADDRESS", "localhost:50051") # Address of your Go gRPC server
+# grpc.aio keeps slow backend calls from blocking the event loop (and every other request).
+# Its channel belongs to the event loop that creates it, so it is opened in 'lifespan'.
+grpc_channel = None
+grpc_task_stub = None
+grpc_list_tasks_raw = None
+grpc_get_task_raw = None
+
+async def connect_task_service():
+    global grpc_channel, grpc_task_stub, grpc_list_tasks_raw, grpc_get_task_raw
+    # The tracing interceptors are only installed when tracing is on, so they cost nothing otherwise.
+    grpc_channel = grpc.aio.insecure_channel(GRPC_SERVER_ADDRESS,
+                                             interceptors=client_interceptors() if tracer.enabled else None)
     grpc_task_stub = tasks_pb2_grpc.TaskServiceStub(grpc_channel)
-    # Test connection to gRPC server
-    # This test might fail if the gRPC server is not yet running, but the Gateway will still start.
-    # The actual RPC calls will then fail with 503 if the gRPC server is down.
-    # grpc_task_stub.ListTasks(tasks_pb2.ListTasksRequest(), timeout=2) # Removed aggressive startup test
+    # Raw-bytes variants of the read RPCs: with no response deserializer, gRPC hands back the
+    # serialized response message, which is passed through untouched for protobuf clients.
+    grpc_list_tasks_raw = grpc_channel.unary_unary(
+        '/tasks.TaskService/ListTasks',
+        request_serializer=tasks_pb2.ListTasksRequest.SerializeToString,
+        response_deserializer=None,
+    )
+    grpc_get_task_raw = grpc_channel.unary_unary(
+        '/tasks.TaskService/GetTask',
+        request_serializer=tasks_pb2.GetTaskRequest.SerializeToString,
+        response_deserializer=None,
+    )
+    # The channel connects lazily: if the gRPC server is not up yet the Gateway still starts,
+    # and RPC calls fail with 503 until it is.
     logging.info(f"Gateway: Attempting to connect to gRPC Task Service at {GRPC_SERVER_ADDRESS}")
-except grpc.RpcError as e:
-    logging.warning(f"Gateway: Failed to connect to gRPC Task Service at {GRPC_SERVER_ADDRESS} during startup. Error: {e.details}")
-    logging.warning("This might be normal if the gRPC server starts after the Gateway. RPC calls will fail until it's up.")
-except Exception as e:
-    logging.error(f"Gateway: Unexpected error during gRPC Task Service setup: {e}")
 
-
-# --- SOAP Client Setup (for User Service) ---
-SOAP_SERVICE_ADDRESS = "http://localhost:8001/" # Address of your Python SOAP service
-# For SOAP, we'll construct the XML request manually or use a library like 'suds-pyc' or 'zeep' if needed
-# For this example, we'll use httpx to send XML directly.
+async def close_task_service():
+    if grpc_channel is not None:
+        await grpc_channel.close()
+
+async def grpc_call_with_metadata(multicallable, grpc_request, **kwargs):
+    """Awaits a unary gRPC call and returns (response, initial metadata as a dict)."""
+    call = multicallable(grpc_request, **kwargs)
+    response = await call
+    return response, dict(await call.initial_metadata())
+
+
+# --- Resilience (circuit breakers, adaptive concurrency limits, load shedding) ---
+# Only errors that say something about the backend's health count as failures; a NotFound
+# or a SOAP fault for a missing user is a normal answer.
+GRPC_FAILURE_CODES = {
+    grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL, grpc.StatusCode.UNKNOWN,
+}
+
+# Timeouts on a budget the client itself shortened (X-Request-Timeout) are not held against
+# the backend, or a client sending tiny budgets could open the circuit for everyone.
+def is_grpc_failure(error, result):
+    if not isinstance(error, grpc.RpcError) or error.code() not in GRPC_FAILURE_CODES:
+        return False
+    return not (error.code() == grpc.StatusCode.DEADLINE_EXCEEDED and deadline_exceeded_by_client())
+
+def is_soap_failure(error, result):
+    if error is not None:
+        if isinstance(error, httpx.TimeoutException) and deadline_exceeded_by_client():
+            return False
+        return isinstance(error, httpx.RequestError)
+    return result.status_code in (502, 503, 504)
+
+# Calls over the concurrency limit queue briefly, but never past the request's deadline.
+task_backend = Backend("gRPC Task Service", is_grpc_failure, time_left=lambda: current_deadline().remaining())
+user_backend = Backend("SOAP User Service", is_soap_failure, time_left=lambda: current_deadline().remaining())
+
+# Hedged reads (GATEWAY_HEDGED_READS=true) for the idempotent single-item lookups.
+get_task_hedging = HedgePolicy("gRPC GetTask")
+get_user_hedging = HedgePolicy("SOAP get_user")
+
+
+# --- User Service Client Setup (SOAP / MessagePack-RPC) ---
+SOAP_SERVICE_ADDRESS = os.environ.get("SOAP_SERVICE_ADDRESS", "http://localhost:8001/") # Address of your Python SOAP service
+# The gateway talks to the User Service over MessagePack-RPC ('<address>/msgpack', override with
+# USER_SERVICE_RPC_ADDRESS) and falls back to SOAP when the service does not offer it (see user_client.py).
+# Timeouts are set per call from the request deadline.
+user_client = UserServiceClient(SOAP_SERVICE_ADDRESS, user_backend, backend_timeout,
+                                rpc_address=os.environ.get("USER_SERVICE_RPC_ADDRESS"))
+
+async def connect_user_service():
+    await user_client.connect()
+
+async def close_user_service():
+    await user_client.close()
+
+def users_to_protobuf(users):
+    return [users_pb2.User(user_id=u["user_id"], name=u["name"], email=u["email"]) for u in users]
+
+async def fetch_user(user_id: int):
+    """Hedged get_user; the user dict, or None if the service has no such user."""
+    return await hedged(get_user_hedging, lambda: user_client.get_user(user_id))
+
+async def embed_creators(request: Request, tasks, documents: list, links: str):
+    """Embeds each task's creator (HAL '_embedded.created_by'). The distinct creators are fetched
+    with batched get_users calls through the request's memo. Unknown users, and users whose
+    lookup failed (the User Service shed, timed out or down), are embedded as null rather than
+    failing the list."""
+    references = [user_reference(task.created_by) for task in tasks]
+    creators, failed = await resolve_all(request_memo(request), "users",
+                                         [reference for reference in references if reference is not None],
+                                         user_client.get_users)
+    if links == LINKS_FULL:
+        templates = link_templates(link_base(request))
+        creators = {user_id: user and {**user, "_links": templates.item("users", user_id)}
+                    for user_id, user in creators.items()}
+    for document, reference in zip(documents, references):
+        document["_embedded"] = {"created_by": creators.get(reference)}
+    logging.info(f"Gateway: Expanded created_by for {len(documents)} tasks with {len(creators)} users"
+                 + (f" ({failed} could not be looked up)." if failed else "."))
 
 # --- HATEOAS Helper ---
 def add_hateoas_links(request: Request, resource_type: str, resource_id: int = None):
-    base_url = str(request.base_url).rstrip('/')
-    links = {
-        "self": {"href": f"{base_url}/{resource_type}" + (f"/{resource_id}" if resource_id else ""), "method": "GET"}
-    }
-    if resource_type == "tasks":
-        links["create"] = {"href": f"{base_url}/tasks", "method": "POST"}
-        if resource_id:
-            links["update"] = {"href": f"{base_url}/tasks/{resource_id}", "method": "PUT"}
-            links["delete"] = {"href": f"{base_url}/tasks/{resource_id}", "method": "DELETE"}
-            links["get_by_id"] = {"href": f"{base_url}/tasks/{resource_id}", "method": "GET"}
-    elif resource_type == "users":
-        links["create"] = {"href": f"{base_url}/users", "method": "POST"}
-        if resource_id:
-            links["get_by_id"] = {"href": f"{base_url}/users/{resource_id}", "method": "GET"}
-    return links
+    # Built from per-base-URL templates (see representation.py); treat the result as read-only.
+    return hateoas_links(request, resource_type, resource_id)
 
 # --- Task Endpoints (REST -> gRPC) ---
 
@@ -113,7 +256,7 @@ async def create_task(request_data: dict, request: Request):
             description=request_data.get("description"),
             created_by=request_data.get("created_by")
         )
-        grpc_response = grpc_task_stub.CreateTask(grpc_request, timeout=5)
+        grpc_response = await task_backend.call(lambda: grpc_task_stub.CreateTask(grpc_request, timeout=backend_timeout()), "CreateTask")
         response_content = {
             "task": {
                 "id": grpc_response.task.id,
@@ -126,10 +269,15 @@ async def create_task(request_data: dict, request: Request):
             "_links": add_hateoas_links(request, "tasks", grpc_response.task.id)
         }
         logging.info(f"Gateway: Sent gRPC CreateTask, received response: {grpc_response.message}")
+        invalidate_collection("tasks")
         return JSONResponse(content=response_content)
     except grpc.RpcError as e:
-        logging.error(f"Gateway: gRPC CreateTask failed: {e.details}")
-        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details}")
+        logging.error(f"Gateway: gRPC CreateTask failed: {e.details()}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in create_task: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -137,29 +285,66 @@ async def create_task(request_data: dict, request: Request):
 @app.get("/tasks")
 async def list_tasks(request: Request):
     logging.info("Gateway: Received REST GET /tasks request")
+    media_type = negotiate_media_type(request)
+    fields = requested_fields(request, TASK_FIELDS)
+    links = requested_links(request)
+    expansions = requested_expansions(request, TASK_EXPANSIONS)
+    if expansions and media_type == PROTOBUF:
+        raise HTTPException(status_code=400, detail="'expand' is not available for application/x-protobuf.")
+    # Conditional GET: the Go store version becomes the ETag. We ask the backend whether the
+    # version we (or the client) already have is still current before transferring the list.
+    # Embedded users can change without the task store version changing, so expanded
+    # documents are neither cached nor given an ETag.
+    # Protobuf bodies are the backend's bytes, whatever ?fields= and ?links= say.
+    variant = media_type if media_type == PROTOBUF else f"{media_type}|{representation_key(request, fields, links)}"
+    known_version = None if expansions else client_version(request, "tasks", variant)
+    cached = None if expansions else collection_cache.get("tasks", variant)
+    probe_version = cached[0] if cached else known_version
     try:
         grpc_request = tasks_pb2.ListTasksRequest()
-        grpc_response = grpc_task_stub.ListTasks(grpc_request, timeout=5)
-        tasks_list = []
-        for task in grpc_response.tasks:
-            tasks_list.append({
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "created_by": task.created_by,
-                "_links": add_hateoas_links(request, "tasks", task.id) # HATEOAS for each task
-            })
-        response_content = {
-            "tasks": tasks_list,
-            "message": grpc_response.message,
-            "_links": add_hateoas_links(request, "tasks") # HATEOAS for the collection
-        }
-        logging.info(f"Gateway: Sent gRPC ListTasks, found {len(tasks_list)} tasks.")
-        return JSONResponse(content=response_content)
+        grpc_metadata = [(IF_NONE_MATCH_VERSION_HEADER, probe_version)] if probe_version else None
+        if media_type == PROTOBUF:
+            raw_response, response_headers = await task_backend.call(lambda: grpc_call_with_metadata(
+                grpc_list_tasks_raw, grpc_request, timeout=backend_timeout(), metadata=grpc_metadata), "ListTasks")
+        else:
+            grpc_response, response_headers = await task_backend.call(lambda: grpc_call_with_metadata(
+                grpc_task_stub.ListTasks, grpc_request, timeout=backend_timeout(), metadata=grpc_metadata), "ListTasks")
+        version = response_headers.get(STORE_VERSION_HEADER)
+        not_modified = response_headers.get(NOT_MODIFIED_HEADER) == "true"
+
+        if version is not None and version == known_version:
+            logging.info(f"Gateway: GET /tasks not modified (version {version}), answering 304.")
+            return not_modified_response(request, "tasks", variant)
+        if not_modified and cached and cached[0] == version:
+            logging.info(f"Gateway: GET /tasks served from cache (version {version}).")
+            # The body held since before the backend call: the entry may have been evicted or replaced meanwhile
+            return collection_response(request, "tasks", variant, version, content_type_for(media_type, "tasks.ListTasksResponse"),
+                                       raw=cached[1][None])
+
+        if media_type == PROTOBUF:
+            body = raw_response # Backend bytes, no re-encoding
+            logging.info(f"Gateway: Sent gRPC ListTasks, passing through {len(body)} protobuf bytes.")
+        else:
+            templates = link_templates(link_base(request))
+            tasks_list = collection_items(grpc_response.tasks, task_projector(fields), attrgetter("id"),
+                                          "tasks", links, templates)
+            if "created_by" in expansions:
+                await embed_creators(request, grpc_response.tasks, tasks_list, links)
+            response_content = collection_document("tasks", tasks_list, grpc_response.message, "tasks", links, templates)
+            body = render(response_content, media_type)
+            logging.info(f"Gateway: Sent gRPC ListTasks, found {len(tasks_list)} tasks.")
+        if version is None or expansions: # No store version (or expanded): no ETag, plain response
+            return Response(content=body, media_type=content_type_for(media_type, "tasks.ListTasksResponse"),
+                            headers={"Vary": "Accept"})
+        collection_cache.put("tasks", variant, version, body)
+        return collection_response(request, "tasks", variant, version, content_type_for(media_type, "tasks.ListTasksResponse"), raw=body)
     except grpc.RpcError as e:
-        logging.error(f"Gateway: gRPC ListTasks failed: {e.details}")
-        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details}")
+        logging.error(f"Gateway: gRPC ListTasks failed: {e.details()}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in list_tasks: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -167,9 +352,18 @@ async def list_tasks(request: Request):
 @app.get("/tasks/{task_id}")
 async def get_task_by_id(task_id: int, request: Request):
     logging.info(f"Gateway: Received REST GET /tasks/{task_id} request")
+    media_type = negotiate_media_type(request)
     try:
         grpc_request = tasks_pb2.GetTaskRequest(id=task_id)
-        grpc_response = grpc_task_stub.GetTask(grpc_request, timeout=5)
+        if media_type == PROTOBUF:
+            # The Go server answers NotFound for unknown IDs, so the bytes can be passed through unread.
+            raw_response = await hedged(get_task_hedging, lambda: task_backend.call(
+                lambda: grpc_get_task_raw(grpc_request, timeout=backend_timeout()), "GetTask"))
+            logging.info(f"Gateway: Sent gRPC GetTask for ID {task_id}, passing through {len(raw_response)} protobuf bytes.")
+            return protobuf_response(raw_response, "tasks.GetTaskResponse")
+
+        grpc_response = await hedged(get_task_hedging, lambda: task_backend.call(
+            lambda: grpc_task_stub.GetTask(grpc_request, timeout=backend_timeout()), "GetTask"))
         if not grpc_response.task.id: # Check if task was actually found
              raise HTTPException(status_code=404, detail=f"Task with ID {task_id} not found.")
 
@@ -185,12 +379,16 @@ async def get_task_by_id(task_id: int, request: Request):
             "_links": add_hateoas_links(request, "tasks", grpc_response.task.id)
         }
         logging.info(f"Gateway: Sent gRPC GetTask for ID {task_id}, received response: {grpc_response.message}")
-        return JSONResponse(content=response_content)
+        return document_response(response_content, media_type)
     except grpc.RpcError as e:
-        logging.error(f"Gateway: gRPC GetTask failed for ID {task_id}: {e.details}")
-        if e.code() == codes.NotFound:
+        logging.error(f"Gateway: gRPC GetTask failed for ID {task_id}: {e.details()}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        if e.code() == grpc.StatusCode.NOT_FOUND:
             raise HTTPException(status_code=404, detail=f"Task with ID {task_id} not found.")
-        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details}")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in get_task_by_id for ID {task_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -206,7 +404,7 @@ async def update_task(task_id: int, request_data: dict, request: Request):
             description=request_data.get("description", ""),
             status=request_data.get("status", "")
         )
-        grpc_response = grpc_task_stub.UpdateTask(grpc_request, timeout=5)
+        grpc_response = await task_backend.call(lambda: grpc_task_stub.UpdateTask(grpc_request, timeout=backend_timeout()), "UpdateTask")
         response_content = {
             "task": {
                 "id": grpc_response.task.id,
@@ -219,12 +417,17 @@ async def update_task(task_id: int, request_data: dict, request: Request):
             "_links": add_hateoas_links(request, "tasks", grpc_response.task.id)
         }
         logging.info(f"Gateway: Sent gRPC UpdateTask for ID {task_id}, received response: {grpc_response.message}")
+        invalidate_collection("tasks")
         return JSONResponse(content=response_content)
     except grpc.RpcError as e:
-        logging.error(f"Gateway: gRPC UpdateTask failed for ID {task_id}: {e.details}")
-        if e.code() == codes.NotFound:
+        logging.error(f"Gateway: gRPC UpdateTask failed for ID {task_id}: {e.details()}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        if e.code() == grpc.StatusCode.NOT_FOUND:
             raise HTTPException(status_code=404, detail=f"Task with ID {task_id} not found.")
-        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details}")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in update_task for ID {task_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -234,17 +437,22 @@ async def delete_task(task_id: int):
     logging.info(f"Gateway: Received REST DELETE /tasks/{task_id} request")
     try:
         grpc_request = tasks_pb2.DeleteTaskRequest(id=task_id)
-        grpc_response = grpc_task_stub.DeleteTask(grpc_request, timeout=5)
+        grpc_response = await task_backend.call(lambda: grpc_task_stub.DeleteTask(grpc_request, timeout=backend_timeout()), "DeleteTask")
         if not grpc_response.success:
             logging.warning(f"Gateway: gRPC DeleteTask failed for ID {task_id}: {grpc_response.message}")
             raise HTTPException(status_code=404, detail=f"Task with ID {task_id} not found: {grpc_response.message}")
         logging.info(f"Gateway: Sent gRPC DeleteTask for ID {task_id}, received success.")
+        invalidate_collection("tasks")
         return # 204 No Content
     except grpc.RpcError as e:
-        logging.error(f"Gateway: gRPC DeleteTask failed for ID {task_id}: {e.details}")
-        if e.code() == codes.NotFound:
+        logging.error(f"Gateway: gRPC DeleteTask failed for ID {task_id}: {e.details()}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        if e.code() == grpc.StatusCode.NOT_FOUND:
             raise HTTPException(status_code=404, detail=f"Task with ID {task_id} not found.")
-        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details}")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in delete_task for ID {task_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -261,58 +469,29 @@ async def create_user(request_data: dict, request: Request):
     if not name or not email:
         raise HTTPException(status_code=400, detail="Name and email are required for user creation.")
 
-    # Construct SOAP XML request
-    soap_request_xml = f"""<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
-                   xmlns:tns="urn:user.service.soap">
-      <soap:Body>
-        <tns:createUser>
-          <tns:name>{name}</tns:name>
-          <tns:email>{email}</tns:email>
-        </tns:createUser>
-      </soap:Body>
-    </soap:Envelope>"""
-
-    headers = {'Content-Type': 'text/xml; charset=utf-8'}
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(SOAP_SERVICE_ADDRESS, headers=headers, content=soap_request_xml, timeout=5)
-            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            
-            soap_response_xml = response.text
-            logging.info(f"Gateway: Received SOAP response for create_user: {soap_response_xml}")
-
-            # Simple parsing of SOAP response (for demonstration)
-            # In a real app, use an XML parser like lxml or defusedxml
-            user_id_start = soap_response_xml.find('<user_id>') + len('<user_id>')
-            user_id_end = soap_response_xml.find('</user_id>')
-            user_id = int(soap_response_xml[user_id_start:user_id_end]) if user_id_start != -1 and user_id_end != -1 else None
-
-            user_name_start = soap_response_xml.find('<name>') + len('<name>')
-            user_name_end = soap_response_xml.find('</name>')
-            user_name = soap_response_xml[user_name_start:user_name_end] if user_name_start != -1 and user_name_end != -1 else ""
-
-            user_email_start = soap_response_xml.find('<email>') + len('<email>')
-            user_email_end = soap_response_xml.find('</email>')
-            user_email = soap_response_xml[user_email_start:user_email_end] if user_email_start != -1 and user_email_end != -1 else ""
-
-            response_content = {
-                "user": {
-                    "user_id": user_id,
-                    "name": user_name,
-                    "email": user_email,
-                },
-                "message": "User created successfully via SOAP.",
-                "_links": add_hateoas_links(request, "users", user_id)
-            }
-            return JSONResponse(content=response_content)
+        user = await user_client.create_user(name, email)
+        logging.info(f"Gateway: Sent create_user ({user_client.protocol}), created user ID {user['user_id']}")
 
+        response_content = {
+            "user": user,
+            "message": "User created successfully via SOAP.",
+            "_links": add_hateoas_links(request, "users", user["user_id"])
+        }
+        invalidate_collection("users")
+        return JSONResponse(content=response_content)
+
+    except httpx.TimeoutException as e:
+        logging.error(f"Gateway: SOAP request timed out: {e}")
+        raise HTTPException(status_code=504, detail="Gateway Timeout: SOAP User Service did not answer within the request deadline.")
     except httpx.RequestError as e:
         logging.error(f"Gateway: SOAP create_user request failed: {e}")
         raise HTTPException(status_code=503, detail=f"SOAP User Service Error: Cannot connect to service. {e}")
-    except httpx.HTTPStatusError as e:
-        logging.error(f"Gateway: SOAP create_user returned HTTP error: {e.response.status_code} - {e.response.text}")
-        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e.response.text}")
+    except UserServiceFault as e:
+        logging.error(f"Gateway: SOAP create_user returned an error: {e.status_code} - {e}")
+        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in create_user (SOAP): {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -320,62 +499,54 @@ async def create_user(request_data: dict, request: Request):
 @app.get("/users")
 async def list_users(request: Request):
     logging.info(f"Gateway: Received REST GET /users request")
-    # Construct SOAP XML request for list_users
-    soap_request_xml = """<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
-                   xmlns:tns="urn:user.service.soap">
-      <soap:Body>
-        <tns:list_users/>
-      </soap:Body>
-    </soap:Envelope>"""
-
-    headers = {'Content-Type': 'text/xml; charset=utf-8'}
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(SOAP_SERVICE_ADDRESS, headers=headers, content=soap_request_xml, timeout=5)
-            response.raise_for_status()
-            
-            soap_response_xml = response.text
-            logging.info(f"Gateway: Received SOAP response for list_users: {soap_response_xml}")
-
-            # Simple parsing of SOAP response for multiple users
-            users_list = []
-            # This parsing is very basic and fragile. A robust XML parser is recommended.
-            user_elements = soap_response_xml.split('<User>')
-            for user_element in user_elements[1:]: # Skip the part before the first <User>
-                user_id_start = user_element.find('<user_id>') + len('<user_id>')
-                user_id_end = user_element.find('</user_id>')
-                user_id = int(user_element[user_id_start:user_id_end]) if user_id_start != -1 and user_id_end != -1 else None
-
-                user_name_start = user_element.find('<name>') + len('<name>')
-                user_name_end = user_element.find('</name>')
-                user_name = user_element[user_name_start:user_name_end] if user_name_start != -1 and user_name_end != -1 else ""
-
-                user_email_start = user_element.find('<email>') + len('<email>')
-                user_email_end = user_element.find('</email>')
-                user_email = user_element[user_email_start:user_email_end] if user_email_start != -1 and user_email_end != -1 else ""
-                
-                if user_id is not None:
-                    users_list.append({
-                        "user_id": user_id,
-                        "name": user_name,
-                        "email": user_email,
-                        "_links": add_hateoas_links(request, "users", user_id) # HATEOAS for each user
-                    })
-
-            response_content = {
-                "users": users_list,
-                "message": f"{len(users_list)} users found via SOAP.",
-                "_links": add_hateoas_links(request, "users") # HATEOAS for the collection
-            }
-            return JSONResponse(content=response_content)
+    media_type = negotiate_media_type(request)
+    fields = requested_fields(request, USER_FIELDS)
+    links = requested_links(request)
+    # Conditional GET: same scheme as list_tasks, with the SOAP store version in HTTP headers.
+    variant = media_type if media_type == PROTOBUF else f"{media_type}|{representation_key(request, fields, links)}"
+    known_version = client_version(request, "users", variant)
+    cached = collection_cache.get("users", variant)
+    probe_version = cached[0] if cached else known_version
 
+    try:
+        users, version, not_modified = await user_client.list_users(if_none_match_version=probe_version)
+
+        if version is not None and version == known_version:
+            logging.info(f"Gateway: GET /users not modified (version {version}), answering 304.")
+            return not_modified_response(request, "users", variant)
+        if not_modified and cached and cached[0] == version:
+            logging.info(f"Gateway: GET /users served from cache (version {version}).")
+            # The body held since before the backend call: the entry may have been evicted or replaced meanwhile
+            return collection_response(request, "users", variant, version, content_type_for(media_type, "users.ListUsersResponse"),
+                                       raw=cached[1][None])
+
+        logging.info(f"Gateway: Received {len(users)} users from list_users ({user_client.protocol}).")
+        message = f"{len(users)} users found via SOAP."
+        if media_type == PROTOBUF:
+            body = users_pb2.ListUsersResponse(users=users_to_protobuf(users), message=message).SerializeToString()
+        else:
+            templates = link_templates(link_base(request))
+            users_list = collection_items(users, user_projector(fields), itemgetter("user_id"),
+                                          "users", links, templates)
+            response_content = collection_document("users", users_list, message, "users", links, templates)
+            body = render(response_content, media_type)
+        if version is None: # Service without store versions: no ETag, plain response
+            return Response(content=body, media_type=content_type_for(media_type, "users.ListUsersResponse"),
+                            headers={"Vary": "Accept"})
+        collection_cache.put("users", variant, version, body)
+        return collection_response(request, "users", variant, version, content_type_for(media_type, "users.ListUsersResponse"), raw=body)
+
+    except httpx.TimeoutException as e:
+        logging.error(f"Gateway: SOAP request timed out: {e}")
+        raise HTTPException(status_code=504, detail="Gateway Timeout: SOAP User Service did not answer within the request deadline.")
     except httpx.RequestError as e:
         logging.error(f"Gateway: SOAP list_users request failed: {e}")
         raise HTTPException(status_code=503, detail=f"SOAP User Service Error: Cannot connect to service. {e}")
-    except httpx.HTTPStatusError as e:
-        logging.error(f"Gateway: SOAP list_users returned HTTP error: {e.response.status_code} - {e.response.text}")
-        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e.response.text}")
+    except UserServiceFault as e:
+        logging.error(f"Gateway: SOAP list_users returned an error: {e.status_code} - {e}")
+        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in list_users (SOAP): {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -383,73 +554,250 @@ async def list_users(request: Request):
 @app.get("/users/{user_id}")
 async def get_user_by_id(user_id: int, request: Request):
     logging.info(f"Gateway: Received REST GET /users/{user_id} request")
-    # Construct SOAP XML request for get_user
-    soap_request_xml = f"""<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
-                   xmlns:tns="urn:user.service.soap">
-      <soap:Body>
-        <tns:get_user>
-          <tns:user_id>{user_id}</tns:user_id>
-        </tns:get_user>
-      </soap:Body>
-    </soap:Envelope>"""
-
-    headers = {'Content-Type': 'text/xml; charset=utf-8'}
+    media_type = negotiate_media_type(request)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(SOAP_SERVICE_ADDRESS, headers=headers, content=soap_request_xml, timeout=5)
-            response.raise_for_status()
-            
-            soap_response_xml = response.text
-            logging.info(f"Gateway: Received SOAP response for get_user: {soap_response_xml}")
-
-            # Simple parsing of SOAP response for a single user
-            user_id_parsed = None
-            user_name_parsed = ""
-            user_email_parsed = ""
-
-            user_id_start = soap_response_xml.find('<user_id>') + len('<user_id>')
-            user_id_end = soap_response_xml.find('</user_id>')
-            if user_id_start != -1 and user_id_end != -1:
-                user_id_parsed = int(soap_response_xml[user_id_start:user_id_end])
-
-            user_name_start = soap_response_xml.find('<name>') + len('<name>')
-            user_name_end = soap_response_xml.find('</name>')
-            if user_name_start != -1 and user_name_end != -1:
-                user_name_parsed = soap_response_xml[user_name_start:user_name_end]
-
-            user_email_start = soap_response_xml.find('<email>') + len('<email>')
-            user_email_end = soap_response_xml.find('</email>')
-            if user_email_start != -1 and user_email_end != -1:
-                user_email_parsed = soap_response_xml[user_email_start:user_email_end]
-            
-            if user_id_parsed is not None:
-                response_content = {
-                    "user": {
-                        "user_id": user_id_parsed,
-                        "name": user_name_parsed,
-                        "email": user_email_parsed,
-                    },
-                    "message": f"User with ID {user_id} found via SOAP.",
-                    "_links": add_hateoas_links(request, "users", user_id_parsed)
-                }
-                return JSONResponse(content=response_content)
-            else:
-                raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found via SOAP.")
+        user = await fetch_user(user_id)
+        if user is None:
+            raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found via SOAP.")
+        logging.info(f"Gateway: Received get_user for ID {user_id} ({user_client.protocol}).")
+        message = f"User with ID {user_id} found via SOAP."
+        if media_type == PROTOBUF:
+            body = users_pb2.GetUserResponse(user=users_to_protobuf([user])[0], message=message).SerializeToString()
+            return protobuf_response(body, "users.GetUserResponse")
+        response_content = {
+            "user": user,
+            "message": message,
+            "_links": add_hateoas_links(request, "users", user["user_id"])
+        }
+        return document_response(response_content, media_type)
 
+    except httpx.TimeoutException as e:
+        logging.error(f"Gateway: SOAP request timed out: {e}")
+        raise HTTPException(status_code=504, detail="Gateway Timeout: SOAP User Service did not answer within the request deadline.")
     except httpx.RequestError as e:
         logging.error(f"Gateway: SOAP get_user request failed: {e}")
         raise HTTPException(status_code=503, detail=f"SOAP User Service Error: Cannot connect to service. {e}")
-    except httpx.HTTPStatusError as e:
-        logging.error(f"Gateway: SOAP get_user returned HTTP error: {e.response.status_code} - {e.response.text}")
-        if e.response.status_code == 500 and "not found" in e.response.text.lower(): # Basic check for "not found" fault
-             raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found via SOAP.")
-        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e.response.text}")
+    except UserServiceFault as e:
+        logging.error(f"Gateway: SOAP get_user returned an error: {e.status_code} - {e}")
+        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Gateway: Unexpected error in get_user (SOAP): {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
 
 
+# --- Bulk Export / Import (streamed, see bulk.py) ---
+
+async def task_pages():
+    """Pages of task dicts, in ID order, from the TaskService's StreamTasks stream. Each page
+    read goes through the backend's breaker and limiter like a unary call would."""
+    call = grpc_task_stub.StreamTasks(tasks_pb2.StreamTasksRequest(page_size=EXPORT_PAGE_SIZE),
+                                      timeout=backend_timeout())
+    try:
+        while True:
+            page = await task_backend.call(call.read, "StreamTasks")
+            if page is grpc.aio.EOF:
+                return
+            yield [{"id": task.id, "title": task.title, "description": task.description,
+                    "status": task.status, "created_by": task.created_by} for task in page.tasks]
+    finally:
+        call.cancel() # No-op once the stream has ended; stops the backend if the client went away
+
+async def user_pages():
+    """Pages of user dicts, in ID order, from the UserService's list_users_page."""
+    after_id = 0
+    while True:
+        users = await user_client.list_users_page(after_id, EXPORT_PAGE_SIZE)
+        if users:
+            yield users
+        if len(users) < EXPORT_PAGE_SIZE:
+            return
+        after_id = users[-1]["user_id"]
+
+class TaskImportStream:
+    """Client side of the TaskService's ImportTasks stream, opened with the first batch. A
+    write waits while the backend is behind (gRPC flow control), which holds back the upload."""
+
+    def __init__(self):
+        self.call = None
+
+    async def write(self, records: list):
+        if self.call is None:
+            self.call = grpc_task_stub.ImportTasks(timeout=backend_timeout())
+        message = tasks_pb2.ImportTasksRequest(tasks=[tasks_pb2.Task(**record) for record in records])
+        await task_backend.call(lambda: self.call.write(message), "ImportTasks")
+
+    async def close(self) -> dict:
+        """Ends the stream; the {"imported", "created", "updated"} counts of the TaskService."""
+        if self.call is None:
+            return {"imported": 0, "created": 0, "updated": 0}
+        await self.call.done_writing()
+        response = await task_backend.call(lambda: self.call, "ImportTasks")
+        return {"imported": response.imported, "created": response.created, "updated": response.updated}
+
+    def cancel(self):
+        if self.call is not None:
+            self.call.cancel()
+
+@app.get("/export")
+async def export_records(request: Request):
+    fmt = requested_format(request)
+    resources = requested_resources(request, fmt)
+    logging.info(f"Gateway: Received REST GET /export request ({fmt}: {', '.join(resources)})")
+    counts = {}
+    chunks = export_chunks(resources, fmt, {TASKS: task_pages, USERS: user_pages}, counts)
+    started = time.perf_counter()
+    try:
+        # The first page is read before answering, so a backend that is down gets a proper error
+        # status; once the body is streaming, a failure can only abort the connection.
+        first = await anext(chunks, b"")
+    except grpc.RpcError as e:
+        logging.error(f"Gateway: gRPC StreamTasks failed: {e.details()}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except httpx.TimeoutException as e:
+        logging.error(f"Gateway: SOAP request timed out: {e}")
+        raise HTTPException(status_code=504, detail="Gateway Timeout: SOAP User Service did not answer within the request deadline.")
+    except httpx.RequestError as e:
+        logging.error(f"Gateway: SOAP list_users_page request failed: {e}")
+        raise HTTPException(status_code=503, detail=f"SOAP User Service Error: Cannot connect to service. {e}")
+    except UserServiceFault as e:
+        logging.error(f"Gateway: SOAP list_users_page returned an error: {e.status_code} - {e}")
+        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Gateway: Unexpected error in export_records: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+
+    async def body():
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            logging.error(f"Gateway: Export aborted after {counts}: {e!r}")
+            raise
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        logging.info(f"Gateway: Exported {counts} in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} records/s).")
+
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{"-".join(resources)}.{fmt}"'})
+
+@app.post("/import")
+async def import_records(request: Request):
+    fmt = requested_format(request)
+    resources = requested_resources(request, fmt)
+    logging.info(f"Gateway: Received REST POST /import request ({fmt}: {', '.join(resources)})")
+    task_stream = TaskImportStream()
+    appliers = {USERS: user_client.import_users, TASKS: task_stream.write}
+    importer = BatchImporter({resource: appliers[resource] for resource in resources})
+    started = time.perf_counter()
+    try:
+        async for resource, record in upload_records(request.stream(), fmt, resources):
+            await importer.add(resource, record)
+        await importer.flush()
+        task_counts = await task_stream.close()
+        if TASKS in importer.updated:
+            importer.updated[TASKS] = task_counts["updated"] # Only known once the stream ends
+    except grpc.RpcError as e:
+        logging.error(f"Gateway: gRPC ImportTasks failed after {importer.imported}: {e.details()}")
+        if e.code() in (grpc.StatusCode.INVALID_ARGUMENT, grpc.StatusCode.OUT_OF_RANGE):
+            # The TaskService rejected a batch; its message says how many tasks it applied before it
+            users = f" Users imported before it: {importer.imported[USERS]}." if USERS in importer.imported else ""
+            raise HTTPException(status_code=400, detail=f"{e.details()}.{users}")
+        if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Gateway Timeout: gRPC Task Service did not answer within the request deadline.")
+        raise HTTPException(status_code=503, detail=f"gRPC Task Service Error: {e.details()}")
+    except httpx.TimeoutException as e:
+        logging.error(f"Gateway: SOAP request timed out: {e}")
+        raise HTTPException(status_code=504, detail="Gateway Timeout: SOAP User Service did not answer within the request deadline.")
+    except httpx.RequestError as e:
+        logging.error(f"Gateway: SOAP import_users request failed: {e}")
+        raise HTTPException(status_code=503, detail=f"SOAP User Service Error: Cannot connect to service. {e}")
+    except UserServiceFault as e:
+        logging.error(f"Gateway: SOAP import_users returned an error: {e.status_code} - {e}")
+        if e.faultcode.startswith("Client."): # A batch the service rejected (e.g. an ID out of range)
+            raise HTTPException(status_code=400, detail=f"{e} Imported before it: {importer.progress()}.")
+        raise HTTPException(status_code=502, detail=f"SOAP User Service returned error: {e}")
+    except HTTPException as e:
+        # Batches are applied as they fill up, so say how far the import got before the bad record
+        logging.error(f"Gateway: Import stopped after {importer.imported}: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=f"{e.detail} Imported before it: {importer.progress()}.", headers=e.headers)
+    except Exception as e:
+        logging.error(f"Gateway: Unexpected error in import_records: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+    finally:
+        task_stream.cancel() # No-op after a clean close
+
+    for resource, count in importer.imported.items():
+        if count:
+            invalidate_collection(resource)
+    elapsed = time.perf_counter() - started
+    total = sum(importer.imported.values())
+    updated = sum(importer.updated.values())
+    logging.info(f"Gateway: Imported {importer.imported} ({importer.updated} updated) in {elapsed:.2f}s "
+                 f"({total / elapsed if elapsed else 0:.0f} records/s).")
+    return JSONResponse(content={
+        "imported": importer.imported,
+        "updated": importer.updated, # Of the imported records, those that replaced one with the same ID
+        "elapsed_s": round(elapsed, 3),
+        "records_per_second": round(total / elapsed) if elapsed else None,
+        "message": f"{total} records imported ({total - updated} created, {updated} updated).",
+        "_links": {resource: add_hateoas_links(request, resource) for resource in importer.imported},
+    })
+
+
+# --- Admin Endpoints ---
+
+@app.get("/admin/backends")
+async def backends_status():
+    """Circuit breaker, concurrency limit and counters for each backend."""
+    return JSONResponse(content={
+        "tasks": {**task_backend.snapshot(), "hedging": {"get_task": get_task_hedging.snapshot()}},
+        "users": {**user_backend.snapshot(), "hedging": {"get_user": get_user_hedging.snapshot()},
+                  "client": user_client.snapshot()},
+    })
+
+
+@app.get("/admin/metrics")
+async def gateway_metrics():
+    """Request metrics summed over all gateway workers, plus the per-worker rows."""
+    return JSONResponse(content={"worker": shared_state.state.worker, "pid": os.getpid(), **shared_state.state.metrics(),
+                                 "collection_cache": collection_cache.snapshot(), "tracing": tracer.snapshot()})
+
+
+# On-demand profiling of this gateway process (in multi-process mode: of the worker that
+# serves the request, see X-Profiled-Pid). Disabled unless GATEWAY_ADMIN_TOKEN is set.
+GATEWAY_ADMIN_TOKEN = os.environ.get("GATEWAY_ADMIN_TOKEN")
+
+@app.post("/admin/profile")
+async def profile_gateway(request: Request, seconds: float = None, interval_ms: float = None, idle: bool = False):
+    """Samples the gateway's stacks for 'seconds' and returns flamegraph-ready collapsed stacks."""
+    if not GATEWAY_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set GATEWAY_ADMIN_TOKEN).")
+    if not token_matches(GATEWAY_ADMIN_TOKEN, request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Missing or invalid X-Admin-Token.")
+    try:
+        seconds, interval = profile_settings(seconds, interval_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logging.info(f"Gateway: Profiling for {seconds:g}s every {interval * 1000:g}ms")
+    try:
+        # The sampler blocks, so it runs in a worker thread while the event loop keeps serving.
+        result = await asyncio.to_thread(sample_process, seconds, interval, idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return Response(content=result.collapsed(), media_type="text/plain", headers={
+        "X-Profile-Samples": str(result.samples),
+        "X-Profile-Idle-Samples": str(result.idle_samples),
+        "X-Profiled-Pid": str(os.getpid()),
+    })
+
+
 # Root endpoint for API Gateway documentation
 @app.get("/")
 async def root():
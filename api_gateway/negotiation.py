@@ -0,0 +1,86 @@
+# api_gateway/negotiation.py
+# Content negotiation for the gateway's read endpoints.
+# JSON stays the default (web_client). Internal consumers can ask for:
+# - application/x-protobuf: tasks are passed through as the gRPC backend's message bytes
+#   (tasks.ListTasksResponse / tasks.GetTaskResponse); users use users.proto messages.
+# - application/msgpack: the same document as the JSON body, MessagePack-encoded.
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import msgpack  # Optional: pip install msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+PROTOBUF = "application/x-protobuf"
+MSGPACK = "application/msgpack"
+
+# Alternative names clients use for the same formats
+_ALIASES = {
+    "application/protobuf": PROTOBUF,
+    "application/vnd.google.protobuf": PROTOBUF,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+SUPPORTED_MEDIA_TYPES = [JSON, PROTOBUF] + ([MSGPACK] if msgpack is not None else [])
+
+
+def negotiate_media_type(request: Request) -> str:
+    """Picks the response media type from the Accept header (q-values respected).
+    Falls back to JSON when nothing acceptable is supported, so browsers are never refused."""
+    header = request.headers.get("accept")
+    if not header:
+        return JSON
+    best, best_q = JSON, 0.0
+    for position, item in enumerate(header.split(",")):
+        media_range, *params = [part.strip() for part in item.split(";")]
+        media_range = _ALIASES.get(media_range.lower(), media_range.lower())
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_range in ("*/*", "application/*"):
+            candidate = JSON
+        elif media_range in SUPPORTED_MEDIA_TYPES:
+            candidate = media_range
+        else:
+            continue
+        # Strictly greater: on ties the earlier entry in the header wins.
+        if q > best_q:
+            best, best_q = candidate, q
+    return best
+
+
+def protobuf_media_type(message_type: str) -> str:
+    """Content-Type for a protobuf body, naming its message so clients know how to decode it."""
+    return f"{PROTOBUF}; messageType={message_type}"
+
+
+def content_type_for(media_type: str, message_type: str) -> str:
+    """Content-Type header value for a negotiated media type."""
+    return protobuf_media_type(message_type) if media_type == PROTOBUF else media_type
+
+
+def render(content: dict, media_type: str) -> bytes:
+    """Serializes a response document as JSON or MessagePack."""
+    if media_type == MSGPACK:
+        return msgpack.packb(content, use_bin_type=True)
+    return JSONResponse(content=content).body
+
+
+def document_response(content: dict, media_type: str, status_code: int = 200) -> Response:
+    """Response for a JSON-shaped document in the negotiated format (JSON or MessagePack)."""
+    if media_type == MSGPACK:
+        return Response(content=render(content, MSGPACK), status_code=status_code, media_type=MSGPACK,
+                        headers={"Vary": "Accept"})
+    return JSONResponse(content=content, status_code=status_code, headers={"Vary": "Accept"})
+
+
+def protobuf_response(body: bytes, message_type: str, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type=protobuf_media_type(message_type),
+                    headers={"Vary": "Accept"})
@@ -0,0 +1,147 @@
+# api_gateway/representation.py
+# Shapes the JSON/MessagePack documents for tasks and users:
+#   ?fields=id,title,status        sparse fieldsets (only the listed fields per item)
+#   ?links=none|collection|full    HATEOAS links: none, only the collection's, or per item too (default)
+# Link hrefs are built from templates formatted once per base URL, so a 100k-item list no longer
+# re-formats the base URL and five URLs for every item. The base URL is GATEWAY_PUBLIC_URL when
+# set; otherwise it comes from the request (and so from the client's Host header).
+import os
+from functools import lru_cache
+from operator import attrgetter
+
+from fastapi import HTTPException, Request
+
+TASK_FIELDS = ("id", "title", "description", "status", "created_by")
+USER_FIELDS = ("user_id", "name", "email")
+
+LINKS_NONE = "none"
+LINKS_COLLECTION = "collection"
+LINKS_FULL = "full"
+LINK_MODES = (LINKS_NONE, LINKS_COLLECTION, LINKS_FULL)
+
+PUBLIC_URL = os.environ.get("GATEWAY_PUBLIC_URL")
+
+
+class LinkTemplates:
+    """HATEOAS links for one base URL. The returned dicts may be shared between documents,
+    so callers must treat them as read-only."""
+
+    def __init__(self, base_url: str):
+        base = base_url.rstrip('/')
+        self._prefix = {"tasks": f"{base}/tasks", "users": f"{base}/users"}
+        self._item_prefix = {"tasks": f"{base}/tasks/", "users": f"{base}/users/"}
+        self._create = {
+            resource_type: {"href": href, "method": "POST"} for resource_type, href in self._prefix.items()
+        }
+        self._collection = {
+            resource_type: {"self": {"href": href, "method": "GET"}, "create": self._create[resource_type]}
+            for resource_type, href in self._prefix.items()
+        }
+
+    def collection(self, resource_type: str) -> dict:
+        return self._collection[resource_type]
+
+    def item(self, resource_type: str, resource_id) -> dict:
+        href = self._item_prefix[resource_type] + str(resource_id)
+        if resource_type == "tasks":
+            return {
+                "self": {"href": href, "method": "GET"},
+                "create": self._create["tasks"],
+                "update": {"href": href, "method": "PUT"},
+                "delete": {"href": href, "method": "DELETE"},
+                "get_by_id": {"href": href, "method": "GET"},
+            }
+        return {
+            "self": {"href": href, "method": "GET"},
+            "create": self._create[resource_type],
+            "get_by_id": {"href": href, "method": "GET"},
+        }
+
+
+@lru_cache(maxsize=64)
+def link_templates(base_url: str) -> LinkTemplates:
+    return LinkTemplates(base_url)
+
+
+def link_base(request: Request) -> str:
+    """Base URL of the HATEOAS links: GATEWAY_PUBLIC_URL, or the URL the request came in on."""
+    return PUBLIC_URL or str(request.base_url)
+
+
+def hateoas_links(request: Request, resource_type: str, resource_id: int = None) -> dict:
+    """Links for a collection (no resource_id) or for one item."""
+    templates = link_templates(link_base(request))
+    if resource_id:
+        return templates.item(resource_type, resource_id)
+    return templates.collection(resource_type)
+
+
+def requested_fields(request: Request, allowed: tuple):
+    """Fields listed in ?fields=, without duplicates and in the resource's own field order (so
+    'title,id' and 'id,title,id' share one cached body); None when the parameter is absent."""
+    raw = request.query_params.get("fields")
+    if raw is None:
+        return None
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = sorted(names.difference(allowed))
+    if not names or unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Invalid 'fields' parameter: {raw!r}. Allowed fields: {', '.join(allowed)}.")
+    return tuple(name for name in allowed if name in names)
+
+
+def requested_links(request: Request) -> str:
+    mode = request.query_params.get("links", LINKS_FULL).strip().lower()
+    if mode not in LINK_MODES:
+        raise HTTPException(status_code=400,
+                            detail=f"Invalid 'links' parameter: {mode!r}. Use one of: {', '.join(LINK_MODES)}.")
+    return mode
+
+
+def representation_key(request: Request, fields, links: str) -> str:
+    """Part of the collection cache variant that depends on ?fields=, ?links= and the link base.
+    The base only counts when links are written and GATEWAY_PUBLIC_URL is unset."""
+    base = "" if links == LINKS_NONE or PUBLIC_URL else str(request.base_url)
+    return f"{base}|{','.join(fields) if fields else '*'}|{links}"
+
+
+def task_projector(fields):
+    """Function turning a tasks_pb2.Task into its (possibly sparse) dict."""
+    if fields is None:
+        return lambda task: {
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "created_by": task.created_by,
+        }
+    getters = [(name, attrgetter(name)) for name in fields]
+    return lambda task: {name: get(task) for name, get in getters}
+
+
+def user_projector(fields):
+    """Function turning a parsed SOAP user dict into its (possibly sparse) dict."""
+    if fields is None:
+        return dict
+    return lambda user: {name: user[name] for name in fields}
+
+
+def collection_items(items, project, item_id, resource_type: str, links: str, templates: LinkTemplates) -> list:
+    """Projects every item and, with links=full, attaches its item links."""
+    if links != LINKS_FULL:
+        return [project(item) for item in items]
+    item_links = templates.item
+    documents = []
+    for item in items:
+        document = project(item)
+        document["_links"] = item_links(resource_type, item_id(item))
+        documents.append(document)
+    return documents
+
+
+def collection_document(key: str, items: list, message: str, resource_type: str, links: str,
+                        templates: LinkTemplates) -> dict:
+    document = {key: items, "message": message}
+    if links != LINKS_NONE:
+        document["_links"] = templates.collection(resource_type)
+    return document
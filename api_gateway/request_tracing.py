@@ -0,0 +1,125 @@
+# api_gateway/request_tracing.py
+# Tracing for the gateway (see the 'tracing' package in the project root):
+# - TracingMiddleware opens a server span per sampled request, continuing a client's
+#   'traceparent' if it sent one, and returns the trace ID in 'X-Trace-Id'.
+# - TracingClientInterceptor records a client span per gRPC call (unary or streaming) and sends
+#   the trace context to the TaskService in the 'traceparent' metadata key.
+# - SOAP/MessagePack-RPC calls are traced by user_client.py (SOAP header + HTTP header).
+# Configured from TRACE_EXPORT_FILE / TRACE_OTLP_ENDPOINT / TRACE_SAMPLE_RATIO /
+# TRACE_MAX_PER_SECOND; with neither a file nor an endpoint set, nothing is recorded.
+import asyncio
+import time
+
+import grpc
+
+from tracing import (
+    SPAN_KIND_CLIENT, TRACEPARENT_HEADER, parse_traceparent, reset_current_span,
+    set_current_span, tracer_from_env,
+)
+
+TRACE_ID_HEADER = b"x-trace-id"
+
+tracer = tracer_from_env("api-gateway")
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware; add it last so it wraps the other middlewares."""
+
+    def __init__(self, app, tracer=tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        parent = None
+        for name, value in scope.get("headers", []):
+            if name == TRACEPARENT_HEADER.encode():
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        span = self.tracer.start_server_span(f"{scope['method']} {scope['path']}", parent)
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error(f"HTTP {message['status']}")
+                message = {**message, "headers": [*message.get("headers", []), (TRACE_ID_HEADER, span.trace_id.encode())]}
+            await send(message)
+
+        token = set_current_span(span)
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except Exception as e:
+            span.set_error(repr(e))
+            raise
+        finally:
+            reset_current_span(token)
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                span.name = f"{scope['method']} {route.path}" # '/tasks/{task_id}' rather than '/tasks/7'
+            span.set_attribute("http.method", scope["method"])
+            span.set_attribute("http.target", scope["path"])
+            self.tracer.end_span(span)
+
+
+class _ClientCallTracing:
+    """Client span per gRPC call made inside a traced request. grpc.aio files an interceptor
+    under a single call type, so each type gets its own subclass below."""
+
+    def __init__(self, tracer=tracer):
+        self.tracer = tracer
+
+    async def _intercept(self, continuation, client_call_details, request):
+        span = self.tracer.start_child_span("", SPAN_KIND_CLIENT) if self.tracer.enabled else None
+        if span is None:
+            return await continuation(client_call_details, request)
+        method = client_call_details.method
+        method = (method.decode() if isinstance(method, bytes) else method).lstrip("/")
+        span.name = method
+        span.set_attribute("rpc.system", "grpc")
+        span.set_attribute("rpc.method", method)
+        metadata = grpc.aio.Metadata(*(client_call_details.metadata or ()))
+        metadata.add(TRACEPARENT_HEADER, span.traceparent())
+        details = grpc.aio.ClientCallDetails(client_call_details.method, client_call_details.timeout, metadata,
+                                             client_call_details.credentials, client_call_details.wait_for_ready)
+        call = await continuation(details, request)
+        # The span ends when the call does; code() and details() are coroutines on grpc.aio calls.
+        call.add_done_callback(lambda done_call: asyncio.ensure_future(self._finish(done_call, span)))
+        return call
+
+    async def _finish(self, call, span):
+        end_ns = time.time_ns()
+        code = await call.code()
+        span.set_attribute("rpc.grpc.status_code", code.value[0])
+        if code != grpc.StatusCode.OK:
+            span.set_error(f"{code.name}: {await call.details()}")
+        self.tracer.end_span(span, end_ns)
+
+
+class TracingClientInterceptor(_ClientCallTracing, grpc.aio.UnaryUnaryClientInterceptor):
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await self._intercept(continuation, client_call_details, request)
+
+
+class TracingUnaryStreamInterceptor(_ClientCallTracing, grpc.aio.UnaryStreamClientInterceptor):
+    """StreamTasks; the span covers the whole stream."""
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        return await self._intercept(continuation, client_call_details, request)
+
+
+class TracingStreamUnaryInterceptor(_ClientCallTracing, grpc.aio.StreamUnaryClientInterceptor):
+    """ImportTasks; the span covers the whole stream."""
+
+    async def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return await self._intercept(continuation, client_call_details, request_iterator)
+
+
+def client_interceptors(tracer=tracer) -> list:
+    """Interceptors tracing every call type the gateway makes to the TaskService."""
+    return [TracingClientInterceptor(tracer), TracingUnaryStreamInterceptor(tracer), TracingStreamUnaryInterceptor(tracer)]
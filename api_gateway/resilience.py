@@ -0,0 +1,271 @@
+# api_gateway/resilience.py
+# Resilience layer for the gateway's backend calls (gRPC TaskService and SOAP UserService).
+# Each backend gets:
+# - a circuit breaker: after too many failures in a rolling window, calls fail fast for a cooldown
+#   period instead of waiting for timeouts, then a few probe calls decide whether to close again;
+# - an adaptive concurrency limit (gradient/AIMD): the limit grows while latency stays near the
+#   best observed latency of the same operation and shrinks when latency rises or calls fail;
+# - load shedding: calls above the current limit wait in a small bounded queue for a free slot
+#   (at most LIMIT_QUEUE_WAIT_SECONDS, and never past the request deadline) and are rejected with
+#   503 + Retry-After when the queue is full or the wait runs out.
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+
+from fastapi import HTTPException
+
+LIMIT_QUEUE_SIZE = int(os.environ.get("GATEWAY_LIMIT_QUEUE_SIZE", "64"))
+LIMIT_QUEUE_WAIT_SECONDS = float(os.environ.get("GATEWAY_LIMIT_QUEUE_WAIT_MS", "250")) / 1000
+
+
+class BackendUnavailable(HTTPException):
+    """Raised instead of calling a backend that is failing or saturated (fast 503)."""
+
+    def __init__(self, backend: str, reason: str, retry_after: float):
+        self.backend = backend
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=503,
+            detail=f"{backend} unavailable ({reason}), retry in {self.retry_after}s.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker: closed -> open -> half_open -> closed."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, window: int = 20, min_calls: int = 10, failure_ratio: float = 0.5,
+                 open_seconds: float = 5.0, half_open_probes: int = 3):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self._outcomes = deque(maxlen=window) # True = failure
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. In half-open state only a few probes are let in."""
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def record(self, failed: bool):
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if failed:
+                self._open()
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(self.CLOSED)
+            return
+        self._outcomes.append(failed)
+        if (self.state == self.CLOSED and len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio):
+            self._open()
+
+    def release_probe(self):
+        """Frees a half-open probe slot for a call that ended without a verdict (e.g. cancelled)."""
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self.opened_count += 1
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        logging.warning(f"Gateway: circuit breaker {self.state} -> {state}")
+        self.state = state
+        self._outcomes.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def snapshot(self) -> dict:
+        failures = sum(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": failures,
+            "times_opened": self.opened_count,
+            "retry_after_s": round(self.retry_after(), 3) if self.state == self.OPEN else 0,
+        }
+
+
+class AdaptiveLimiter:
+    """
+    Gradient concurrency limit (in the spirit of Netflix's concurrency-limits):
+        new_limit = limit * (min_rtt * tolerance / rtt) + sqrt(limit)
+    smoothed, and multiplicatively decreased on failures (the "MD" of AIMD).
+    'min_rtt' is the best latency seen recently for the same operation (a full ListTasks is not
+    compared with a GetTask) and slowly decays so it can follow real changes.
+    Callers above the limit may wait for a slot in a bounded FIFO queue (acquire()).
+    """
+
+    def __init__(self, initial_limit: float = 20, min_limit: float = 2, max_limit: float = 200,
+                 tolerance: float = 2.0, smoothing: float = 0.2, backoff_ratio: float = 0.9,
+                 min_rtt_decay: float = 0.001, max_queue: int = LIMIT_QUEUE_SIZE):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff_ratio = backoff_ratio
+        self.min_rtt_decay = min_rtt_decay
+        self.max_queue = max_queue
+        self.min_rtts = {} # operation -> best recent latency
+        self.last_rtt = None
+        self.in_flight = 0
+        self.waited = 0 # Calls that had to queue for a slot
+        self._waiters = deque()
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    async def acquire(self, timeout: float) -> bool:
+        """Takes a slot, waiting up to 'timeout' seconds behind earlier waiters; False if the
+        queue is full or no slot came free in time."""
+        if not self._waiters and self.try_acquire():
+            return True
+        if timeout <= 0 or len(self._waiters) >= self.max_queue:
+            return False
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.waited += 1
+        timer = loop.call_later(timeout, lambda: waiter.done() or waiter.set_result(False))
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release() # Granted just before the cancellation: pass the slot on
+            raise
+        finally:
+            timer.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, rtt: float = None, failed: bool = False, operation: str = None):
+        """Returns a slot; 'rtt' is None for calls that should not move the limit (e.g. cancelled)."""
+        self.in_flight = max(0, self.in_flight - 1)
+        if failed:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif rtt is not None:
+            self._update(rtt, operation)
+        self._wake()
+
+    def _update(self, rtt: float, operation: str):
+        self.last_rtt = rtt
+        min_rtt = self.min_rtts.get(operation)
+        if min_rtt is None or rtt < min_rtt:
+            min_rtt = rtt
+        else:
+            min_rtt += (rtt - min_rtt) * self.min_rtt_decay
+        self.min_rtts[operation] = min_rtt
+        gradient = max(0.5, min(1.0, min_rtt * self.tolerance / rtt))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        smoothed = self.limit * (1 - self.smoothing) + target * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, smoothed))
+
+    def _wake(self):
+        """Hands free slots to the oldest waiters."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(True)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "waited_total": self.waited,
+            "min_rtt_ms": {operation: round(rtt * 1000, 3) for operation, rtt in self.min_rtts.items()},
+            "last_rtt_ms": round(self.last_rtt * 1000, 3) if self.last_rtt is not None else None,
+        }
+
+
+class Backend:
+    """Circuit breaker + adaptive limiter + counters for one backend service."""
+
+    def __init__(self, name: str, is_failure, breaker: CircuitBreaker = None, limiter: AdaptiveLimiter = None,
+                 shed_retry_after: float = 1.0, max_wait: float = LIMIT_QUEUE_WAIT_SECONDS, time_left=None):
+        self.name = name
+        self.is_failure = is_failure # callable(exception or None, result) -> bool
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.shed_retry_after = shed_retry_after
+        self.max_wait = max_wait
+        self.time_left = time_left # callable() -> seconds left of the request's deadline, or None
+        self.counters = {"calls": 0, "succeeded": 0, "failed": 0, "rejected_open": 0, "shed": 0}
+
+    async def call(self, make_call, operation: str = None):
+        """Runs 'await make_call()' under the breaker and the limiter. 'operation' names the call
+        (e.g. "GetTask") so the limiter compares its latency with the same operation's."""
+        if not self.breaker.allow():
+            self.counters["rejected_open"] += 1
+            raise BackendUnavailable(self.name, "circuit open", self.breaker.retry_after())
+        if not await self._acquire():
+            self.breaker.release_probe()
+            self.counters["shed"] += 1
+            raise BackendUnavailable(self.name, "overloaded", self.shed_retry_after)
+
+        self.counters["calls"] += 1
+        started = time.perf_counter()
+        try:
+            result = await make_call()
+        except BaseException as e:
+            if isinstance(e, Exception) and self.is_failure(e, None):
+                self._finish(started, operation, failed=True)
+            else:
+                # Cancellations and application-level errors (e.g. NotFound) say nothing about health.
+                self.limiter.release()
+                if isinstance(e, Exception):
+                    self.breaker.record(False)
+                else:
+                    self.breaker.release_probe()
+            raise
+        self._finish(started, operation, failed=self.is_failure(None, result))
+        return result
+
+    async def _acquire(self) -> bool:
+        wait = self.max_wait
+        if self.time_left is not None:
+            wait = min(wait, self.time_left()) # No point waiting past the request's deadline
+        try:
+            return await self.limiter.acquire(wait)
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+
+    def _finish(self, started: float, operation: str, failed: bool):
+        self.counters["failed" if failed else "succeeded"] += 1
+        self.limiter.release(time.perf_counter() - started, failed=failed, operation=operation)
+        self.breaker.record(failed)
+
+    def snapshot(self) -> dict:
+        return {"circuit": self.breaker.snapshot(), "concurrency": self.limiter.snapshot(), "counters": dict(self.counters)}
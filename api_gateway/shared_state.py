@@ -0,0 +1,164 @@
+# api_gateway/shared_state.py
+# State shared between gateway worker processes (see workers.py) through one shared-memory
+# segment created by the master before it forks:
+# - metrics: one row of int64 counters per worker. Each worker writes only its own row, so no
+#   locking is needed; any worker can sum all rows for the aggregated view.
+# - cache invalidation: a ring buffer of (sequence, resource) messages. A worker that changes
+#   tasks or users publishes a message; the others drop their cached collection bodies when
+#   they next see a newer sequence number.
+# In single-process mode (plain 'uvicorn main:app') the same layout lives in a local buffer.
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+METRICS = [
+    "requests", "in_flight", "status_2xx", "status_3xx", "status_4xx", "status_5xx",
+    "latency_us_total", "invalidations_published", "invalidations_applied",
+]
+_METRIC_INDEX = {name: i for i, name in enumerate(METRICS)}
+
+RESOURCES = ["tasks", "users"]
+_RESOURCE_CODES = {name: i + 1 for i, name in enumerate(RESOURCES)}
+
+RING_SIZE = 256
+_HEADER_WORDS = 4 # [workers, invalidation sequence, reserved, reserved]
+_SEQ = 1
+
+
+class SharedState:
+    def __init__(self, workers: int = 1, shm: shared_memory.SharedMemory = None, lock=None):
+        self.workers = workers
+        self._words = _HEADER_WORDS + workers * len(METRICS) + RING_SIZE * 2
+        self._shm = shm
+        if shm is not None:
+            self._buffer = shm.buf
+        else:
+            self._buffer = bytearray(self._words * 8)
+        self._q = memoryview(self._buffer).cast("q")
+        self._lock = lock or multiprocessing.Lock()
+        self.worker = 0
+        self.started_at = time.time()
+        self._last_seen_seq = 0
+        self._q[0] = workers
+
+    @classmethod
+    def create_shared(cls, workers: int):
+        """Creates the shared segment; call in the master process before forking workers."""
+        words = _HEADER_WORDS + workers * len(METRICS) + RING_SIZE * 2
+        shm = shared_memory.SharedMemory(create=True, size=words * 8)
+        shm.buf[:words * 8] = bytes(words * 8)
+        return cls(workers, shm=shm, lock=multiprocessing.Lock())
+
+    @property
+    def is_shared(self) -> bool:
+        return self._shm is not None
+
+    def set_worker(self, index: int):
+        """Called in each worker right after fork."""
+        self.worker = index
+        self._last_seen_seq = self._q[_SEQ]
+
+    def close(self, unlink: bool = False):
+        if self._shm is None:
+            return
+        self._q.release()
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+    # --- Metrics ---
+
+    def _slot(self, worker: int, metric: str) -> int:
+        return _HEADER_WORDS + worker * len(METRICS) + _METRIC_INDEX[metric]
+
+    def add(self, metric: str, value: int = 1):
+        self._q[self._slot(self.worker, metric)] += value
+
+    def metrics(self) -> dict:
+        per_worker = [
+            {name: self._q[self._slot(worker, name)] for name in METRICS}
+            for worker in range(self.workers)
+        ]
+        total = {name: sum(row[name] for row in per_worker) for name in METRICS}
+        requests = total["requests"] - total["in_flight"]
+        total["mean_latency_ms"] = round(total["latency_us_total"] / requests / 1000, 3) if requests else None
+        return {"workers": self.workers, "shared": self.is_shared, "total": total, "per_worker": per_worker}
+
+    # --- Cache invalidation messages ---
+
+    def _ring_slot(self, seq: int) -> int:
+        return _HEADER_WORDS + self.workers * len(METRICS) + (seq % RING_SIZE) * 2
+
+    def publish_invalidation(self, resource: str):
+        with self._lock:
+            seq = self._q[_SEQ] + 1
+            slot = self._ring_slot(seq)
+            self._q[slot] = seq
+            self._q[slot + 1] = _RESOURCE_CODES[resource]
+            self._q[_SEQ] = seq
+        # Our own cache was already invalidated by the caller, so our message can be skipped, but
+        # only when nothing else came in since we last looked: otherwise the cursor stays put and
+        # pending_invalidations() applies the other workers' messages (and ours again, harmlessly).
+        if seq == self._last_seen_seq + 1:
+            self._last_seen_seq = seq
+        self.add("invalidations_published")
+
+    def pending_invalidations(self):
+        """Resources invalidated by other workers since the last call (cheap when none)."""
+        latest = self._q[_SEQ]
+        if latest == self._last_seen_seq:
+            return set()
+        first = self._last_seen_seq + 1
+        self._last_seen_seq = latest
+        if latest - first >= RING_SIZE:
+            return set(RESOURCES) # Fell behind the ring: drop everything
+        resources = set()
+        with self._lock:
+            for seq in range(first, latest + 1):
+                slot = self._ring_slot(seq)
+                if self._q[slot] == seq:
+                    resources.add(RESOURCES[self._q[slot + 1] - 1])
+        self.add("invalidations_applied", len(resources))
+        return resources
+
+
+# The process-wide instance. workers.py replaces it with a shared one before importing main.
+state = SharedState()
+
+
+def install(shared: SharedState):
+    global state
+    state = shared
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: records request metrics and applies pending cache invalidations."""
+
+    def __init__(self, app, on_invalidate):
+        self.app = app
+        self.on_invalidate = on_invalidate # callable(resource)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        for resource in state.pending_invalidations():
+            self.on_invalidate(resource)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def record_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        state.add("requests")
+        state.add("in_flight")
+        try:
+            await self.app(scope, receive, record_send)
+        finally:
+            state.add("in_flight", -1)
+            state.add(f"status_{min(status // 100, 5)}xx" if status >= 200 else "status_5xx")
+            state.add("latency_us_total", int((time.perf_counter() - started) * 1_000_000))
@@ -0,0 +1,294 @@
+# api_gateway/user_client.py
+# Client for the UserService (soap_user_service/service.py).
+#
+# Both ends are ours, so the gateway prefers the service's MessagePack-RPC endpoint ('/msgpack',
+# the same Spyne UserService with MessagePackRpc in/out protocols) over SOAP 1.1 envelopes.
+# If that endpoint is missing (an older service answers it with a SOAP fault) or msgpack is not
+# installed, calls fall back to SOAP, and MessagePack-RPC is retried after USER_RPC_RETRY_SECONDS.
+# The public SOAP endpoint and its WSDL are unchanged.
+#
+# Calls made inside a traced request get a client span, and the trace context travels in a
+# 'traceparent' SOAP header (read raw by the service, so it is not part of the WSDL) and in the
+# 'traceparent' HTTP header (the only place MessagePack-RPC has for it).
+#
+# Request encoding and response parsing are plain functions so benchmarks/user_protocols.py can
+# measure them without a network.
+import itertools
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+import httpx
+
+from http_cache import IF_NONE_MATCH_VERSION_HEADER, NOT_MODIFIED_HEADER, STORE_VERSION_HEADER
+from request_tracing import tracer
+from tracing import SPAN_KIND_CLIENT, TRACEPARENT_HEADER
+
+try:
+    import msgpack  # Optional: pip install msgpack
+except ImportError:
+    msgpack = None
+
+USER_RPC_ENABLED = os.environ.get("GATEWAY_USER_RPC", "true").lower() in ("1", "true", "yes")
+USER_RPC_RETRY_SECONDS = float(os.environ.get("GATEWAY_USER_RPC_RETRY_S", "60"))
+
+SOAP = "soap"
+MSGPACK_RPC = "msgpack-rpc"
+SOAP_CONTENT_TYPE = "text/xml; charset=utf-8"
+RPC_CONTENT_TYPE = "application/x-msgpack"
+RPC_PATH = "msgpack"
+# Namespace of the User type: TYPES_NAMESPACE in soap_user_service/service.py, pinned there so it does
+# not depend on how the service module was loaded
+SOAP_TYPES_NAMESPACE = "urn:user.service.soap"
+
+# msgpack-rpc message types
+RPC_REQUEST, RPC_RESPONSE, RPC_ERROR = 0, 1, 3
+
+SOAP_ENVELOPE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="urn:user.service.soap">{header}
+  <soap:Body>
+    <tns:{operation}>{params}</tns:{operation}>
+  </soap:Body>
+</soap:Envelope>"""
+
+UserList = namedtuple("UserList", "users version not_modified")
+
+
+class UserServiceFault(Exception):
+    """A fault (SOAP Fault or msgpack-rpc error) or unexpected HTTP answer from the UserService."""
+
+    def __init__(self, status_code: int, faultcode: str, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.faultcode = faultcode or ""
+
+    @property
+    def not_found(self) -> bool:
+        return self.faultcode.endswith("ResourceNotFound")
+
+
+# --- SOAP 1.1 ---
+
+def _soap_user(user: dict) -> str:
+    fields = "".join(f"<s0:{name}>{escape(str(value))}</s0:{name}>" for name, value in user.items() if value is not None)
+    return f"<s0:User>{fields}</s0:User>"
+
+
+def _soap_param(name: str, value) -> str:
+    if isinstance(value, list) and all(isinstance(item, int) for item in value): # Array(Integer), e.g. get_users
+        return f'<tns:{name}>{"".join(f"<tns:integer>{item}</tns:integer>" for item in value)}</tns:{name}>'
+    if isinstance(value, list): # Array(User), e.g. import_users
+        return f'<tns:{name} xmlns:s0="{SOAP_TYPES_NAMESPACE}">{"".join(map(_soap_user, value))}</tns:{name}>'
+    return f"<tns:{name}>{escape(str(value))}</tns:{name}>"
+
+
+def soap_request(operation: str, params: dict, traceparent: str = None) -> bytes:
+    """SOAP envelope for an operation; parameter values are XML-escaped and lists are sent as
+    arrays of integers or of User. With 'traceparent' the envelope carries the trace context in a SOAP header."""
+    body = "".join(_soap_param(name, value) for name, value in params.items())
+    header = (f"\n  <soap:Header><tns:{TRACEPARENT_HEADER}>{escape(traceparent)}</tns:{TRACEPARENT_HEADER}></soap:Header>"
+              if traceparent else "")
+    return SOAP_ENVELOPE.format(header=header, operation=operation, params=body).encode()
+
+
+def parse_soap_users(soap_response_xml):
+    """
+    Extracts every User from a Spyne SOAP response (get_user, create_user or list_users).
+    Spyne qualifies the User fields with a namespace prefix (e.g. <s0:user_id>), so the
+    fields are matched by local name with a real XML parser instead of substring searches.
+    """
+    if isinstance(soap_response_xml, str):
+        soap_response_xml = soap_response_xml.encode()
+    users = []
+    for element in ET.fromstring(soap_response_xml).iter():
+        fields = {child.tag.rsplit('}', 1)[-1]: child.text for child in element}
+        if fields.get('user_id'):
+            users.append({
+                "user_id": int(fields['user_id']),
+                "name": fields.get('name') or "",
+                "email": fields.get('email') or "",
+            })
+    return users
+
+
+def _import_result(fields: dict) -> dict:
+    """import_users' ImportResult as {"imported", "created", "updated"} counts."""
+    return {key: int(fields.get(key) or 0) for key in ("imported", "created", "updated")}
+
+
+def parse_soap_import_result(soap_response_xml) -> dict:
+    for element in ET.fromstring(soap_response_xml).iter():
+        fields = {child.tag.rsplit('}', 1)[-1]: child.text for child in element}
+        if "created" in fields:
+            return _import_result(fields)
+    return _import_result({})
+
+
+def parse_soap_response(status_code: int, content: bytes, operation: str = None) -> list:
+    if status_code == 200:
+        if operation == "import_users":
+            return [parse_soap_import_result(content)]
+        return parse_soap_users(content)
+    try:
+        fields = {element.tag.rsplit('}', 1)[-1]: element.text for element in ET.fromstring(content).iter()}
+    except ET.ParseError:
+        fields = {}
+    if "faultstring" not in fields:
+        raise UserServiceFault(status_code, "", content.decode(errors="replace")[:500])
+    raise UserServiceFault(status_code, (fields.get("faultcode") or "").split(":")[-1], fields["faultstring"])
+
+
+# --- MessagePack-RPC ---
+
+def rpc_request(operation: str, params: dict, msgid: int = 0) -> bytes:
+    """msgpack-rpc request [0, msgid, method, [positional params]]."""
+    return msgpack.packb([RPC_REQUEST, msgid, operation, list(params.values())], use_bin_type=True)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _rpc_user(document: dict) -> dict:
+    user = {_text(key): _text(value) for key, value in document.items()}
+    return {"user_id": user.get("user_id"), "name": user.get("name") or "", "email": user.get("email") or ""}
+
+
+def parse_rpc_response(operation: str, status_code: int, content: bytes) -> list:
+    # Spyne answers [1, msgid, None, {"<operation>Result": value}] or, for faults,
+    # [3, msgid, {"faultcode": ..., "faultstring": ...}].
+    message = msgpack.unpackb(content, raw=False)
+    error = message[2]
+    if error:
+        error = {_text(key): _text(value) for key, value in error.items()} if isinstance(error, dict) else {}
+        raise UserServiceFault(status_code, error.get("faultcode", ""), error.get("faultstring", "MessagePack-RPC error"))
+    result = message[3] if len(message) > 3 else None
+    if isinstance(result, dict):
+        result = {_text(key): value for key, value in result.items()}.get(f"{operation}Result")
+    if operation == "import_users":
+        return [_import_result({_text(key): value for key, value in (result or {}).items()})]
+    if isinstance(result, dict):
+        return [_rpc_user(result)]
+    if isinstance(result, list):
+        return [_rpc_user(user) for user in result]
+    return [] # None
+
+
+class UserServiceClient:
+    """UserService operations over MessagePack-RPC, falling back to SOAP.
+    Every HTTP call goes through 'backend' (circuit breaker and concurrency limit) with the
+    timeout returned by 'timeout()' (the request's remaining deadline)."""
+
+    def __init__(self, soap_address: str, backend, timeout, rpc_address: str = None):
+        self.soap_address = soap_address
+        self.rpc_address = rpc_address or f"{soap_address.rstrip('/')}/{RPC_PATH}"
+        self.backend = backend
+        self.timeout = timeout
+        self.http = None
+        self._msgids = itertools.count(1)
+        self._rpc_retry_at = 0.0 if (USER_RPC_ENABLED and msgpack is not None) else float("inf")
+        self.calls = {SOAP: 0, MSGPACK_RPC: 0}
+
+    async def connect(self):
+        # One pooled client for all calls: building an AsyncClient per request costs a TLS
+        # context and a new connection every time.
+        self.http = httpx.AsyncClient()
+        logging.info(f"Gateway: Using User Service at {self.soap_address} (protocol: {self.protocol})")
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+
+    @property
+    def protocol(self) -> str:
+        return MSGPACK_RPC if time.monotonic() >= self._rpc_retry_at else SOAP
+
+    def snapshot(self) -> dict:
+        return {"protocol": self.protocol, "rpc_address": self.rpc_address, "calls": dict(self.calls)}
+
+    async def get_user(self, user_id: int):
+        """The user dict, or None if the service has no user with this ID."""
+        try:
+            users, _ = await self._call("get_user", {"user_id": user_id})
+        except UserServiceFault as e:
+            if e.not_found:
+                return None
+            raise
+        return users[0] if users else None
+
+    async def get_users(self, user_ids: list) -> dict:
+        """{user_id: user dict} for the given IDs in one call; IDs without a user are missing."""
+        users, _ = await self._call("get_users", {"user_ids": [int(user_id) for user_id in user_ids]})
+        return {user["user_id"]: user for user in users}
+
+    async def list_users(self, if_none_match_version: str = None) -> UserList:
+        """All users plus the store version; with 'if_none_match_version' still current the
+        service sends no users and not_modified is True."""
+        headers = {IF_NONE_MATCH_VERSION_HEADER: if_none_match_version} if if_none_match_version else None
+        users, response = await self._call("list_users", {}, headers)
+        return UserList(users, response.headers.get(STORE_VERSION_HEADER),
+                        response.headers.get(NOT_MODIFIED_HEADER) == "true")
+
+    async def create_user(self, name: str, email: str) -> dict:
+        users, _ = await self._call("create_user", {"name": name, "email": email})
+        if not users:
+            raise UserServiceFault(200, "", "create_user returned no user.")
+        return users[0]
+
+    async def list_users_page(self, after_id: int, limit: int) -> list:
+        """Up to 'limit' users with an ID above 'after_id', in ID order (bulk export)."""
+        users, _ = await self._call("list_users_page", {"after_id": after_id, "limit": limit})
+        return users
+
+    async def import_users(self, users: list) -> dict:
+        """Imports a batch of user dicts (bulk import); users with a user_id keep it, replacing an
+        existing user. The {"imported", "created", "updated"} counts of the batch."""
+        users = [{"user_id": user.get("user_id"), "name": user["name"], "email": user["email"]} for user in users]
+        results, _ = await self._call("import_users", {"users": users})
+        return results[0]
+
+    async def _post(self, operation, address, content, content_type, headers):
+        request_headers = {"Content-Type": content_type, **(headers or {})}
+        return await self.backend.call(lambda: self.http.post(
+            address, headers=request_headers, content=content, timeout=self.timeout()), operation)
+
+    async def _call(self, operation: str, params: dict, headers: dict = None):
+        span = tracer.start_child_span(f"UserService/{operation}", SPAN_KIND_CLIENT) if tracer.enabled else None
+        if span is None:
+            return await self._send(operation, params, headers)
+        span.set_attribute("rpc.service", "UserService")
+        span.set_attribute("rpc.method", operation)
+        try:
+            result = await self._send(operation, params, headers, span)
+        except Exception as e:
+            span.set_error(repr(e))
+            raise
+        finally:
+            tracer.end_span(span)
+        return result
+
+    async def _send(self, operation: str, params: dict, headers: dict = None, span=None):
+        traceparent = None
+        if span is not None:
+            traceparent = span.traceparent()
+            headers = {**(headers or {}), TRACEPARENT_HEADER: traceparent}
+        if self.protocol == MSGPACK_RPC:
+            response = await self._post(operation, self.rpc_address, rpc_request(operation, params, next(self._msgids)),
+                                        RPC_CONTENT_TYPE, headers)
+            if response.headers.get("content-type", "").startswith(RPC_CONTENT_TYPE):
+                self.calls[MSGPACK_RPC] += 1
+                if span is not None:
+                    span.set_attribute("rpc.system", MSGPACK_RPC)
+                return parse_rpc_response(operation, response.status_code, response.content), response
+            self._rpc_retry_at = time.monotonic() + USER_RPC_RETRY_SECONDS
+            logging.warning(f"Gateway: User Service has no MessagePack-RPC endpoint at {self.rpc_address} "
+                            f"(HTTP {response.status_code}); using SOAP for {USER_RPC_RETRY_SECONDS:.0f}s.")
+        response = await self._post(operation, self.soap_address, soap_request(operation, params, traceparent),
+                                    SOAP_CONTENT_TYPE, headers)
+        self.calls[SOAP] += 1
+        if span is not None:
+            span.set_attribute("rpc.system", SOAP)
+        return parse_soap_response(response.status_code, response.content, operation), response
@@ -0,0 +1,134 @@
+# api_gateway/workers.py
+# Multi-process mode for the API Gateway (Linux/macOS).
+#
+#   python workers.py --workers 4 --host 0.0.0.0 --port 8000
+#
+# The master process:
+#   1. creates the shared-memory segment for metrics and cache invalidation (shared_state.py);
+#   2. imports main.py once ("preload"), so workers share its pages copy-on-write;
+#   3. forks N workers and restarts any that die.
+# Each worker binds its own SO_REUSEPORT socket (the kernel balances connections between them)
+# or, where SO_REUSEPORT is unavailable, accepts on a socket inherited from the master.
+# Backend channels (grpc.aio, httpx) are created per worker in main.py's lifespan hook,
+# i.e. after the fork, since gRPC channels must not cross a fork.
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+gateway_path = os.path.abspath(os.path.dirname(__file__))
+if gateway_path not in sys.path:
+    sys.path.insert(0, gateway_path)
+
+import shared_state
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Minimum time between restarts of the same worker slot, to avoid a crash loop.
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+def make_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(index: int, app, args, inherited_socket):
+    """Body of a forked worker process; never returns."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    shared_state.state.set_worker(index)
+    sock = inherited_socket or make_socket(args.host, args.port, reuse_port=True)
+    config = uvicorn.Config(app, log_level=args.log_level, access_log=False)
+    server = uvicorn.Server(config)
+    logging.info(f"Gateway worker {index} (pid {os.getpid()}) serving on {args.host}:{args.port}")
+    exit_code = 0
+    try:
+        server.run(sockets=[sock])
+    except Exception as e:
+        logging.error(f"Gateway worker {index} crashed: {e}")
+        exit_code = 1
+    finally:
+        os._exit(exit_code) # Skip the master's atexit handlers (e.g. shared memory cleanup)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API Gateway with several worker processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        sys.exit("Multi-process mode needs os.fork (Linux/macOS). "
+                 "On Windows run: python -m uvicorn main:app --workers N")
+
+    shared = shared_state.SharedState.create_shared(args.workers)
+    shared_state.install(shared)
+
+    from main import app # Preload: imported once in the master, inherited by every worker
+
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    inherited_socket = None if reuse_port else make_socket(args.host, args.port, reuse_port=False)
+    logging.info(f"Gateway master (pid {os.getpid()}): starting {args.workers} workers "
+                 f"({'SO_REUSEPORT' if reuse_port else 'shared listening socket'}).")
+
+    workers = {} # pid -> worker index
+    last_start = {}
+    stopping = False
+
+    def spawn(index: int):
+        last_start[index] = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            run_worker(index, app, args, inherited_socket)
+        workers[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for index in range(args.workers):
+        spawn(index)
+
+    try:
+        while workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = workers.pop(pid, None)
+            if index is None or stopping:
+                continue
+            logging.warning(f"Gateway worker {index} (pid {pid}) exited with status {status}; restarting.")
+            time.sleep(max(0.0, last_start[index] + RESTART_BACKOFF_SECONDS - time.monotonic()))
+            spawn(index)
+    finally:
+        shared.close(unlink=True)
+        logging.info("Gateway master: all workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Load-testing and benchmark suite for the API Gateway.
+# Run with: python -m benchmarks.run --help
@@ -0,0 +1,269 @@
+# benchmarks/backends.py
+# Local stand-ins for the gateway backends, so benchmarks run without Go or RabbitMQ.
+# - TaskService: grpc.aio fake implementing tasks.proto over an in-memory dict (listed in ID order, like Go).
+# - UserService: the real Spyne 'service_app' (SOAP + MessagePack-RPC) from soap_user_service/service.py.
+# Backends runs each of them in a child process.
+import asyncio
+import bisect
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PYTHON_CLIENT_DIR = os.path.join(ROOT_DIR, 'python_client')
+SOAP_SERVICE_DIR = os.path.join(ROOT_DIR, 'soap_user_service')
+MAX_TASK_ID = 2**31 - 2  # maxTaskID in go_server/main.go
+
+
+def free_port():
+    """Asks the OS for a free TCP port on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15.0):
+    """Blocks until something accepts connections on localhost:port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"Nothing listening on port {port} after {timeout}s")
+
+
+# --- Fake gRPC Task Service ---
+
+def _import_grpc_modules():
+    if PYTHON_CLIENT_DIR not in sys.path:
+        sys.path.append(PYTHON_CLIENT_DIR)
+    import grpc
+    import tasks_pb2
+    import tasks_pb2_grpc
+    return grpc, tasks_pb2, tasks_pb2_grpc
+
+
+def _make_fake_task_servicer(grpc, tasks_pb2, tasks_pb2_grpc):
+    class FakeTaskService(tasks_pb2_grpc.TaskServiceServicer):
+        """Mirrors the behaviour of go_server/main.go, without logging or email."""
+
+        def __init__(self, seed_tasks=0, latency=None, seed_users=0):
+            # latency: (base_ms, slow_ms, slow_ratio) injected before every answer, to model a
+            # backend with a latency tail; None answers immediately.
+            self.latency = latency
+            self.tasks = {}
+            self.ids = []  # Task IDs in ascending order, like the Go server's index
+            self.next_id = 1
+            self.epoch = time.time_ns()
+            self.version = 0
+            # Seeded tasks are created by the seeded users (IDs 1..seed_users), so ?expand=created_by
+            # resolves every reference; without seeded users created_by is free text.
+            for i in range(seed_tasks):
+                created_by = str(i % seed_users + 1) if seed_users else "seed"
+                self._create(f"Task {i + 1}", f"Seeded task number {i + 1}", created_by)
+
+        def _create(self, title, description, created_by):
+            task = tasks_pb2.Task(id=self.next_id, title=title, description=description,
+                                  status="pendente", created_by=created_by)
+            self.tasks[self.next_id] = task
+            self.ids.append(self.next_id)
+            self.next_id += 1
+            self.version += 1
+            return task
+
+        def store_version(self):
+            return f"{self.epoch:x}.{self.version}"
+
+        async def _simulate_latency(self):
+            if self.latency is None:
+                return
+            base_ms, slow_ms, slow_ratio = self.latency
+            delay_ms = slow_ms if random.random() < slow_ratio else base_ms
+            if delay_ms > 0:
+                await asyncio.sleep(delay_ms / 1000)
+
+        async def CreateTask(self, request, context):
+            await self._simulate_latency()
+            task = self._create(request.title, request.description, request.created_by)
+            return tasks_pb2.CreateTaskResponse(task=task, message="Task created successfully!")
+
+        async def ListTasks(self, request, context):
+            await self._simulate_latency()
+            version = self.store_version()
+            known = dict(context.invocation_metadata()).get("x-if-none-match-version")
+            if known == version:
+                await context.send_initial_metadata((("x-store-version", version), ("x-not-modified", "true")))
+                return tasks_pb2.ListTasksResponse(message="Not modified.")
+            await context.send_initial_metadata((("x-store-version", version),))
+            tasks = [self.tasks[task_id] for task_id in self.ids]  # ID order, like the Go server
+            return tasks_pb2.ListTasksResponse(tasks=tasks, message=f"{len(tasks)} tasks found.")
+
+        async def UpdateTask(self, request, context):
+            await self._simulate_latency()
+            task = self.tasks.get(request.id)
+            if task is None:
+                await context.abort(grpc.StatusCode.NOT_FOUND, f"Task with ID {request.id} not found")
+            if request.title:
+                task.title = request.title
+            if request.description:
+                task.description = request.description
+            if request.status:
+                task.status = request.status
+            self.version += 1
+            return tasks_pb2.UpdateTaskResponse(task=task, message="Task updated successfully!")
+
+        async def DeleteTask(self, request, context):
+            await self._simulate_latency()
+            if self.tasks.pop(request.id, None) is None:
+                await context.abort(grpc.StatusCode.NOT_FOUND, f"Task with ID {request.id} not found")
+            del self.ids[bisect.bisect_left(self.ids, request.id)]
+            self.version += 1
+            return tasks_pb2.DeleteTaskResponse(success=True,
+                                                message=f"Task with ID {request.id} deleted successfully!")
+
+        async def GetTask(self, request, context):
+            await self._simulate_latency()
+            task = self.tasks.get(request.id)
+            if task is None:
+                await context.abort(grpc.StatusCode.NOT_FOUND, f"Task with ID {request.id} not found")
+            return tasks_pb2.GetTaskResponse(task=task, message=f"Task with ID {request.id} found.")
+
+        async def SendTasksByEmail(self, request, context):
+            await self._simulate_latency()
+            return tasks_pb2.SendTasksByEmailResponse(success=False, message="Email disabled in benchmarks.")
+
+        async def StreamTasks(self, request, context):
+            page_size = min(request.page_size or 500, 5000)
+            after_id = request.after_id
+            while True:
+                start = bisect.bisect_right(self.ids, after_id)
+                page = [self.tasks[task_id] for task_id in self.ids[start:start + page_size]]
+                if not page:
+                    break
+                after_id = page[-1].id
+                yield tasks_pb2.ListTasksResponse(tasks=page)
+
+        async def ImportTasks(self, request_iterator, context):
+            created = updated = 0
+            async for request in request_iterator:
+                next_id = self.next_id
+                for position, task in enumerate(request.tasks, 1):
+                    if not 0 <= task.id <= MAX_TASK_ID:
+                        await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                            f"Task {position} of the batch: ID {task.id} is outside 1..{MAX_TASK_ID} "
+                                            f"(0 assigns a new ID) ({created + updated} tasks imported before this batch)")
+                    if task.id == 0 and next_id > MAX_TASK_ID:
+                        await context.abort(grpc.StatusCode.OUT_OF_RANGE,
+                                            f"Task {position} of the batch: no task IDs left above {MAX_TASK_ID} "
+                                            f"({created + updated} tasks imported before this batch)")
+                    next_id = max(next_id, (task.id or next_id) + 1)
+                for task in request.tasks:
+                    task_id = task.id or self.next_id
+                    self.next_id = max(self.next_id, task_id + 1)
+                    if task_id in self.tasks:
+                        updated += 1
+                    else:
+                        created += 1
+                        bisect.insort(self.ids, task_id)
+                    self.tasks[task_id] = tasks_pb2.Task(id=task_id, title=task.title, description=task.description,
+                                                         status=task.status or "pendente", created_by=task.created_by)
+                if request.tasks:
+                    self.version += 1
+            imported = created + updated
+            return tasks_pb2.ImportTasksResponse(imported=imported, created=created, updated=updated,
+                                                 message=f"{imported} tasks imported ({created} created, {updated} updated).")
+
+    return FakeTaskService
+
+
+async def serve_fake_task_service(port, seed_tasks=0, latency=None, seed_users=0):
+    """Runs the grpc.aio fake TaskService until cancelled."""
+    grpc, tasks_pb2, tasks_pb2_grpc = _import_grpc_modules()
+    servicer_cls = _make_fake_task_servicer(grpc, tasks_pb2, tasks_pb2_grpc)
+    server = grpc.aio.server()
+    tasks_pb2_grpc.add_TaskServiceServicer_to_server(servicer_cls(seed_tasks, latency, seed_users), server)
+    server.add_insecure_port(f'127.0.0.1:{port}')
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(grace=None)
+
+
+def _run_fake_task_service(port, seed_tasks, latency, seed_users):
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(serve_fake_task_service(port, seed_tasks, latency, seed_users))
+
+
+# --- Real Spyne User Service ---
+
+def _run_soap_service(port, seed_users):
+    if SOAP_SERVICE_DIR not in sys.path:
+        sys.path.append(SOAP_SERVICE_DIR)
+    import service  # soap_user_service/service.py
+    from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    with service.users_lock:
+        for user_id in range(1, seed_users + 1):
+            service.users_db[user_id] = service.User(user_id=user_id, name=f"User {user_id}",
+                                                     email=f"user{user_id}@example.com")
+            service.user_ids.append(user_id)
+        service.next_user_id = seed_users + 1
+        service.users_version += seed_users
+
+    server = make_server('127.0.0.1', port, service.service_app,
+                         server_class=service.ThreadingWSGIServer, handler_class=QuietHandler)
+    server.serve_forever()
+
+
+class Backends:
+    """Starts both backend stand-ins in child processes, so they do not share a GIL
+    with the load generator. Use as a context manager."""
+
+    def __init__(self, seed_tasks=100, seed_users=20, task_latency=None):
+        self.seed_tasks = seed_tasks
+        self.seed_users = seed_users
+        self.task_latency = task_latency
+        self.grpc_port = free_port()
+        self.soap_port = free_port()
+        self._processes = []
+
+    @property
+    def env(self):
+        """Environment variables pointing the gateway at these backends."""
+        return {
+            "GRPC_SERVER_ADDRESS": f"127.0.0.1:{self.grpc_port}",
+            "SOAP_SERVICE_ADDRESS": f"http://127.0.0.1:{self.soap_port}/",
+        }
+
+    def __enter__(self):
+        ctx = multiprocessing.get_context('spawn')
+        self._processes = [
+            ctx.Process(target=_run_fake_task_service,
+                        args=(self.grpc_port, self.seed_tasks, self.task_latency, self.seed_users), daemon=True),
+            ctx.Process(target=_run_soap_service, args=(self.soap_port, self.seed_users), daemon=True),
+        ]
+        for process in self._processes:
+            process.start()
+        wait_for_port(self.grpc_port)
+        wait_for_port(self.soap_port)
+        return self
+
+    def __exit__(self, *exc_info):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._processes = []
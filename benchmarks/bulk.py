@@ -0,0 +1,173 @@
+# benchmarks/bulk.py
+# Throughput of the streaming bulk endpoints (POST /import, GET /export, see api_gateway/bulk.py)
+# in records/second, with the gateway's peak RSS to show that memory stays flat with the row count.
+# The upload is generated on the fly and the export is counted as it streams, so the benchmark
+# itself holds neither in memory.
+#
+# Usage (from the project root):
+#   python -m benchmarks.bulk                                    # 1M tasks + 100k users, NDJSON
+#   python -m benchmarks.bulk --tasks 3000000 --users 300000 --format csv --output bench_results/bulk.json
+import argparse
+import json
+import logging
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.backends import Backends
+from benchmarks.run import GatewayProcess, RssSampler, git_commit
+
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def user_rows(fmt, count):
+    if fmt == "csv":
+        yield "user_id,name,email\n"
+    for i in range(1, count + 1):
+        if fmt == "csv":
+            yield f"{i},User {i},user{i}@example.com\n"
+        else:
+            yield f'{{"type":"user","user_id":{i},"name":"User {i}","email":"user{i}@example.com"}}\n'
+
+
+def task_rows(fmt, count, users):
+    if fmt == "csv":
+        yield "id,title,description,status,created_by\n"
+    for i in range(1, count + 1):
+        created_by = i % users + 1 if users else ""
+        if fmt == "csv":
+            yield f"{i},Task {i},Imported task number {i},pendente,{created_by}\n"
+        else:
+            yield (f'{{"type":"task","id":{i},"title":"Task {i}","description":"Imported task number {i}",'
+                   f'"status":"pendente","created_by":"{created_by}"}}\n')
+
+
+def chunked(rows, chunk_bytes):
+    """Joins generated rows into upload chunks of about chunk_bytes."""
+    buffer, size = [], 0
+    for row in rows:
+        buffer.append(row)
+        size += len(row)
+        if size >= chunk_bytes:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+class CountingUpload:
+    """Upload body that counts the bytes it hands to httpx."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.bytes = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.bytes += len(chunk)
+            yield chunk
+
+
+def run_import(client, gateway, query, rows, fmt, records, chunk_bytes):
+    upload = CountingUpload(chunked(rows, chunk_bytes))
+    with RssSampler(gateway.process.pid) as sampler:
+        started = time.perf_counter()
+        response = client.post(f"/import?{query}", content=upload, headers={"Content-Type": CONTENT_TYPES[fmt]})
+        elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    imported = sum(response.json()["imported"].values())
+    if imported != records:
+        raise RuntimeError(f"Imported {imported} records, expected {records}.")
+    return {"records": records, "bytes": upload.bytes, "elapsed_s": round(elapsed, 3),
+            "records_per_second": round(records / elapsed), "mb_per_second": round(upload.bytes / elapsed / 1e6, 2),
+            "memory": sampler.summary()}
+
+
+def run_export(client, gateway, query, fmt, records, header_lines):
+    lines = size = 0
+    with RssSampler(gateway.process.pid) as sampler:
+        started = time.perf_counter()
+        first_byte = None
+        with client.stream("GET", f"/export?{query}") as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+        elapsed = time.perf_counter() - started
+    exported = lines - header_lines
+    if exported != records:
+        raise RuntimeError(f"Exported {exported} records, expected {records}.")
+    return {"records": records, "bytes": size, "elapsed_s": round(elapsed, 3),
+            "time_to_first_byte_ms": round((first_byte or 0) * 1000, 1),
+            "records_per_second": round(records / elapsed), "mb_per_second": round(size / elapsed / 1e6, 2),
+            "memory": sampler.summary()}
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Benchmark streaming bulk import/export through the gateway.")
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Tasks to import and export.")
+    parser.add_argument("--users", type=int, default=100_000, help="Users to import and export.")
+    parser.add_argument("--format", choices=sorted(CONTENT_TYPES), default="ndjson")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="Upload chunk size in KiB.")
+    parser.add_argument("--gateway-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the gateway (e.g. GATEWAY_IMPORT_BATCH_SIZE=5000).")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    gateway_env = dict(item.split("=", 1) for item in args.gateway_env)
+    chunk_bytes = args.chunk_kb * 1024
+    # NDJSON carries both resources in one stream; a CSV file holds one resource.
+    if args.format == "ndjson":
+        uploads = [("resource=users,tasks", lambda: (row for rows in (user_rows("ndjson", args.users),
+                                                                      task_rows("ndjson", args.tasks, args.users))
+                                                     for row in rows), args.users + args.tasks)]
+        exports = [("format=ndjson", args.users + args.tasks, 0)]
+    else:
+        uploads = [("format=csv&resource=users", lambda: user_rows("csv", args.users), args.users),
+                   ("format=csv&resource=tasks", lambda: task_rows("csv", args.tasks, args.users), args.tasks)]
+        exports = [("format=csv&resource=users", args.users, 1), ("format=csv&resource=tasks", args.tasks, 1)]
+
+    results = {"import": [], "export": []}
+    with Backends(seed_tasks=0, seed_users=0) as backends, GatewayProcess({**backends.env, **gateway_env}) as gateway:
+        with httpx.Client(base_url=gateway.base_url, timeout=None) as client:
+            for query, rows, records in uploads:
+                logging.info(f"Bulk: importing {records} records ({query})")
+                result = run_import(client, gateway, query, rows(), args.format, records, chunk_bytes)
+                results["import"].append({"query": query, **result})
+                logging.info(f"Bulk: import -> {result['records_per_second']} records/s, "
+                             f"peak RSS {result['memory']['rss_peak_kb']} KiB")
+            for query, records, header_lines in exports:
+                logging.info(f"Bulk: exporting {records} records ({query})")
+                result = run_export(client, gateway, query, args.format, records, header_lines)
+                results["export"].append({"query": query, **result})
+                logging.info(f"Bulk: export -> {result['records_per_second']} records/s, "
+                             f"peak RSS {result['memory']['rss_peak_kb']} KiB")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        **results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
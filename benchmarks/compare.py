@@ -0,0 +1,72 @@
+# benchmarks/compare.py
+# Compares two benchmark result files (e.g. from two commits) scenario by scenario.
+#
+# Usage:
+#   python -m benchmarks.compare base.json new.json [--threshold 10]
+# Exits with status 1 if any metric regressed by more than --threshold percent.
+import argparse
+import json
+import sys
+
+# metric path -> True if higher is better
+METRICS = {
+    ("throughput_rps",): True,
+    ("latency", "p50_ms"): False,
+    ("latency", "p95_ms"): False,
+    ("latency", "p99_ms"): False,
+    ("memory", "rss_peak_kb"): False,
+}
+
+
+def _get(result, path):
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+def compare(base, new, threshold):
+    """Returns (rows, regressions) comparing scenarios present in both reports."""
+    base_by_name = {s["name"]: s for s in base["scenarios"]}
+    rows, regressions = [], []
+    for scenario in new["scenarios"]:
+        old = base_by_name.get(scenario["name"])
+        if old is None:
+            continue
+        for path, higher_is_better in METRICS.items():
+            before, after = _get(old, path), _get(scenario, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100.0
+            regressed = (-change if higher_is_better else change) > threshold
+            row = (scenario["name"], ".".join(path), before, after, change, regressed)
+            rows.append(row)
+            if regressed:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent.")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows, regressions = compare(base, new, args.threshold)
+    print(f"base: {base['meta'].get('commit')}  new: {new['meta'].get('commit')}")
+    print(f"{'scenario':<14} {'metric':<20} {'base':>12} {'new':>12} {'change':>9}")
+    for name, metric, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<14} {metric:<20} {before:>12.2f} {after:>12.2f} {change:>+8.1f}%{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
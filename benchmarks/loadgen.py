@@ -0,0 +1,176 @@
+# benchmarks/loadgen.py
+# Open-loop async load generator for the API Gateway.
+# Requests are fired on a Poisson arrival schedule that does NOT wait for earlier
+# responses, and latency is measured from the *intended* start time. This avoids
+# coordinated omission: a slow gateway shows up as higher latency instead of a
+# silently lower request rate.
+import asyncio
+import itertools
+import math
+import random
+import time
+
+import httpx
+
+
+# --- Request mix operations ---
+# Each operation receives (client, rng, state) and returns the httpx response.
+
+async def op_list_tasks(client, rng, state):
+    return await client.get("/tasks")
+
+async def op_poll_tasks(client, rng, state):
+    """Conditional GET /tasks, as a polling client with an HTTP cache would send it."""
+    etag = state['etags'].get("/tasks")
+    response = await client.get("/tasks", headers={"If-None-Match": etag} if etag else None)
+    if response.status_code == 200 and "etag" in response.headers:
+        state['etags']["/tasks"] = response.headers["etag"]
+    return response
+
+async def op_expand_tasks(client, rng, state):
+    return await client.get("/tasks", params={"expand": "created_by"})
+
+async def op_get_task(client, rng, state):
+    return await client.get(f"/tasks/{rng.randint(1, max(state['seed_tasks'], 1))}")
+
+async def op_create_task(client, rng, state):
+    n = next(state['counter'])
+    return await client.post("/tasks", json={
+        "title": f"Bench task {n}",
+        "description": "Created by the benchmark load generator",
+        "created_by": str(rng.randint(1, max(state['seed_users'], 1))), # A user ID, so ?expand=created_by resolves it
+    })
+
+async def op_list_users(client, rng, state):
+    return await client.get("/users")
+
+async def op_get_user(client, rng, state):
+    return await client.get(f"/users/{rng.randint(1, max(state['seed_users'], 1))}")
+
+async def op_create_user(client, rng, state):
+    n = next(state['counter'])
+    return await client.post("/users", json={"name": f"Bench user {n}", "email": f"bench{n}@example.com"})
+
+
+OPERATIONS = {
+    "list": op_list_tasks,
+    "poll": op_poll_tasks,
+    "expand": op_expand_tasks,
+    "get": op_get_task,
+    "create": op_create_task,
+    "users": op_list_users,
+    "user": op_get_user,
+    "create_user": op_create_user,
+}
+
+
+def parse_mix(text):
+    """Parses 'list=5,get=3,create=1' into {'list': 5.0, 'get': 3.0, 'create': 1.0}."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'. Valid operations: {', '.join(OPERATIONS)}")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"Request mix '{text}' has no positive weights.")
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(latencies):
+    """Latency summary in milliseconds."""
+    values = sorted(latencies)
+    if not values:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+
+
+async def run_load(base_url, mix, rate, duration, seed_tasks=100, seed_users=20,
+                   max_in_flight=1000, timeout=10.0, seed=0):
+    """
+    Drives 'mix' against the gateway at 'rate' requests/second for 'duration' seconds.
+    Returns a dict with overall and per-operation latency, throughput and status counts.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    state = {"seed_tasks": seed_tasks, "seed_users": seed_users, "counter": itertools.count(1), "etags": {}}
+    results = {name: {"latencies": [], "statuses": {}, "errors": 0} for name in names}
+    dropped = 0
+    in_flight = set()
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+
+        async def fire(name, intended_start):
+            record = results[name]
+            try:
+                response = await OPERATIONS[name](client, rng, state)
+                status = str(response.status_code)
+                record["statuses"][status] = record["statuses"].get(status, 0) + 1
+                if response.status_code >= 500:
+                    record["errors"] += 1
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+                record["statuses"][key] = record["statuses"].get(key, 0) + 1
+                record["errors"] += 1
+            record["latencies"].append(time.perf_counter() - intended_start)
+
+        started = time.perf_counter()
+        next_at = started
+        end_at = started + duration
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at >= end_at:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                dropped += 1
+                continue
+            name = rng.choices(names, weights)[0]
+            task = asyncio.create_task(fire(name, next_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.wait(in_flight)
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [lat for record in results.values() for lat in record["latencies"]]
+    completed = len(all_latencies)
+    errors = sum(record["errors"] for record in results.values())
+    return {
+        "offered_rate_rps": rate,
+        "elapsed_s": round(elapsed, 3),
+        "completed": completed,
+        "errors": errors,
+        "dropped": dropped,
+        "throughput_rps": round((completed - errors) / elapsed, 2) if elapsed else 0.0,
+        "latency": summarize_latencies(all_latencies),
+        "operations": {
+            name: {
+                "latency": summarize_latencies(record["latencies"]),
+                "statuses": record["statuses"],
+                "errors": record["errors"],
+            }
+            for name, record in results.items()
+        },
+    }
@@ -0,0 +1,130 @@
+# benchmarks/representation.py
+# In-process micro-benchmark of the GET /tasks document: building the item dicts with their
+# HATEOAS links and serializing them, per ?fields= / ?links= variant, on large lists.
+# "legacy" reproduces the previous per-item add_hateoas_links for comparison.
+#
+# Usage (from the project root):
+#   python -m benchmarks.representation --items 100000
+#   python -m benchmarks.representation --items 100000 --format msgpack --output bench_results/repr.json
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.backends import PYTHON_CLIENT_DIR, ROOT_DIR
+from benchmarks.run import git_commit
+
+GATEWAY_DIR = os.path.join(ROOT_DIR, 'api_gateway')
+BASE_URL = "http://127.0.0.1:8000/"
+
+# name -> (fields, links)
+VARIANTS = {
+    "legacy": (None, "legacy"),
+    "full": (None, "full"),
+    "collection": (None, "collection"),
+    "none": (None, "none"),
+    "sparse_full": (("id", "title", "status"), "full"),
+    "sparse_none": (("id", "title", "status"), "none"),
+}
+
+
+def legacy_links(base_url, resource_type, resource_id=None):
+    """The per-item link builder the gateway used before representation.py."""
+    base_url = str(base_url).rstrip('/')
+    links = {
+        "self": {"href": f"{base_url}/{resource_type}" + (f"/{resource_id}" if resource_id else ""), "method": "GET"}
+    }
+    links["create"] = {"href": f"{base_url}/tasks", "method": "POST"}
+    if resource_id:
+        links["update"] = {"href": f"{base_url}/tasks/{resource_id}", "method": "PUT"}
+        links["delete"] = {"href": f"{base_url}/tasks/{resource_id}", "method": "DELETE"}
+        links["get_by_id"] = {"href": f"{base_url}/tasks/{resource_id}", "method": "GET"}
+    return links
+
+
+def build_legacy(tasks):
+    return {
+        "tasks": [{
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "created_by": task.created_by,
+            "_links": legacy_links(BASE_URL, "tasks", task.id),
+        } for task in tasks],
+        "message": f"{len(tasks)} tasks found.",
+        "_links": legacy_links(BASE_URL, "tasks"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark task list document building and serialization.")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the best time is reported.")
+    parser.add_argument("--format", choices=("json", "msgpack"), default="json")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    for path in (PYTHON_CLIENT_DIR, GATEWAY_DIR):
+        if path not in sys.path:
+            sys.path.append(path)
+    from operator import attrgetter
+    import tasks_pb2
+    from negotiation import JSON, MSGPACK, render
+    from representation import collection_document, collection_items, link_templates, task_projector
+
+    media_type = JSON if args.format == "json" else MSGPACK
+    tasks = tasks_pb2.ListTasksResponse(tasks=[
+        tasks_pb2.Task(id=i, title=f"Task {i}", description=f"Description for task {i}",
+                       status="pending", created_by=f"user{i % 50}")
+        for i in range(1, args.items + 1)
+    ]).tasks
+
+    def build(fields, links):
+        if links == "legacy":
+            return build_legacy(tasks)
+        templates = link_templates(BASE_URL)
+        items = collection_items(tasks, task_projector(fields), attrgetter("id"), "tasks", links, templates)
+        return collection_document("tasks", items, f"{len(items)} tasks found.", "tasks", links, templates)
+
+    results = {}
+    for name, (fields, links) in VARIANTS.items():
+        best_build = best_render = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            document = build(fields, links)
+            built = time.perf_counter()
+            body = render(document, media_type)
+            rendered = time.perf_counter()
+            best_build = min(best_build, built - started)
+            best_render = min(best_render, rendered - built)
+        results[name] = {
+            "build_ms": round(best_build * 1000, 1),
+            "serialize_ms": round(best_render * 1000, 1),
+            "total_ms": round((best_build + best_render) * 1000, 1),
+            "bytes": len(body),
+        }
+        print(f"{name:>12}: {results[name]}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "variants": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
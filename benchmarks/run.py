@@ -0,0 +1,230 @@
+# benchmarks/run.py
+# Runs the API Gateway against local backend stand-ins and reports latency,
+# throughput and memory per scenario as JSON.
+#
+# Usage (from the project root):
+#   python -m benchmarks.run                                  # all default scenarios
+#   python -m benchmarks.run --scenario read_heavy --duration 20
+#   python -m benchmarks.run --mix "list=5,get=3,create=1,users=1" --rate 300
+#   python -m benchmarks.run --output bench_results/$(git rev-parse --short HEAD).json
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmarks.backends import ROOT_DIR, Backends, free_port, wait_for_port
+from benchmarks.loadgen import parse_mix, run_load
+
+GATEWAY_DIR = os.path.join(ROOT_DIR, 'api_gateway')
+
+# Default scenarios: name -> (mix, offered rate in requests/second)
+SCENARIOS = {
+    "list_tasks": ("list=1", 100),
+    "polling": ("poll=20,create=1", 200),
+    "expanded_tasks": ("expand=1", 50),
+    "get_task": ("get=1", 300),
+    "users": ("users=1,user=2", 150),
+    "read_heavy": ("list=2,get=6,users=1,user=1", 250),
+    "mixed": ("list=5,get=3,create=1,users=1", 200),
+    "write_heavy": ("create=4,create_user=1,get=2,list=1", 150),
+}
+
+
+def process_tree(pid):
+    """pid and all its descendants (Linux /proc), e.g. a multi-worker gateway's workers."""
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        try:
+            for tid in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{tid}/children") as children:
+                    stack.extend(int(child) for child in children.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def read_rss_kb(pid):
+    """Resident set size of a process and its children in KiB (Linux /proc), or None if unavailable.
+    Pages shared copy-on-write between forked workers are counted once per process."""
+    total = None
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total = (total or 0) + int(line.split()[1])
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class RssSampler:
+    """Samples the RSS of a process in a background thread while a scenario runs."""
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            rss = read_rss_kb(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return {"rss_start_kb": None, "rss_end_kb": None, "rss_peak_kb": None}
+        return {"rss_start_kb": self.samples[0], "rss_end_kb": self.samples[-1], "rss_peak_kb": max(self.samples)}
+
+
+class GatewayProcess:
+    """Runs api_gateway/main.py under uvicorn (or api_gateway/workers.py when workers > 1),
+    pointed at the given backends."""
+
+    def __init__(self, backend_env, extra_args=(), workers=1):
+        self.port = free_port()
+        self.backend_env = backend_env
+        self.extra_args = list(extra_args)
+        self.workers = workers
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        env = dict(os.environ, **self.backend_env)
+        if self.workers > 1:
+            cmd = [sys.executable, "workers.py", "--workers", str(self.workers), "--host", "127.0.0.1",
+                   "--port", str(self.port), "--log-level", "warning", *self.extra_args]
+        else:
+            cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                   "--port", str(self.port), "--log-level", "warning", "--no-access-log", *self.extra_args]
+        self.process = subprocess.Popen(cmd, cwd=GATEWAY_DIR, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wait_for_port(self.port)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenario(gateway, name, mix_text, rate, args):
+    logging.info(f"Benchmark: running scenario '{name}' ({mix_text} @ {rate} req/s for {args.duration}s)")
+    mix = parse_mix(mix_text)
+    load_kwargs = dict(seed_tasks=args.seed_tasks, seed_users=args.seed_users,
+                       max_in_flight=args.max_in_flight, timeout=args.timeout)
+    if args.warmup > 0:
+        asyncio.run(run_load(gateway.base_url, mix, rate, args.warmup, seed=args.seed + 1, **load_kwargs))
+    with RssSampler(gateway.process.pid) as sampler:
+        result = asyncio.run(run_load(gateway.base_url, mix, rate, args.duration, seed=args.seed, **load_kwargs))
+    result = {"name": name, "mix": mix, **result, "memory": sampler.summary()}
+    latency = result["latency"]
+    logging.info(f"Benchmark: '{name}' -> {result['throughput_rps']} req/s, "
+                 f"p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms p99={latency['p99_ms']}ms, "
+                 f"errors={result['errors']}, peak RSS={result['memory']['rss_peak_kb']} KiB")
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the API Gateway against local backend stand-ins.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Default scenario to run (repeatable). Runs all when neither --scenario nor --mix is given.")
+    parser.add_argument("--mix", help="Custom request mix, e.g. 'list=5,get=3,create=1,users=1'.")
+    parser.add_argument("--rate", type=float, help="Offered load in requests/second (overrides scenario default).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per scenario.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured warm-up seconds per scenario.")
+    parser.add_argument("--seed-tasks", type=int, default=100, help="Tasks preloaded into the fake TaskService.")
+    parser.add_argument("--seed-users", type=int, default=20, help="Users preloaded into the SOAP UserService.")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Requests beyond this are counted as dropped.")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Client timeout per request in seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for arrivals and request mix.")
+    parser.add_argument("--task-latency", metavar="BASE_MS,SLOW_MS,SLOW_RATIO",
+                        help="Latency injected by the fake TaskService, e.g. '2,200,0.02' for a 2%% slow tail.")
+    parser.add_argument("--gateway-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the gateway (repeatable), e.g. GATEWAY_HEDGED_READS=true.")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout).")
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    args = build_parser().parse_args(argv)
+
+    if args.mix:
+        scenarios = [("custom", args.mix, args.rate or 100)]
+    else:
+        names = args.scenario or list(SCENARIOS)
+        scenarios = [(name, SCENARIOS[name][0], args.rate or SCENARIOS[name][1]) for name in names]
+
+    results = []
+    task_latency = None
+    if args.task_latency:
+        base_ms, slow_ms, slow_ratio = (float(part) for part in args.task_latency.split(","))
+        task_latency = (base_ms, slow_ms, slow_ratio)
+    gateway_env = dict(item.split("=", 1) for item in args.gateway_env)
+
+    with Backends(seed_tasks=args.seed_tasks, seed_users=args.seed_users, task_latency=task_latency) as backends:
+        # A fresh gateway per scenario keeps memory figures independent of scenario order.
+        for name, mix_text, rate in scenarios:
+            with GatewayProcess({**backends.env, **gateway_env}) as gateway:
+                results.append(run_scenario(gateway, name, mix_text, rate, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "scenarios": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        logging.info(f"Benchmark: results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/scaling.py
+# Measures how the multi-process gateway (api_gateway/workers.py) scales from 1 to N workers.
+# For each worker count the same open-loop mix is offered at a rate high enough to saturate
+# a single worker, so the achieved throughput shows the scaling.
+#
+# Usage (from the project root):
+#   python -m benchmarks.scaling --max-workers 4 --mix "get=6,list=1" --rate 2000
+#   python -m benchmarks.scaling --workers 1,2,4,8 --output bench_results/scaling.json
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+from datetime import datetime, timezone
+
+from benchmarks.backends import Backends
+from benchmarks.loadgen import parse_mix, run_load
+from benchmarks.run import GatewayProcess, RssSampler, git_commit
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Benchmark gateway throughput for 1..N worker processes.")
+    parser.add_argument("--workers", help="Comma-separated worker counts (default: 1..--max-workers).")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mix", default="get=6,list=1,users=1")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Offered load in requests/second.")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed-tasks", type=int, default=100)
+    parser.add_argument("--seed-users", type=int, default=20)
+    parser.add_argument("--max-in-flight", type=int, default=2000)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    counts = [int(n) for n in args.workers.split(",")] if args.workers else list(range(1, args.max_workers + 1))
+    mix = parse_mix(args.mix)
+    load_kwargs = dict(seed_tasks=args.seed_tasks, seed_users=args.seed_users, max_in_flight=args.max_in_flight)
+
+    results = []
+    with Backends(seed_tasks=args.seed_tasks, seed_users=args.seed_users) as backends:
+        for workers in counts:
+            logging.info(f"Scaling: {workers} worker(s), {args.mix} @ {args.rate} req/s")
+            with GatewayProcess(backends.env, workers=workers) as gateway:
+                if args.warmup > 0:
+                    asyncio.run(run_load(gateway.base_url, mix, args.rate, args.warmup, seed=1, **load_kwargs))
+                with RssSampler(gateway.process.pid) as sampler:
+                    result = asyncio.run(run_load(gateway.base_url, mix, args.rate, args.duration, **load_kwargs))
+            result = {"workers": workers, **result, "memory": sampler.summary()}
+            results.append(result)
+            logging.info(f"Scaling: {workers} worker(s) -> {result['throughput_rps']} req/s, "
+                         f"p99={result['latency']['p99_ms']}ms")
+
+    base = results[0]["throughput_rps"] or None
+    for result in results:
+        result["speedup"] = round(result["throughput_rps"] / base, 2) if base else None
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "scaling": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/user_protocols.py
+# Per-call CPU and bytes of the gateway -> UserService hop, SOAP 1.1 vs MessagePack-RPC.
+# Runs in one process without a network: the gateway side uses the request encoders and
+# response parsers from api_gateway/user_client.py, the service side is the real Spyne
+# WSGI application from soap_user_service/service.py, called directly.
+#
+# Usage (from the project root):
+#   python -m benchmarks.user_protocols
+#   python -m benchmarks.user_protocols --users 1000 --calls 500 --output bench_results/user_protocols.json
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+from benchmarks.backends import ROOT_DIR, SOAP_SERVICE_DIR
+from benchmarks.run import git_commit
+
+GATEWAY_DIR = os.path.join(ROOT_DIR, 'api_gateway')
+
+
+def wsgi_call(app, path, content_type, body):
+    """Calls a WSGI application with a POST and returns (status code, response body)."""
+    environ = {
+        'REQUEST_METHOD': 'POST', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '8001', 'SERVER_PROTOCOL': 'HTTP/1.1', 'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body), 'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': False,
+        'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    status = []
+    content = b''.join(app(environ, lambda s, headers, exc_info=None: status.append(s)))
+    return int(status[0].split()[0]), content
+
+
+def measure(call, calls):
+    """Runs call() 'calls' times; returns per-call client CPU, service CPU and bytes."""
+    client_cpu = service_cpu = 0.0
+    sent = received = 0
+    for _ in range(calls):
+        started = time.process_time()
+        request_body = call.encode()
+        encoded = time.process_time()
+        status, response_body = call.serve(request_body)
+        served = time.process_time()
+        call.parse(status, response_body)
+        parsed = time.process_time()
+        client_cpu += (encoded - started) + (parsed - served)
+        service_cpu += served - encoded
+        sent += len(request_body)
+        received += len(response_body)
+    return {
+        "client_cpu_us": round(client_cpu / calls * 1e6, 1),
+        "service_cpu_us": round(service_cpu / calls * 1e6, 1),
+        "total_cpu_us": round((client_cpu + service_cpu) / calls * 1e6, 1),
+        "request_bytes": sent // calls,
+        "response_bytes": received // calls,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare SOAP and MessagePack-RPC for the UserService hop.")
+    parser.add_argument("--users", type=int, default=100, help="Users in the store (list_users size).")
+    parser.add_argument("--calls", type=int, default=300, help="Calls per operation and protocol.")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    for path in (SOAP_SERVICE_DIR, GATEWAY_DIR):
+        if path not in sys.path:
+            sys.path.append(path)
+    import service  # soap_user_service/service.py
+    import user_client
+    if service.msgpack_wsgi_app is None or user_client.msgpack is None:
+        sys.exit("msgpack is not installed (pip install msgpack).")
+    logging.disable(logging.CRITICAL) # The service logs every call
+
+    for i in range(1, args.users + 1):
+        service.users_db[i] = service.User(user_id=i, name=f"User {i}", email=f"user{i}@example.com")
+        service.user_ids.append(i)
+    service.next_user_id = args.users + 1
+
+    protocols = {
+        "soap": dict(
+            encode=user_client.soap_request, path='/', content_type=user_client.SOAP_CONTENT_TYPE,
+            app=service.wsgi_app, parse=lambda operation, status, body: user_client.parse_soap_response(status, body, operation)),
+        "msgpack-rpc": dict(
+            encode=user_client.rpc_request, path=service.MSGPACK_RPC_PATH, content_type=user_client.RPC_CONTENT_TYPE,
+            app=service.msgpack_wsgi_app, parse=user_client.parse_rpc_response),
+    }
+    operations = {
+        "get_user": {"user_id": 1},
+        "list_users": {},
+        "create_user": {"name": "Bench user", "email": "bench@example.com"},
+    }
+
+    class Call:
+        def __init__(self, protocol, operation, params):
+            self.protocol, self.operation, self.params = protocols[protocol], operation, params
+
+        def encode(self):
+            return self.protocol["encode"](self.operation, self.params)
+
+        def serve(self, body):
+            return wsgi_call(self.protocol["app"], self.protocol["path"], self.protocol["content_type"], body)
+
+        def parse(self, status, body):
+            return self.protocol["parse"](self.operation, status, body)
+
+    results = {}
+    for operation, params in operations.items():
+        results[operation] = {}
+        for protocol in protocols:
+            measure(Call(protocol, operation, params), min(20, args.calls)) # Warm-up
+            results[operation][protocol] = measure(Call(protocol, operation, params), args.calls)
+            print(f"{operation:>12} {protocol:>12}: {results[operation][protocol]}", file=sys.stderr)
+        soap, rpc = results[operation]["soap"], results[operation]["msgpack-rpc"]
+        results[operation]["msgpack_vs_soap"] = {
+            "cpu": round(rpc["total_cpu_us"] / soap["total_cpu_us"], 2),
+            "bytes": round((rpc["request_bytes"] + rpc["response_bytes"]) /
+                           (soap["request_bytes"] + soap["response_bytes"]), 2),
+        }
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "operations": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
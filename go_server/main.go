@@ -3,11 +3,15 @@ package main
 import (
 	"context"
 	"fmt"
+	"io"
 	"log"
+	"math"
 	"net"
 	"net/smtp"
+	"slices"
 	"strings"
 	"sync"
+	"time"
 
 	// IMPORTANTE: O caminho abaixo deve corresponder ao nome da sua pasta principal
 	// e à estrutura do seu projeto.
@@ -15,15 +19,36 @@ import (
 
 	"google.golang.org/grpc"
 	"google.golang.org/grpc/codes"
+	"google.golang.org/grpc/metadata"
 	"google.golang.org/grpc/status"
 )
 
+// Metadata keys for the store version used by the API Gateway to build ETags
+const (
+	storeVersionHeader       = "x-store-version"         // Sent on ListTasks responses
+	ifNoneMatchVersionHeader = "x-if-none-match-version" // Sent by the gateway with the version it already has
+	notModifiedHeader        = "x-not-modified"          // Sent when the version above is still current
+)
+
+// Page sizes for StreamTasks (tasks per message)
+const (
+	defaultStreamPageSize = 500
+	maxStreamPageSize     = 5000
+)
+
+// Highest task ID: nextID (the highest ID + 1) must still fit an int32. ImportTasks rejects IDs
+// above it, and no new ID is assigned past it.
+const maxTaskID = math.MaxInt32 - 1
+
 // server is the struct that implements the TaskServiceServer interface
 type server struct {
 	pb.UnimplementedTaskServiceServer
-	mu     sync.Mutex
-	tasks  map[int32]*pb.Task // Map to store tasks in memory
-	nextID int32              // Next available ID for a new task
+	mu      sync.Mutex
+	tasks   map[int32]*pb.Task // Map to store tasks in memory
+	ids     []int32            // IDs in tasks in ascending order, so StreamTasks pages without scanning the ID range
+	nextID  int32              // Next available ID for a new task
+	epoch   int64              // Startup time, so versions from a previous run never match
+	version uint64             // Incremented on every mutation
 }
 
 // NewServer creates a new instance of the server
@@ -31,6 +56,30 @@ func NewServer() *server {
 	return &server{
 		tasks:  make(map[int32]*pb.Task),
 		nextID: 1, // Start with ID 1
+		epoch:  time.Now().UnixNano(),
+	}
+}
+
+// storeVersion returns the current store version as "<epoch>.<counter>". Call with s.mu held.
+func (s *server) storeVersion() string {
+	return fmt.Sprintf("%x.%d", s.epoch, s.version)
+}
+
+// addID records a new task ID in s.ids. Call with s.mu held.
+func (s *server) addID(id int32) {
+	if n := len(s.ids); n == 0 || s.ids[n-1] < id {
+		s.ids = append(s.ids, id) // CreateTask IDs always land here
+		return
+	}
+	if i, found := slices.BinarySearch(s.ids, id); !found {
+		s.ids = slices.Insert(s.ids, i, id)
+	}
+}
+
+// removeID drops a deleted task ID from s.ids. Call with s.mu held.
+func (s *server) removeID(id int32) {
+	if i, found := slices.BinarySearch(s.ids, id); found {
+		s.ids = slices.Delete(s.ids, i, i+1)
 	}
 }
 
@@ -43,6 +92,11 @@ func (s *server) CreateTask(ctx context.Context, req *pb.CreateTaskRequest) (*pb
 	log.Printf("Received CreateTask request: Title='%s', Description='%s', CreatedBy='%s'",
 		req.GetTitle(), req.GetDescription(), req.GetCreatedBy())
 
+	if s.nextID > maxTaskID {
+		log.Printf("Error CreateTask: no task IDs left (next ID %d).", s.nextID)
+		return nil, status.Errorf(codes.OutOfRange, "No task IDs left above %d", maxTaskID)
+	}
+
 	newTask := &pb.Task{
 		Id:          s.nextID,
 		Title:       req.GetTitle(),
@@ -51,7 +105,9 @@ func (s *server) CreateTask(ctx context.Context, req *pb.CreateTaskRequest) (*pb
 		CreatedBy:   req.GetCreatedBy(),
 	}
 	s.tasks[s.nextID] = newTask
+	s.addID(s.nextID)
 	s.nextID++
+	s.version++
 
 	response := &pb.CreateTaskResponse{
 		Task:    newTask,
@@ -71,9 +127,21 @@ func (s *server) ListTasks(ctx context.Context, req *pb.ListTasksRequest) (*pb.L
 	// Log incoming request
 	log.Println("Received ListTasks request")
 
-	var tasks []*pb.Task
-	for _, task := range s.tasks {
-		tasks = append(tasks, task)
+	version := s.storeVersion()
+	grpc.SetHeader(ctx, metadata.Pairs(storeVersionHeader, version))
+	if md, ok := metadata.FromIncomingContext(ctx); ok {
+		if known := md.Get(ifNoneMatchVersionHeader); len(known) > 0 && known[0] == version {
+			grpc.SetHeader(ctx, metadata.Pairs(notModifiedHeader, "true"))
+			log.Printf("Sending ListTasks response: not modified since version %s.", version)
+			return &pb.ListTasksResponse{Message: "Not modified."}, nil
+		}
+	}
+
+	// In ID order, not map order: the gateway turns the body into a strong ETag, so the same
+	// store version must always produce the same bytes
+	tasks := make([]*pb.Task, 0, len(s.ids))
+	for _, id := range s.ids {
+		tasks = append(tasks, s.tasks[id])
 	}
 
 	response := &pb.ListTasksResponse{
@@ -110,6 +178,7 @@ func (s *server) UpdateTask(ctx context.Context, req *pb.UpdateTaskRequest) (*pb
 	if req.GetStatus() != "" {
 		task.Status = req.GetStatus()
 	}
+	s.version++
 
 	response := &pb.UpdateTaskResponse{
 		Task:    task,
@@ -137,6 +206,8 @@ func (s *server) DeleteTask(ctx context.Context, req *pb.DeleteTaskRequest) (*pb
 	}
 
 	delete(s.tasks, req.GetId())
+	s.removeID(req.GetId())
+	s.version++
 
 	response := &pb.DeleteTaskResponse{
 		Success: true,
@@ -210,7 +281,8 @@ func (s *server) SendTasksByEmail(ctx context.Context, req *pb.SendTasksByEmailR
 	if len(s.tasks) == 0 {
 		body.WriteString("No tasks registered at the moment.\r\n")
 	} else {
-		for _, task := range s.tasks {
+		for _, id := range s.ids {
+			task := s.tasks[id]
 			body.WriteString(fmt.Sprintf("ID: %d\r\n", task.GetId()))
 			body.WriteString(fmt.Sprintf("Title: %s\r\n", task.GetTitle()))
 			body.WriteString(fmt.Sprintf("Description: %s\r\n", task.GetDescription()))
@@ -242,13 +314,149 @@ func (s *server) SendTasksByEmail(ctx context.Context, req *pb.SendTasksByEmailR
 	}, nil
 }
 
+// Implementation of the StreamTasks method: every task with an ID above AfterId, in ID order,
+// one page per message. The lock is only held while a page is copied, so exporting millions of
+// tasks neither blocks writers nor holds more than a page in memory besides the store itself.
+func (s *server) StreamTasks(req *pb.StreamTasksRequest, stream pb.TaskService_StreamTasksServer) error {
+	pageSize := int(req.GetPageSize())
+	if pageSize <= 0 {
+		pageSize = defaultStreamPageSize
+	} else if pageSize > maxStreamPageSize {
+		pageSize = maxStreamPageSize
+	}
+	log.Printf("Received StreamTasks request: AfterId=%d, PageSize=%d", req.GetAfterId(), pageSize)
+
+	afterID := req.GetAfterId()
+	sent := 0
+	for {
+		s.mu.Lock()
+		// First stored ID above afterID; the page is the next pageSize IDs of the index
+		start, found := slices.BinarySearch(s.ids, afterID)
+		if found {
+			start++
+		}
+		end := min(start+pageSize, len(s.ids))
+		page := make([]*pb.Task, 0, end-start)
+		for _, id := range s.ids[start:end] {
+			task := s.tasks[id]
+			// Copied: the stored task may be updated while the page is being sent
+			page = append(page, &pb.Task{Id: task.Id, Title: task.Title, Description: task.Description,
+				Status: task.Status, CreatedBy: task.CreatedBy})
+		}
+		done := end >= len(s.ids)
+		s.mu.Unlock()
+
+		if len(page) > 0 {
+			// Send blocks while the client is behind (flow control), which paces the export
+			if err := stream.Send(&pb.ListTasksResponse{Tasks: page}); err != nil {
+				log.Printf("Error StreamTasks after %d tasks: %v", sent, err)
+				return err
+			}
+			sent += len(page)
+			afterID = page[len(page)-1].Id
+		}
+		if done {
+			break
+		}
+	}
+
+	log.Printf("Sending StreamTasks end: %d tasks.", sent)
+	return nil
+}
+
+// Implementation of the ImportTasks method: every message is a batch, checked and then applied
+// under a single lock hold. Tasks with an ID (1..maxTaskID) keep it: a new ID creates the task and
+// an existing one replaces it (upsert, so importing the same export twice changes nothing). Tasks
+// with ID 0 get a new one. A batch with an invalid ID fails the call without applying any of it.
+func (s *server) ImportTasks(stream pb.TaskService_ImportTasksServer) error {
+	log.Println("Received ImportTasks request")
+
+	created, updated := 0, 0
+	for {
+		req, err := stream.Recv()
+		if err == io.EOF {
+			imported := created + updated
+			log.Printf("Sending ImportTasks response: %d tasks imported (%d created, %d updated).", imported, created, updated)
+			return stream.SendAndClose(&pb.ImportTasksResponse{
+				Imported: int32(imported),
+				Created:  int32(created),
+				Updated:  int32(updated),
+				Message:  fmt.Sprintf("%d tasks imported (%d created, %d updated).", imported, created, updated),
+			})
+		}
+		if err != nil {
+			log.Printf("Error ImportTasks after %d tasks: %v", created+updated, err)
+			return err
+		}
+
+		s.mu.Lock()
+		if err := s.checkImportIDs(req.GetTasks()); err != nil {
+			s.mu.Unlock()
+			log.Printf("Error ImportTasks after %d tasks: %v", created+updated, err)
+			// Earlier batches stay applied; only the server knows how many tasks that was
+			return status.Errorf(status.Code(err), "%s (%d tasks imported before this batch)",
+				status.Convert(err).Message(), created+updated)
+		}
+		for _, task := range req.GetTasks() {
+			id := task.GetId()
+			if id == 0 {
+				id = s.nextID
+			}
+			if id >= s.nextID {
+				s.nextID = id + 1 // Cannot overflow: checkImportIDs keeps id <= maxTaskID
+			}
+			if _, exists := s.tasks[id]; exists {
+				updated++
+			} else {
+				created++
+				s.addID(id)
+			}
+			taskStatus := task.GetStatus()
+			if taskStatus == "" {
+				taskStatus = "pendente" // Same default as CreateTask
+			}
+			s.tasks[id] = &pb.Task{Id: id, Title: task.GetTitle(), Description: task.GetDescription(),
+				Status: taskStatus, CreatedBy: task.GetCreatedBy()}
+		}
+		if len(req.GetTasks()) > 0 {
+			s.version++
+		}
+		s.mu.Unlock()
+	}
+}
+
+// checkImportIDs validates the IDs of an ImportTasks batch before any of it is applied, following
+// the IDs that the batch's tasks without one would get. Call with s.mu held.
+func (s *server) checkImportIDs(tasks []*pb.Task) error {
+	next := s.nextID
+	for i, task := range tasks {
+		id := task.GetId()
+		if id < 0 || id > maxTaskID {
+			return status.Errorf(codes.InvalidArgument, "Task %d of the batch: ID %d is outside 1..%d (0 assigns a new ID)",
+				i+1, id, maxTaskID)
+		}
+		if id == 0 {
+			if next > maxTaskID {
+				return status.Errorf(codes.OutOfRange, "Task %d of the batch: no task IDs left above %d", i+1, maxTaskID)
+			}
+			id = next
+		}
+		if id >= next {
+			next = id + 1
+		}
+	}
+	return nil
+}
+
 func main() {
 	lis, err := net.Listen("tcp", ":50051")
 	if err != nil {
 		log.Fatalf("Failed to listen: %v", err)
 	}
 
-	s := grpc.NewServer()
+	// Records spans for calls traced by the API Gateway (TRACE_EXPORT_FILE); a no-op otherwise.
+	tracer := newTracerFromEnv()
+	s := grpc.NewServer(grpc.UnaryInterceptor(tracer.unaryInterceptor()), grpc.StreamInterceptor(tracer.streamInterceptor()))
 	taskServer := NewServer()
 	pb.RegisterTaskServiceServer(s, taskServer)
 
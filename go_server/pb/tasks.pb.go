@@ -718,6 +718,173 @@ func (x *SendTasksByEmailResponse) GetMessage() string {
 	return ""
 }
 
+// Requisição para exportar as tarefas em páginas (StreamTasks), em ordem de ID
+type StreamTasksRequest struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	AfterId       int32                  `protobuf:"varint,1,opt,name=after_id,json=afterId,proto3" json:"after_id,omitempty"`    // Começa depois desta ID (0 = do início); permite retomar uma exportação
+	PageSize      int32                  `protobuf:"varint,2,opt,name=page_size,json=pageSize,proto3" json:"page_size,omitempty"` // Tarefas por mensagem (0 = padrão do servidor)
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *StreamTasksRequest) Reset() {
+	*x = StreamTasksRequest{}
+	mi := &file_tasks_proto_msgTypes[13]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *StreamTasksRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*StreamTasksRequest) ProtoMessage() {}
+
+func (x *StreamTasksRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_tasks_proto_msgTypes[13]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use StreamTasksRequest.ProtoReflect.Descriptor instead.
+func (*StreamTasksRequest) Descriptor() ([]byte, []int) {
+	return file_tasks_proto_rawDescGZIP(), []int{13}
+}
+
+func (x *StreamTasksRequest) GetAfterId() int32 {
+	if x != nil {
+		return x.AfterId
+	}
+	return 0
+}
+
+func (x *StreamTasksRequest) GetPageSize() int32 {
+	if x != nil {
+		return x.PageSize
+	}
+	return 0
+}
+
+// Lote de tarefas para importação (ImportTasks)
+type ImportTasksRequest struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Tasks         []*Task                `protobuf:"bytes,1,rep,name=tasks,proto3" json:"tasks,omitempty"` // id de 1 a 2147483646 mantém a ID (cria ou substitui a tarefa); id = 0 recebe uma nova
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *ImportTasksRequest) Reset() {
+	*x = ImportTasksRequest{}
+	mi := &file_tasks_proto_msgTypes[14]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *ImportTasksRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*ImportTasksRequest) ProtoMessage() {}
+
+func (x *ImportTasksRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_tasks_proto_msgTypes[14]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use ImportTasksRequest.ProtoReflect.Descriptor instead.
+func (*ImportTasksRequest) Descriptor() ([]byte, []int) {
+	return file_tasks_proto_rawDescGZIP(), []int{14}
+}
+
+func (x *ImportTasksRequest) GetTasks() []*Task {
+	if x != nil {
+		return x.Tasks
+	}
+	return nil
+}
+
+// Resposta após importar tarefas
+type ImportTasksResponse struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Imported      int32                  `protobuf:"varint,1,opt,name=imported,proto3" json:"imported,omitempty"`
+	Message       string                 `protobuf:"bytes,2,opt,name=message,proto3" json:"message,omitempty"`
+	Created       int32                  `protobuf:"varint,3,opt,name=created,proto3" json:"created,omitempty"` // Tarefas com ID nova
+	Updated       int32                  `protobuf:"varint,4,opt,name=updated,proto3" json:"updated,omitempty"` // Tarefas que substituíram uma existente com a mesma ID
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *ImportTasksResponse) Reset() {
+	*x = ImportTasksResponse{}
+	mi := &file_tasks_proto_msgTypes[15]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *ImportTasksResponse) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*ImportTasksResponse) ProtoMessage() {}
+
+func (x *ImportTasksResponse) ProtoReflect() protoreflect.Message {
+	mi := &file_tasks_proto_msgTypes[15]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use ImportTasksResponse.ProtoReflect.Descriptor instead.
+func (*ImportTasksResponse) Descriptor() ([]byte, []int) {
+	return file_tasks_proto_rawDescGZIP(), []int{15}
+}
+
+func (x *ImportTasksResponse) GetImported() int32 {
+	if x != nil {
+		return x.Imported
+	}
+	return 0
+}
+
+func (x *ImportTasksResponse) GetMessage() string {
+	if x != nil {
+		return x.Message
+	}
+	return ""
+}
+
+func (x *ImportTasksResponse) GetCreated() int32 {
+	if x != nil {
+		return x.Created
+	}
+	return 0
+}
+
+func (x *ImportTasksResponse) GetUpdated() int32 {
+	if x != nil {
+		return x.Updated
+	}
+	return 0
+}
+
 var File_tasks_proto protoreflect.FileDescriptor
 
 const file_tasks_proto_rawDesc = "" +
@@ -764,7 +931,17 @@ const file_tasks_proto_rawDesc = "" +
 	"\x0frecipient_email\x18\x01 \x01(\tR\x0erecipientEmail\"N\n" +
 	"\x18SendTasksByEmailResponse\x12\x18\n" +
 	"\asuccess\x18\x01 \x01(\bR\asuccess\x12\x18\n" +
-	"\amessage\x18\x02 \x01(\tR\amessage2\xa5\x03\n" +
+	"\amessage\x18\x02 \x01(\tR\amessage\"L\n" +
+	"\x12StreamTasksRequest\x12\x19\n" +
+	"\bafter_id\x18\x01 \x01(\x05R\aafterId\x12\x1b\n" +
+	"\tpage_size\x18\x02 \x01(\x05R\bpageSize\"7\n" +
+	"\x12ImportTasksRequest\x12!\n" +
+	"\x05tasks\x18\x01 \x03(\v2\v.tasks.TaskR\x05tasks\"\x7f\n" +
+	"\x13ImportTasksResponse\x12\x1a\n" +
+	"\bimported\x18\x01 \x01(\x05R\bimported\x12\x18\n" +
+	"\amessage\x18\x02 \x01(\tR\amessage\x12\x18\n" +
+	"\acreated\x18\x03 \x01(\x05R\acreated\x12\x18\n" +
+	"\aupdated\x18\x04 \x01(\x05R\aupdated2\xb3\x04\n" +
 	"\vTaskService\x12A\n" +
 	"\n" +
 	"CreateTask\x12\x18.tasks.CreateTaskRequest\x1a\x19.tasks.CreateTaskResponse\x12>\n" +
@@ -774,7 +951,9 @@ const file_tasks_proto_rawDesc = "" +
 	"\n" +
 	"DeleteTask\x12\x18.tasks.DeleteTaskRequest\x1a\x19.tasks.DeleteTaskResponse\x128\n" +
 	"\aGetTask\x12\x15.tasks.GetTaskRequest\x1a\x16.tasks.GetTaskResponse\x12S\n" +
-	"\x10SendTasksByEmail\x12\x1e.tasks.SendTasksByEmailRequest\x1a\x1f.tasks.SendTasksByEmailResponseB>Z<lista_de_tarefas_megazord_com_rest_soap_api_mom/go_server/pbb\x06proto3"
+	"\x10SendTasksByEmail\x12\x1e.tasks.SendTasksByEmailRequest\x1a\x1f.tasks.SendTasksByEmailResponse\x12D\n" +
+	"\vStreamTasks\x12\x19.tasks.StreamTasksRequest\x1a\x18.tasks.ListTasksResponse0\x01\x12F\n" +
+	"\vImportTasks\x12\x19.tasks.ImportTasksRequest\x1a\x1a.tasks.ImportTasksResponse(\x01B>Z<lista_de_tarefas_megazord_com_rest_soap_api_mom/go_server/pbb\x06proto3"
 
 var (
 	file_tasks_proto_rawDescOnce sync.Once
@@ -788,7 +967,7 @@ func file_tasks_proto_rawDescGZIP() []byte {
 	return file_tasks_proto_rawDescData
 }
 
-var file_tasks_proto_msgTypes = make([]protoimpl.MessageInfo, 13)
+var file_tasks_proto_msgTypes = make([]protoimpl.MessageInfo, 16)
 var file_tasks_proto_goTypes = []any{
 	(*Task)(nil),                     // 0: tasks.Task
 	(*CreateTaskRequest)(nil),        // 1: tasks.CreateTaskRequest
@@ -803,29 +982,37 @@ var file_tasks_proto_goTypes = []any{
 	(*GetTaskResponse)(nil),          // 10: tasks.GetTaskResponse
 	(*SendTasksByEmailRequest)(nil),  // 11: tasks.SendTasksByEmailRequest
 	(*SendTasksByEmailResponse)(nil), // 12: tasks.SendTasksByEmailResponse
+	(*StreamTasksRequest)(nil),       // 13: tasks.StreamTasksRequest
+	(*ImportTasksRequest)(nil),       // 14: tasks.ImportTasksRequest
+	(*ImportTasksResponse)(nil),      // 15: tasks.ImportTasksResponse
 }
 var file_tasks_proto_depIdxs = []int32{
 	0,  // 0: tasks.CreateTaskResponse.task:type_name -> tasks.Task
 	0,  // 1: tasks.ListTasksResponse.tasks:type_name -> tasks.Task
 	0,  // 2: tasks.UpdateTaskResponse.task:type_name -> tasks.Task
 	0,  // 3: tasks.GetTaskResponse.task:type_name -> tasks.Task
-	1,  // 4: tasks.TaskService.CreateTask:input_type -> tasks.CreateTaskRequest
-	3,  // 5: tasks.TaskService.ListTasks:input_type -> tasks.ListTasksRequest
-	5,  // 6: tasks.TaskService.UpdateTask:input_type -> tasks.UpdateTaskRequest
-	7,  // 7: tasks.TaskService.DeleteTask:input_type -> tasks.DeleteTaskRequest
-	9,  // 8: tasks.TaskService.GetTask:input_type -> tasks.GetTaskRequest
-	11, // 9: tasks.TaskService.SendTasksByEmail:input_type -> tasks.SendTasksByEmailRequest
-	2,  // 10: tasks.TaskService.CreateTask:output_type -> tasks.CreateTaskResponse
-	4,  // 11: tasks.TaskService.ListTasks:output_type -> tasks.ListTasksResponse
-	6,  // 12: tasks.TaskService.UpdateTask:output_type -> tasks.UpdateTaskResponse
-	8,  // 13: tasks.TaskService.DeleteTask:output_type -> tasks.DeleteTaskResponse
-	10, // 14: tasks.TaskService.GetTask:output_type -> tasks.GetTaskResponse
-	12, // 15: tasks.TaskService.SendTasksByEmail:output_type -> tasks.SendTasksByEmailResponse
-	10, // [10:16] is the sub-list for method output_type
-	4,  // [4:10] is the sub-list for method input_type
-	4,  // [4:4] is the sub-list for extension type_name
-	4,  // [4:4] is the sub-list for extension extendee
-	0,  // [0:4] is the sub-list for field type_name
+	0,  // 4: tasks.ImportTasksRequest.tasks:type_name -> tasks.Task
+	1,  // 5: tasks.TaskService.CreateTask:input_type -> tasks.CreateTaskRequest
+	3,  // 6: tasks.TaskService.ListTasks:input_type -> tasks.ListTasksRequest
+	5,  // 7: tasks.TaskService.UpdateTask:input_type -> tasks.UpdateTaskRequest
+	7,  // 8: tasks.TaskService.DeleteTask:input_type -> tasks.DeleteTaskRequest
+	9,  // 9: tasks.TaskService.GetTask:input_type -> tasks.GetTaskRequest
+	11, // 10: tasks.TaskService.SendTasksByEmail:input_type -> tasks.SendTasksByEmailRequest
+	13, // 11: tasks.TaskService.StreamTasks:input_type -> tasks.StreamTasksRequest
+	14, // 12: tasks.TaskService.ImportTasks:input_type -> tasks.ImportTasksRequest
+	2,  // 13: tasks.TaskService.CreateTask:output_type -> tasks.CreateTaskResponse
+	4,  // 14: tasks.TaskService.ListTasks:output_type -> tasks.ListTasksResponse
+	6,  // 15: tasks.TaskService.UpdateTask:output_type -> tasks.UpdateTaskResponse
+	8,  // 16: tasks.TaskService.DeleteTask:output_type -> tasks.DeleteTaskResponse
+	10, // 17: tasks.TaskService.GetTask:output_type -> tasks.GetTaskResponse
+	12, // 18: tasks.TaskService.SendTasksByEmail:output_type -> tasks.SendTasksByEmailResponse
+	4,  // 19: tasks.TaskService.StreamTasks:output_type -> tasks.ListTasksResponse
+	15, // 20: tasks.TaskService.ImportTasks:output_type -> tasks.ImportTasksResponse
+	13, // [13:21] is the sub-list for method output_type
+	5,  // [5:13] is the sub-list for method input_type
+	5,  // [5:5] is the sub-list for extension type_name
+	5,  // [5:5] is the sub-list for extension extendee
+	0,  // [0:5] is the sub-list for field type_name
 }
 
 func init() { file_tasks_proto_init() }
@@ -839,7 +1026,7 @@ func file_tasks_proto_init() {
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: unsafe.Slice(unsafe.StringData(file_tasks_proto_rawDesc), len(file_tasks_proto_rawDesc)),
 			NumEnums:      0,
-			NumMessages:   13,
+			NumMessages:   16,
 			NumExtensions: 0,
 			NumServices:   1,
 		},
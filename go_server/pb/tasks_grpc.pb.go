@@ -25,6 +25,8 @@ const (
 	TaskService_DeleteTask_FullMethodName       = "/tasks.TaskService/DeleteTask"
 	TaskService_GetTask_FullMethodName          = "/tasks.TaskService/GetTask"
 	TaskService_SendTasksByEmail_FullMethodName = "/tasks.TaskService/SendTasksByEmail"
+	TaskService_StreamTasks_FullMethodName      = "/tasks.TaskService/StreamTasks"
+	TaskService_ImportTasks_FullMethodName      = "/tasks.TaskService/ImportTasks"
 )
 
 // TaskServiceClient is the client API for TaskService service.
@@ -39,6 +41,9 @@ type TaskServiceClient interface {
 	DeleteTask(ctx context.Context, in *DeleteTaskRequest, opts ...grpc.CallOption) (*DeleteTaskResponse, error)
 	GetTask(ctx context.Context, in *GetTaskRequest, opts ...grpc.CallOption) (*GetTaskResponse, error)
 	SendTasksByEmail(ctx context.Context, in *SendTasksByEmailRequest, opts ...grpc.CallOption) (*SendTasksByEmailResponse, error)
+	// Exportação e importação em massa: páginas de tarefas num stream e lotes aplicados um a um
+	StreamTasks(ctx context.Context, in *StreamTasksRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[ListTasksResponse], error)
+	ImportTasks(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[ImportTasksRequest, ImportTasksResponse], error)
 }
 
 type taskServiceClient struct {
@@ -109,6 +114,38 @@ func (c *taskServiceClient) SendTasksByEmail(ctx context.Context, in *SendTasksB
 	return out, nil
 }
 
+func (c *taskServiceClient) StreamTasks(ctx context.Context, in *StreamTasksRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[ListTasksResponse], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &TaskService_ServiceDesc.Streams[0], TaskService_StreamTasks_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[StreamTasksRequest, ListTasksResponse]{ClientStream: stream}
+	if err := x.ClientStream.SendMsg(in); err != nil {
+		return nil, err
+	}
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TaskService_StreamTasksClient = grpc.ServerStreamingClient[ListTasksResponse]
+
+func (c *taskServiceClient) ImportTasks(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[ImportTasksRequest, ImportTasksResponse], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &TaskService_ServiceDesc.Streams[1], TaskService_ImportTasks_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[ImportTasksRequest, ImportTasksResponse]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TaskService_ImportTasksClient = grpc.ClientStreamingClient[ImportTasksRequest, ImportTasksResponse]
+
 // TaskServiceServer is the server API for TaskService service.
 // All implementations must embed UnimplementedTaskServiceServer
 // for forward compatibility.
@@ -121,6 +158,9 @@ type TaskServiceServer interface {
 	DeleteTask(context.Context, *DeleteTaskRequest) (*DeleteTaskResponse, error)
 	GetTask(context.Context, *GetTaskRequest) (*GetTaskResponse, error)
 	SendTasksByEmail(context.Context, *SendTasksByEmailRequest) (*SendTasksByEmailResponse, error)
+	// Exportação e importação em massa: páginas de tarefas num stream e lotes aplicados um a um
+	StreamTasks(*StreamTasksRequest, grpc.ServerStreamingServer[ListTasksResponse]) error
+	ImportTasks(grpc.ClientStreamingServer[ImportTasksRequest, ImportTasksResponse]) error
 	mustEmbedUnimplementedTaskServiceServer()
 }
 
@@ -149,6 +189,12 @@ func (UnimplementedTaskServiceServer) GetTask(context.Context, *GetTaskRequest)
 func (UnimplementedTaskServiceServer) SendTasksByEmail(context.Context, *SendTasksByEmailRequest) (*SendTasksByEmailResponse, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method SendTasksByEmail not implemented")
 }
+func (UnimplementedTaskServiceServer) StreamTasks(*StreamTasksRequest, grpc.ServerStreamingServer[ListTasksResponse]) error {
+	return status.Errorf(codes.Unimplemented, "method StreamTasks not implemented")
+}
+func (UnimplementedTaskServiceServer) ImportTasks(grpc.ClientStreamingServer[ImportTasksRequest, ImportTasksResponse]) error {
+	return status.Errorf(codes.Unimplemented, "method ImportTasks not implemented")
+}
 func (UnimplementedTaskServiceServer) mustEmbedUnimplementedTaskServiceServer() {}
 func (UnimplementedTaskServiceServer) testEmbeddedByValue()                     {}
 
@@ -278,6 +324,24 @@ func _TaskService_SendTasksByEmail_Handler(srv interface{}, ctx context.Context,
 	return interceptor(ctx, in, info, handler)
 }
 
+func _TaskService_StreamTasks_Handler(srv interface{}, stream grpc.ServerStream) error {
+	m := new(StreamTasksRequest)
+	if err := stream.RecvMsg(m); err != nil {
+		return err
+	}
+	return srv.(TaskServiceServer).StreamTasks(m, &grpc.GenericServerStream[StreamTasksRequest, ListTasksResponse]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TaskService_StreamTasksServer = grpc.ServerStreamingServer[ListTasksResponse]
+
+func _TaskService_ImportTasks_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(TaskServiceServer).ImportTasks(&grpc.GenericServerStream[ImportTasksRequest, ImportTasksResponse]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TaskService_ImportTasksServer = grpc.ClientStreamingServer[ImportTasksRequest, ImportTasksResponse]
+
 // TaskService_ServiceDesc is the grpc.ServiceDesc for TaskService service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -310,6 +374,17 @@ var TaskService_ServiceDesc = grpc.ServiceDesc{
 			Handler:    _TaskService_SendTasksByEmail_Handler,
 		},
 	},
-	Streams:  []grpc.StreamDesc{},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "StreamTasks",
+			Handler:       _TaskService_StreamTasks_Handler,
+			ServerStreams: true,
+		},
+		{
+			StreamName:    "ImportTasks",
+			Handler:       _TaskService_ImportTasks_Handler,
+			ClientStreams: true,
+		},
+	},
 	Metadata: "tasks.proto",
 }
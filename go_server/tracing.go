@@ -0,0 +1,222 @@
+package main
+
+// Distributed tracing for the TaskService, the Go counterpart of the Python 'tracing' package.
+// The API Gateway sends the W3C trace context in the 'traceparent' gRPC metadata key; when that
+// trace is sampled, the unary and stream interceptors record a server span for the call. Spans
+// are batched and appended to TRACE_EXPORT_FILE as OTLP/JSON ExportTraceServiceRequest lines,
+// the same file format the Python services write. The service never starts traces of its own: the gateway
+// decides what is sampled. Without TRACE_EXPORT_FILE tracing is off.
+
+import (
+	"context"
+	"crypto/rand"
+	"encoding/hex"
+	"encoding/json"
+	"log"
+	"os"
+	"strconv"
+	"strings"
+	"sync/atomic"
+	"time"
+
+	"google.golang.org/grpc"
+	"google.golang.org/grpc/metadata"
+	"google.golang.org/grpc/status"
+)
+
+const (
+	traceparentHeader  = "traceparent"
+	spanKindServer     = 2
+	statusCodeError    = 2
+	traceQueueSize     = 2048
+	traceBatchSize     = 512
+	traceFlushInterval = time.Second
+)
+
+type otlpAttribute struct {
+	Key   string            `json:"key"`
+	Value map[string]string `json:"value"`
+}
+
+type otlpStatus struct {
+	Code    int    `json:"code"`
+	Message string `json:"message,omitempty"`
+}
+
+type otlpSpan struct {
+	TraceID           string          `json:"traceId"`
+	SpanID            string          `json:"spanId"`
+	ParentSpanID      string          `json:"parentSpanId,omitempty"`
+	Name              string          `json:"name"`
+	Kind              int             `json:"kind"`
+	StartTimeUnixNano string          `json:"startTimeUnixNano"`
+	EndTimeUnixNano   string          `json:"endTimeUnixNano"`
+	Attributes        []otlpAttribute `json:"attributes"`
+	Status            *otlpStatus     `json:"status,omitempty"`
+}
+
+type tracer struct {
+	serviceName string
+	path        string
+	spans       chan otlpSpan
+	dropped     uint64
+}
+
+// newTracerFromEnv returns nil (tracing off) unless TRACE_EXPORT_FILE is set.
+func newTracerFromEnv() *tracer {
+	path := os.Getenv("TRACE_EXPORT_FILE")
+	if path == "" {
+		return nil
+	}
+	t := &tracer{serviceName: "task-service", path: path, spans: make(chan otlpSpan, traceQueueSize)}
+	go t.run()
+	log.Printf("Tracing: exporting sampled spans to %s", path)
+	return t
+}
+
+// parseTraceparent returns the trace ID and parent span ID of a sampled traceparent
+// ("00-<trace id>-<span id>-<flags>"); ok is false when it is missing, malformed or not sampled.
+func parseTraceparent(value string) (traceID, spanID string, ok bool) {
+	parts := strings.Split(strings.TrimSpace(value), "-")
+	if len(parts) < 4 || len(parts[0]) != 2 || len(parts[1]) != 32 || len(parts[2]) != 16 || len(parts[3]) != 2 {
+		return "", "", false
+	}
+	if _, err := hex.DecodeString(parts[1] + parts[2]); err != nil {
+		return "", "", false
+	}
+	flags, err := strconv.ParseUint(parts[3], 16, 8)
+	if err != nil || flags&1 == 0 || parts[0] == "ff" {
+		return "", "", false
+	}
+	return strings.ToLower(parts[1]), strings.ToLower(parts[2]), true
+}
+
+func newSpanID() string {
+	b := make([]byte, 8)
+	rand.Read(b)
+	return hex.EncodeToString(b)
+}
+
+// incomingTrace returns the sampled trace context the gateway sent in the call's metadata.
+func incomingTrace(ctx context.Context) (traceID, parentID string, ok bool) {
+	md, _ := metadata.FromIncomingContext(ctx)
+	values := md.Get(traceparentHeader)
+	if len(values) == 0 {
+		return "", "", false
+	}
+	return parseTraceparent(values[0])
+}
+
+// unaryInterceptor records a server span for every call that continues a sampled trace.
+func (t *tracer) unaryInterceptor() grpc.UnaryServerInterceptor {
+	return func(ctx context.Context, req interface{}, info *grpc.UnaryServerInfo, handler grpc.UnaryHandler) (interface{}, error) {
+		if t == nil {
+			return handler(ctx, req)
+		}
+		traceID, parentID, ok := incomingTrace(ctx)
+		if !ok {
+			return handler(ctx, req)
+		}
+		start := time.Now()
+		resp, err := handler(ctx, req)
+		t.record(traceID, parentID, info.FullMethod, start, err)
+		return resp, err
+	}
+}
+
+// streamInterceptor does the same for streaming calls (StreamTasks, ImportTasks); the span
+// covers the whole stream.
+func (t *tracer) streamInterceptor() grpc.StreamServerInterceptor {
+	return func(srv interface{}, ss grpc.ServerStream, info *grpc.StreamServerInfo, handler grpc.StreamHandler) error {
+		if t == nil {
+			return handler(srv, ss)
+		}
+		traceID, parentID, ok := incomingTrace(ss.Context())
+		if !ok {
+			return handler(srv, ss)
+		}
+		start := time.Now()
+		err := handler(srv, ss)
+		t.record(traceID, parentID, info.FullMethod, start, err)
+		return err
+	}
+}
+
+// record queues the server span of a finished call.
+func (t *tracer) record(traceID, parentID, fullMethod string, start time.Time, err error) {
+	method := strings.TrimPrefix(fullMethod, "/")
+	span := otlpSpan{
+		TraceID:           traceID,
+		SpanID:            newSpanID(),
+		ParentSpanID:      parentID,
+		Name:              method,
+		Kind:              spanKindServer,
+		StartTimeUnixNano: strconv.FormatInt(start.UnixNano(), 10),
+		EndTimeUnixNano:   strconv.FormatInt(time.Now().UnixNano(), 10),
+		Attributes: []otlpAttribute{
+			{Key: "rpc.system", Value: map[string]string{"stringValue": "grpc"}},
+			{Key: "rpc.method", Value: map[string]string{"stringValue": method}},
+			{Key: "rpc.grpc.status_code", Value: map[string]string{"intValue": strconv.Itoa(int(status.Code(err)))}},
+		},
+	}
+	if err != nil {
+		span.Status = &otlpStatus{Code: statusCodeError, Message: err.Error()}
+	}
+	select {
+	case t.spans <- span:
+	default:
+		atomic.AddUint64(&t.dropped, 1) // Queue full: drop the span rather than slow the call down
+	}
+}
+
+// run writes spans in batches of up to traceBatchSize, at least every traceFlushInterval.
+func (t *tracer) run() {
+	ticker := time.NewTicker(traceFlushInterval)
+	defer ticker.Stop()
+	batch := make([]otlpSpan, 0, traceBatchSize)
+	for {
+		select {
+		case span := <-t.spans:
+			batch = append(batch, span)
+			if len(batch) < traceBatchSize {
+				continue
+			}
+		case <-ticker.C:
+			if len(batch) == 0 {
+				continue
+			}
+		}
+		t.write(batch)
+		batch = batch[:0]
+	}
+}
+
+func (t *tracer) write(batch []otlpSpan) {
+	document := map[string]interface{}{
+		"resourceSpans": []interface{}{map[string]interface{}{
+			"resource": map[string]interface{}{"attributes": []otlpAttribute{
+				{Key: "service.name", Value: map[string]string{"stringValue": t.serviceName}},
+				{Key: "process.pid", Value: map[string]string{"intValue": strconv.Itoa(os.Getpid())}},
+			}},
+			"scopeSpans": []interface{}{map[string]interface{}{
+				"scope": map[string]string{"name": "tracing"},
+				"spans": batch,
+			}},
+		}},
+	}
+	body, err := json.Marshal(document)
+	if err != nil {
+		log.Printf("Tracing: could not encode %d spans: %v", len(batch), err)
+		return
+	}
+	// One write per batch with O_APPEND, so the file can be shared with the Python services.
+	f, err := os.OpenFile(t.path, os.O_APPEND|os.O_CREATE|os.O_WRONLY, 0644)
+	if err != nil {
+		log.Printf("Tracing: could not export %d spans: %v", len(batch), err)
+		return
+	}
+	defer f.Close()
+	if _, err := f.Write(append(body, '\n')); err != nil {
+		log.Printf("Tracing: could not export %d spans: %v", len(batch), err)
+	}
+}
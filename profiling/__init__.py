@@ -0,0 +1,8 @@
+# profiling/__init__.py
+# On-demand sampling profiler for the live API Gateway and SOAP UserService processes.
+# Shared by both services (each adds the project root to sys.path), like python_client/.
+from profiling.sampler import (
+    DEFAULT_INTERVAL_MS, DEFAULT_SECONDS, MAX_SECONDS, ProfileResult, ProfilerBusy,
+    profile_settings, sample_process, token_matches,
+)
+from profiling.wsgi import ProfilingMiddleware
@@ -0,0 +1,117 @@
+# profiling/sampler.py
+# Time-boxed sampling profiler over sys._current_frames().
+#
+# A session starts a thread that, every 'interval' seconds, walks the Python stack of every
+# other thread and counts it. The result is in the "collapsed stacks" format read by
+# flamegraph.pl, speedscope and inferno ("frame;frame;frame count" per line, root first).
+# Nothing is installed while no session runs (no sys.setprofile/settrace hooks), so the cost
+# when profiling is off is zero. Unlike cProfile, which only sees the thread that enables it,
+# sampling covers every thread (e.g. the WSGI request threads of the SOAP service).
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 60.0
+DEFAULT_INTERVAL_MS = 10.0 # 100 Hz
+MIN_INTERVAL_MS = 1.0
+
+# Leaf frames of threads that are blocked waiting for work; left out unless idle=True,
+# so the profile shows where CPU goes rather than where threads sleep.
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("selectors.py", "poll"),
+    ("threading.py", "wait"),
+    ("threading.py", "run"), # Thread running a C target, e.g. grpc's poller
+    ("socketserver.py", "serve_forever"),
+    ("socket.py", "accept"),
+    ("socket.py", "readinto"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+# One session per process: two samplers would only measure each other.
+_session_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """A profiling session is already running in this process."""
+
+
+class ProfileResult:
+    def __init__(self, stacks: Counter, samples: int, idle_samples: int, seconds: float, interval: float):
+        self.stacks = stacks
+        self.samples = samples           # Thread stacks looked at
+        self.idle_samples = idle_samples # ... of which were left out as idle
+        self.seconds = seconds
+        self.interval = interval
+
+    def collapsed(self) -> str:
+        """Flamegraph-ready collapsed stacks, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_settings(seconds=None, interval_ms=None):
+    """Validated (seconds, interval in seconds); ValueError with a readable message otherwise."""
+    seconds = DEFAULT_SECONDS if seconds is None else float(seconds)
+    interval_ms = DEFAULT_INTERVAL_MS if interval_ms is None else float(interval_ms)
+    if not 0 < seconds <= MAX_SECONDS:
+        raise ValueError(f"'seconds' must be in (0, {MAX_SECONDS:g}].")
+    if not MIN_INTERVAL_MS <= interval_ms <= seconds * 1000:
+        raise ValueError(f"'interval_ms' must be between {MIN_INTERVAL_MS:g} and the session length.")
+    return seconds, interval_ms / 1000
+
+
+def token_matches(expected: str, provided: str) -> bool:
+    """Constant-time token check; profiling is disabled (never matches) without a configured token."""
+    return bool(expected) and provided is not None and hmac.compare_digest(expected.encode(), provided.encode())
+
+
+def _short_path(filename: str) -> str:
+    # 'spyne/application.py' rather than the full site-packages path
+    parent, name = os.path.split(filename)
+    return f"{os.path.basename(parent)}/{name}" if parent else name
+
+
+def sample_process(seconds: float, interval: float, idle: bool = False) -> ProfileResult:
+    """Samples every thread except the caller for 'seconds'. Blocks the calling thread
+    (run it in a worker thread from async code). Raises ProfilerBusy if a session is running."""
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profiling session is already running in this process.")
+    try:
+        own_ident = threading.get_ident()
+        labels = {} # code object -> frame label, formatted once per function
+        stacks = Counter()
+        samples = idle_samples = 0
+        deadline = time.monotonic() + seconds
+        while True:
+            started = time.monotonic()
+            if started >= deadline:
+                break
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                samples += 1
+                leaf = frame.f_code
+                if not idle and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                    idle_samples += 1
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                    names.append(label)
+                    frame = frame.f_back
+                names.append(f"thread:{thread_names.get(ident, ident)}")
+                stacks[";".join(reversed(names))] += 1
+            frame = None # Do not keep the last sampled frame (and its locals) alive
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        return ProfileResult(stacks, samples, idle_samples, seconds, interval)
+    finally:
+        _session_lock.release()
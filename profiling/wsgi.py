@@ -0,0 +1,55 @@
+# profiling/wsgi.py
+# The sampling profiler as WSGI middleware, for the Spyne wsgi_app of the SOAP UserService:
+#
+#   POST <path>?seconds=10&interval_ms=10[&idle=true]   with header  X-Admin-Token: <token>
+#
+# answers text/plain collapsed stacks after the session. Every other request goes straight to
+# the wrapped application; without a token the path is not intercepted at all.
+# The session blocks the handling thread, so serve with a threaded WSGI server.
+import logging
+import os
+from urllib.parse import parse_qs
+
+from profiling.sampler import ProfilerBusy, profile_settings, sample_process, token_matches
+
+ADMIN_TOKEN_ENVIRON = "HTTP_X_ADMIN_TOKEN" # 'X-Admin-Token' request header
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, token: str, path: str = "/admin/profile"):
+        self.app = app
+        self.token = token
+        self.path = path
+
+    def __call__(self, environ, start_response):
+        if not self.token or environ.get("PATH_INFO", "").rstrip("/") != self.path:
+            return self.app(environ, start_response)
+        if environ.get("REQUEST_METHOD") != "POST":
+            return self._respond(start_response, "405 Method Not Allowed", "Use POST.\n", [("Allow", "POST")])
+        if not token_matches(self.token, environ.get(ADMIN_TOKEN_ENVIRON)):
+            return self._respond(start_response, "403 Forbidden", "Missing or invalid X-Admin-Token.\n")
+
+        query = {name: values[-1] for name, values in parse_qs(environ.get("QUERY_STRING", "")).items()}
+        try:
+            seconds, interval = profile_settings(query.get("seconds"), query.get("interval_ms"))
+        except ValueError as e:
+            return self._respond(start_response, "400 Bad Request", f"{e}\n")
+        idle = query.get("idle", "false").lower() in ("1", "true", "yes")
+
+        logging.info(f"Profiling: sampling for {seconds:g}s every {interval * 1000:g}ms")
+        try:
+            result = sample_process(seconds, interval, idle)
+        except ProfilerBusy as e:
+            return self._respond(start_response, "409 Conflict", f"{e}\n")
+        return self._respond(start_response, "200 OK", result.collapsed(), [
+            ("X-Profile-Samples", str(result.samples)),
+            ("X-Profile-Idle-Samples", str(result.idle_samples)),
+            ("X-Profiled-Pid", str(os.getpid())),
+        ])
+
+    @staticmethod
+    def _respond(start_response, status, text, headers=()):
+        body = text.encode()
+        start_response(status, [("Content-Type", "text/plain; charset=utf-8"),
+                                ("Content-Length", str(len(body))), *headers])
+        return [body]
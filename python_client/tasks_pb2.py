@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0btasks.proto\x12\x05tasks\"Z\n\x04Task\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x12\n\ncreated_by\x18\x05 \x01(\t\"K\n\x11\x43reateTaskRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x12\n\ncreated_by\x18\x03 \x01(\t\"@\n\x12\x43reateTaskResponse\x12\x19\n\x04task\x18\x01 \x01(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x12\n\x10ListTasksRequest\"@\n\x11ListTasksResponse\x12\x1a\n\x05tasks\x18\x01 \x03(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"S\n\x11UpdateTaskRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\"@\n\x12UpdateTaskResponse\x12\x19\n\x04task\x18\x01 \x01(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x1f\n\x11\x44\x65leteTaskRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"6\n\x12\x44\x65leteTaskResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x1c\n\x0eGetTaskRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"=\n\x0fGetTaskResponse\x12\x19\n\x04task\x18\x01 \x01(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x17SendTasksByEmailRequest\x12\x17\n\x0frecipient_email\x18\x01 \x01(\t\"<\n\x18SendTasksByEmailResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xa5\x03\n\x0bTaskService\x12\x41\n\nCreateTask\x12\x18.tasks.CreateTaskRequest\x1a\x19.tasks.CreateTaskResponse\x12>\n\tListTasks\x12\x17.tasks.ListTasksRequest\x1a\x18.tasks.ListTasksResponse\x12\x41\n\nUpdateTask\x12\x18.tasks.UpdateTaskRequest\x1a\x19.tasks.UpdateTaskResponse\x12\x41\n\nDeleteTask\x12\x18.tasks.DeleteTaskRequest\x1a\x19.tasks.DeleteTaskResponse\x12\x38\n\x07GetTask\x12\x15.tasks.GetTaskRequest\x1a\x16.tasks.GetTaskResponse\x12S\n\x10SendTasksByEmail\x12\x1e.tasks.SendTasksByEmailRequest\x1a\x1f.tasks.SendTasksByEmailResponseB>Z<lista_de_tarefas_megazord_com_rest_soap_api_mom/go_server/pbb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0btasks.proto\x12\x05tasks\"Z\n\x04Task\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x12\n\ncreated_by\x18\x05 \x01(\t\"K\n\x11\x43reateTaskRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x12\n\ncreated_by\x18\x03 \x01(\t\"@\n\x12\x43reateTaskResponse\x12\x19\n\x04task\x18\x01 \x01(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x12\n\x10ListTasksRequest\"@\n\x11ListTasksResponse\x12\x1a\n\x05tasks\x18\x01 \x03(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"S\n\x11UpdateTaskRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\"@\n\x12UpdateTaskResponse\x12\x19\n\x04task\x18\x01 \x01(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x1f\n\x11\x44\x65leteTaskRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"6\n\x12\x44\x65leteTaskResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x1c\n\x0eGetTaskRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"=\n\x0fGetTaskResponse\x12\x19\n\x04task\x18\x01 \x01(\x0b\x32\x0b.tasks.Task\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x17SendTasksByEmailRequest\x12\x17\n\x0frecipient_email\x18\x01 \x01(\t\"<\n\x18SendTasksByEmailResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"9\n\x12StreamTasksRequest\x12\x10\n\x08\x61\x66ter_id\x18\x01 \x01(\x05\x12\x11\n\tpage_size\x18\x02 \x01(\x05\"0\n\x12ImportTasksRequest\x12\x1a\n\x05tasks\x18\x01 \x03(\x0b\x32\x0b.tasks.Task\"Z\n\x13ImportTasksResponse\x12\x10\n\x08imported\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0f\n\x07\x63reated\x18\x03 \x01(\x05\x12\x0f\n\x07updated\x18\x04 \x01(\x05\x32\xb3\x04\n\x0bTaskService\x12\x41\n\nCreateTask\x12\x18.tasks.CreateTaskRequest\x1a\x19.tasks.CreateTaskResponse\x12>\n\tListTasks\x12\x17.tasks.ListTasksRequest\x1a\x18.tasks.ListTasksResponse\x12\x41\n\nUpdateTask\x12\x18.tasks.UpdateTaskRequest\x1a\x19.tasks.UpdateTaskResponse\x12\x41\n\nDeleteTask\x12\x18.tasks.DeleteTaskRequest\x1a\x19.tasks.DeleteTaskResponse\x12\x38\n\x07GetTask\x12\x15.tasks.GetTaskRequest\x1a\x16.tasks.GetTaskResponse\x12S\n\x10SendTasksByEmail\x12\x1e.tasks.SendTasksByEmailRequest\x1a\x1f.tasks.SendTasksByEmailResponse\x12\x44\n\x0bStreamTasks\x12\x19.tasks.StreamTasksRequest\x1a\x18.tasks.ListTasksResponse0\x01\x12\x46\n\x0bImportTasks\x12\x19.tasks.ImportTasksRequest\x1a\x1a.tasks.ImportTasksResponse(\x01\x42>Z<lista_de_tarefas_megazord_com_rest_soap_api_mom/go_server/pbb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -58,6 +58,12 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_SENDTASKSBYEMAILREQUEST']._serialized_end=726
   _globals['_SENDTASKSBYEMAILRESPONSE']._serialized_start=728
   _globals['_SENDTASKSBYEMAILRESPONSE']._serialized_end=788
-  _globals['_TASKSERVICE']._serialized_start=791
-  _globals['_TASKSERVICE']._serialized_end=1212
+  _globals['_STREAMTASKSREQUEST']._serialized_start=790
+  _globals['_STREAMTASKSREQUEST']._serialized_end=847
+  _globals['_IMPORTTASKSREQUEST']._serialized_start=849
+  _globals['_IMPORTTASKSREQUEST']._serialized_end=897
+  _globals['_IMPORTTASKSRESPONSE']._serialized_start=899
+  _globals['_IMPORTTASKSRESPONSE']._serialized_end=989
+  _globals['_TASKSERVICE']._serialized_start=992
+  _globals['_TASKSERVICE']._serialized_end=1555
 # @@protoc_insertion_point(module_scope)
@@ -65,6 +65,16 @@ class TaskServiceStub(object):
                 request_serializer=tasks__pb2.SendTasksByEmailRequest.SerializeToString,
                 response_deserializer=tasks__pb2.SendTasksByEmailResponse.FromString,
                 _registered_method=True)
+        self.StreamTasks = channel.unary_stream(
+                '/tasks.TaskService/StreamTasks',
+                request_serializer=tasks__pb2.StreamTasksRequest.SerializeToString,
+                response_deserializer=tasks__pb2.ListTasksResponse.FromString,
+                _registered_method=True)
+        self.ImportTasks = channel.stream_unary(
+                '/tasks.TaskService/ImportTasks',
+                request_serializer=tasks__pb2.ImportTasksRequest.SerializeToString,
+                response_deserializer=tasks__pb2.ImportTasksResponse.FromString,
+                _registered_method=True)
 
 
 class TaskServiceServicer(object):
@@ -107,6 +117,19 @@ class TaskServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTasks(self, request, context):
+        """Exportação e importação em massa: páginas de tarefas num stream e lotes aplicados um a um
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ImportTasks(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TaskServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -140,6 +163,16 @@ def add_TaskServiceServicer_to_server(servicer, server):
                     request_deserializer=tasks__pb2.SendTasksByEmailRequest.FromString,
                     response_serializer=tasks__pb2.SendTasksByEmailResponse.SerializeToString,
             ),
+            'StreamTasks': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTasks,
+                    request_deserializer=tasks__pb2.StreamTasksRequest.FromString,
+                    response_serializer=tasks__pb2.ListTasksResponse.SerializeToString,
+            ),
+            'ImportTasks': grpc.stream_unary_rpc_method_handler(
+                    servicer.ImportTasks,
+                    request_deserializer=tasks__pb2.ImportTasksRequest.FromString,
+                    response_serializer=tasks__pb2.ImportTasksResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'tasks.TaskService', rpc_method_handlers)
@@ -313,3 +346,57 @@ class TaskService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamTasks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/tasks.TaskService/StreamTasks',
+            tasks__pb2.StreamTasksRequest.SerializeToString,
+            tasks__pb2.ListTasksResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ImportTasks(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/tasks.TaskService/ImportTasks',
+            tasks__pb2.ImportTasksRequest.SerializeToString,
+            tasks__pb2.ImportTasksResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
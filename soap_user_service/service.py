@@ -1,31 +1,98 @@
 # soap_user_service/service.py
 from spyne import Application, rpc, ServiceBase, Integer, Unicode, Iterable, Array
 from spyne.protocol.soap import Soap11
+from spyne.error import ResourceNotFoundError
+from spyne.model.fault import Fault
 from spyne.server.wsgi import WsgiApplication
 from wsgiref.simple_server import make_server
+import bisect
 import logging
+import os
+import sys
 import threading # For thread-safe in-memory storage
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer
 
 # NEW: Import ComplexModel for data types
 from spyne.model.complex import ComplexModel
 
+# The 'profiling' and 'tracing' packages (shared with the API Gateway) live in the project root.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from profiling import ProfilingMiddleware
+from tracing import instrument_spyne, tracer_from_env
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # In-memory storage for users
 users_db = {}
+user_ids = [] # IDs in users_db in ascending order, so list_users_page can page without scanning the ID range
 next_user_id = 1
 users_lock = threading.Lock() # For thread-safe access in case of multiple requests
 
+# Store version, bumped on every mutation. The epoch prefix keeps versions from a previous
+# run of the service from ever matching the current one. The gateway turns it into ETags.
+users_epoch = time.time_ns()
+users_version = 0
+STORE_VERSION_HEADER = 'X-Store-Version'
+NOT_MODIFIED_HEADER = 'X-Not-Modified'
+IF_NONE_MATCH_VERSION_ENV = 'HTTP_X_IF_NONE_MATCH_VERSION' # 'X-If-None-Match-Version' request header
+
+# Page sizes for list_users_page (bulk export)
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
+# Highest ID import_users accepts or assigns; the same bound as the TaskService's int32 IDs
+MAX_USER_ID = 2**31 - 2
+
+def current_users_version():
+    """Returns the store version as '<epoch>.<counter>'. Call with users_lock held."""
+    return f"{users_epoch:x}.{users_version}"
+
+def check_import_ids(users):
+    """
+    Validates the IDs of an import_users batch, following the IDs that the users without one
+    would get. Call with users_lock held.
+    """
+    next_id = next_user_id
+    for position, user in enumerate(users, 1):
+        user_id = user.user_id or 0
+        if user_id < 0 or user_id > MAX_USER_ID:
+            raise Fault('Client.InvalidId',
+                        f"User {position} of the batch: ID {user_id} is outside 1..{MAX_USER_ID} (none assigns a new ID).")
+        if user_id == 0:
+            if next_id > MAX_USER_ID:
+                raise Fault('Client.IdsExhausted', f"User {position} of the batch: no user IDs left above {MAX_USER_ID}.")
+            user_id = next_id
+        next_id = max(next_id, user_id + 1)
+
+# Namespace of the service and of its types. Pinned on each type: by default Spyne puts a type in a
+# namespace named after its module, which is '__main__' when this file is run as a script and
+# 'service' when it is imported, so clients could not rely on either.
+TYPES_NAMESPACE = 'urn:user.service.soap'
+
 # Define the User object (Spyne will convert this to WSDL types)
 # CHANGED: Inherit from ComplexModel instead of ServiceBase
 class User(ComplexModel):
     __type_name__ = 'User' # Optional: name for the WSDL type
+    __namespace__ = TYPES_NAMESPACE
 
     user_id = Integer
     name = Unicode
     email = Unicode
 
+# Result of import_users: imported = created + updated
+class ImportResult(ComplexModel):
+    __type_name__ = 'ImportResult'
+    __namespace__ = TYPES_NAMESPACE
+
+    imported = Integer
+    created = Integer
+    updated = Integer
+
 # Define the SOAP service
 class UserService(ServiceBase):
     @rpc(Unicode, Unicode, _returns=User)
@@ -33,12 +100,14 @@ class UserService(ServiceBase):
         """
         Creates a new user.
         """
-        global next_user_id
+        global next_user_id, users_version
         with users_lock:
             user_id = next_user_id
             next_user_id += 1
             user = User(user_id=user_id, name=name, email=email)
             users_db[user_id] = user
+            user_ids.append(user_id) # next_user_id is above every stored ID
+            users_version += 1
             logging.info(f"User created: ID={user_id}, Name='{name}', Email='{email}'")
             return user
 
@@ -46,9 +115,18 @@ class UserService(ServiceBase):
     def list_users(ctx):
         """
         Lists all registered users.
+        If the caller sends the current store version in 'X-If-None-Match-Version',
+        an empty list is returned with 'X-Not-Modified: true' instead.
         """
         logging.info("Received request to list users.")
+        transport = ctx.transport
         with users_lock:
+            version = current_users_version()
+            transport.resp_headers[STORE_VERSION_HEADER] = version
+            if transport.req_env.get(IF_NONE_MATCH_VERSION_ENV) == version:
+                transport.resp_headers[NOT_MODIFIED_HEADER] = 'true'
+                logging.info(f"Users not modified since version {version}.")
+                return []
             users = list(users_db.values())
             logging.info(f"Returning {len(users)} users.")
             return users
@@ -66,23 +144,116 @@ class UserService(ServiceBase):
                 return user
             else:
                 logging.warning(f"User with ID {user_id} not found.")
-                # Spyne can return SOAP Faults for errors
-                raise ValueError(f"User with ID {user_id} not found.")
+                # Client fault (ResourceNotFound) with a readable faultstring, not a generic Server fault
+                raise ResourceNotFoundError(f"User with ID {user_id}")
+
+    @rpc(Array(Integer), _returns=Array(User))
+    def get_users(ctx, user_ids):
+        """
+        Gets several users by ID in one call (the gateway's ?expand=created_by). IDs without a
+        user are left out of the result instead of failing the call; at most MAX_PAGE_SIZE IDs.
+        """
+        user_ids = list(user_ids or [])
+        if len(user_ids) > MAX_PAGE_SIZE:
+            raise Fault('Client.TooManyIds', f"get_users takes at most {MAX_PAGE_SIZE} IDs, got {len(user_ids)}.")
+        with users_lock:
+            users = [users_db[user_id] for user_id in dict.fromkeys(user_ids) if user_id in users_db]
+        logging.info(f"Returning {len(users)} of {len(user_ids)} requested users.")
+        return users
+
+    @rpc(Integer, Integer, _returns=Array(User))
+    def list_users_page(ctx, after_id, limit):
+        """
+        Lists up to 'limit' users with an ID above 'after_id', in ID order (bulk export).
+        An empty page means there are no more users.
+        """
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        with users_lock:
+            start = bisect.bisect_right(user_ids, after_id or 0)
+            users = [users_db[user_id] for user_id in user_ids[start:start + limit]]
+        logging.info(f"Returning a page of {len(users)} users after ID {after_id or 0}.")
+        return users
+
+    @rpc(Array(User), _returns=ImportResult)
+    def import_users(ctx, users):
+        """
+        Imports a batch of users (bulk import). Users with an ID (1..MAX_USER_ID) keep it: a new ID
+        creates the user and an existing one replaces it (upsert, so importing the same export
+        twice changes nothing). Users without one get a new ID. A batch with an invalid ID is
+        rejected with a Client fault before any of it is applied.
+        """
+        global next_user_id, users_version
+        users = users or []
+        created = updated = 0
+        with users_lock:
+            check_import_ids(users)
+            for user in users:
+                user_id = user.user_id or next_user_id
+                next_user_id = max(next_user_id, user_id + 1)
+                if user_id in users_db:
+                    updated += 1
+                else:
+                    created += 1
+                    bisect.insort(user_ids, user_id)
+                users_db[user_id] = User(user_id=user_id, name=user.name, email=user.email)
+            if users:
+                users_version += 1
+        logging.info(f"Imported a batch of {len(users)} users ({created} created, {updated} updated).")
+        return ImportResult(imported=len(users), created=created, updated=updated)
 
 # Create the Spyne application
 application = Application([UserService],
-                          tns='urn:user.service.soap', # Target Namespace
+                          tns=TYPES_NAMESPACE, # Target Namespace
                           in_protocol=Soap11(validator='lxml'),
                           out_protocol=Soap11())
 
 # Create the WSGI application
 wsgi_app = WsgiApplication(application)
 
+# The same UserService over MessagePack-RPC, for internal callers (the API Gateway) that would
+# otherwise pay for XML envelopes in both directions. Served on MSGPACK_RPC_PATH; the SOAP
+# endpoint and its WSDL stay as they are. Requires 'pip install msgpack'.
+MSGPACK_RPC_PATH = '/msgpack'
+try:
+    from spyne.protocol.msgpack import MessagePackRpc
+    msgpack_application = Application([UserService],
+                                      tns=TYPES_NAMESPACE,
+                                      in_protocol=MessagePackRpc(validator='soft'),
+                                      out_protocol=MessagePackRpc())
+    msgpack_wsgi_app = WsgiApplication(msgpack_application)
+except ImportError:
+    msgpack_wsgi_app = None
+
+# Distributed tracing: one server span per call that arrives with a sampled 'traceparent'
+# (SOAP header or HTTP header). Off unless TRACE_EXPORT_FILE or TRACE_OTLP_ENDPOINT is set.
+tracer = tracer_from_env('user-service')
+instrument_spyne(wsgi_app, tracer, 'UserService', 'soap')
+if msgpack_wsgi_app is not None:
+    instrument_spyne(msgpack_wsgi_app, tracer, 'UserService', 'msgpack-rpc')
+
+def route_protocol(environ, start_response):
+    """Routes MSGPACK_RPC_PATH to the MessagePack-RPC application and everything else to SOAP."""
+    if msgpack_wsgi_app is not None and environ.get('PATH_INFO', '').rstrip('/') == MSGPACK_RPC_PATH:
+        return msgpack_wsgi_app(environ, start_response)
+    return wsgi_app(environ, start_response)
+
+# On-demand profiling: POST /admin/profile?seconds=10 with 'X-Admin-Token: <token>' returns
+# collapsed stacks of this process. Disabled (a plain pass-through) unless
+# USER_SERVICE_ADMIN_TOKEN is set.
+service_app = ProfilingMiddleware(route_protocol, token=os.environ.get('USER_SERVICE_ADMIN_TOKEN'))
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """One thread per request, so a slow call (or a profiling session) does not block the others."""
+    daemon_threads = True
+    request_queue_size = 1024 # socketserver's default backlog of 5 resets bursts
+
 if __name__ == '__main__':
     host = '0.0.0.0'
-    port = 8001
+    port = int(os.environ.get('USER_SERVICE_PORT', '8001'))
     logging.info(f"SOAP User Service listening on http://{host}:{port}/")
     logging.info(f"WSDL available at http://{host}:{port}/?wsdl")
-    server = make_server(host, port, wsgi_app)
+    if msgpack_wsgi_app is not None:
+        logging.info(f"MessagePack-RPC endpoint at http://{host}:{port}{MSGPACK_RPC_PATH}")
+    server = make_server(host, port, service_app, server_class=ThreadingWSGIServer)
     server.serve_forever()
 
@@ -0,0 +1,31 @@
+# tests/conftest.py
+# The gateway modules import each other as top-level modules (they run from api_gateway/), and the
+# benchmark helpers live in the 'benchmarks' package at the project root.
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+API_GATEWAY_DIR = os.path.join(ROOT_DIR, 'api_gateway')
+for path in (ROOT_DIR, API_GATEWAY_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from benchmarks.backends import free_port, wait_for_port  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def user_service_url():
+    """The SOAP UserService started the way the README starts it: 'python service.py' as a script."""
+    port = free_port()
+    env = {**os.environ, "USER_SERVICE_PORT": str(port)}
+    process = subprocess.Popen([sys.executable, "service.py"], cwd=os.path.join(ROOT_DIR, "soap_user_service"),
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
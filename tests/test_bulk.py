@@ -0,0 +1,177 @@
+# tests/test_bulk.py
+# Upload parsing (bulk.py) on its own, then POST /import end to end: the gateway under uvicorn,
+# against the fake TaskService and the real UserService from benchmarks/backends.py.
+import asyncio
+import csv
+import io
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from benchmarks.backends import Backends
+from benchmarks.run import GatewayProcess
+from bulk import CSV, MAX_RECORD_ID, NDJSON, TASKS, USERS, BatchImporter, upload_records
+
+TASK_HEADER = b"id,title,description,status,created_by\n"
+
+
+def parse(chunks, fmt: str, resources: tuple) -> list:
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [record async for record in upload_records(body(), fmt, resources)]
+
+    return asyncio.run(collect())
+
+
+def parse_error(chunks, fmt: str, resources: tuple) -> HTTPException:
+    with pytest.raises(HTTPException) as raised:
+        parse(chunks, fmt, resources)
+    return raised.value
+
+
+def test_csv_quoted_field_may_span_lines_and_chunks():
+    body = TASK_HEADER + b'1,Write,"first line\r\nsecond, with a comma\n""quoted"" third",pendente,2\r\n2,Read,,,\n'
+    for split in (len(TASK_HEADER) + 20, len(TASK_HEADER) + 35, len(body) - 3): # Inside and after the quoted field
+        records = parse([body[:split], body[split:]], CSV, (TASKS,))
+        assert records == [
+            (TASKS, {"id": 1, "title": "Write", "description": 'first line\nsecond, with a comma\n"quoted" third',
+                     "status": "pendente", "created_by": "2"}),
+            (TASKS, {"id": 2, "title": "Read", "description": "", "status": "", "created_by": ""}),
+        ]
+
+
+def test_csv_errors_name_the_line_where_the_record_starts():
+    error = parse_error([TASK_HEADER + b'1,A,"one\ntwo",,\n2,B,,,,\n'], CSV, (TASKS,))
+    assert error.detail == "Line 4: expected 5 fields, got 6."
+    error = parse_error([TASK_HEADER + b'1,A,,,\n2,B,"never closed\nmore\n'], CSV, (TASKS,))
+    assert error.detail == "Line 3: unterminated quoted field."
+
+
+@pytest.mark.parametrize("value", ["-1", str(MAX_RECORD_ID + 1), str(2**63)])
+def test_ids_outside_the_int32_range_are_rejected(value):
+    error = parse_error([TASK_HEADER + f"{value},A,,,\n".encode()], CSV, (TASKS,))
+    assert error.status_code == 400
+    assert error.detail == f"Line 2: ID {value!r} is outside 1..{MAX_RECORD_ID}."
+
+
+def test_ids_at_the_edges_of_the_range():
+    lines = [{"type": "user", "user_id": MAX_RECORD_ID, "name": "Max", "email": "max@example.com"},
+             {"type": "user", "user_id": None, "name": "New", "email": "new@example.com"},
+             {"type": "task", "id": "", "title": "New"}]
+    records = parse(["".join(json.dumps(line) + "\n" for line in lines).encode()], NDJSON, (USERS, TASKS))
+    assert [record["user_id"] for resource, record in records if resource == USERS] == [MAX_RECORD_ID, None]
+    assert [record["id"] for resource, record in records if resource == TASKS] == [0] # 0: the TaskService assigns one
+
+
+def test_batch_importer_adds_up_the_counts_of_each_batch():
+    batches = []
+
+    async def apply_users(batch):
+        batches.append([user["user_id"] for user in batch])
+        return {"imported": len(batch), "created": 1, "updated": len(batch) - 1}
+
+    async def run():
+        importer = BatchImporter({USERS: apply_users}, batch_size=2)
+        for user_id in (1, 2, 3, 4, 5):
+            await importer.add(USERS, {"user_id": user_id})
+        await importer.flush()
+        return importer
+
+    importer = asyncio.run(run())
+    assert batches == [[1, 2], [3, 4], [5]]
+    assert importer.imported == {USERS: 5}
+    assert importer.updated == {USERS: 2}
+
+
+# --- End to end ---
+
+@pytest.fixture
+def gateway():
+    """A gateway that applies imports in batches of 2, over 5 seeded tasks and 3 seeded users."""
+    with Backends(seed_tasks=5, seed_users=3) as backends, \
+            GatewayProcess({**backends.env, "GATEWAY_IMPORT_BATCH_SIZE": "2"}) as gateway:
+        with httpx.Client(base_url=gateway.base_url, timeout=30) as client:
+            yield client
+
+
+def export_tasks(client) -> dict:
+    response = client.get("/export", params={"format": "csv", "resource": "tasks"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    return {int(row["id"]): row for row in rows}
+
+
+def test_csv_import_counts_created_and_updated_tasks(gateway):
+    body = (TASK_HEADER + b'3,Replaced,"line one\nline two",concluida,1\n'
+            b'100,First,,,\n,Assigned,,,\n100,Second,,,\n')
+    chunks = [body[i:i + 16] for i in range(0, len(body), 16)]
+    response = gateway.post("/import", params={"format": "csv", "resource": "tasks"}, content=iter(chunks))
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == {"tasks": 4}
+    assert result["updated"] == {"tasks": 2} # Seeded task 3, and task 100 imported twice
+    assert result["message"] == "4 records imported (2 created, 2 updated)."
+    tasks = export_tasks(gateway)
+    assert sorted(tasks) == [1, 2, 3, 4, 5, 100, 101]
+    assert tasks[3]["description"] == "line one\nline two"
+    assert tasks[100]["title"] == "Second"
+    assert tasks[101]["title"] == "Assigned"
+
+
+def test_ndjson_import_counts_created_and_updated_users(gateway):
+    lines = [{"type": "user", "user_id": 2, "name": "Two", "email": "two@example.com"},
+             {"type": "user", "user_id": 50, "name": "Fifty", "email": "fifty@example.com"},
+             {"type": "task", "id": 1, "title": "Updated"},
+             {"type": "user", "user_id": 50, "name": "Fifty again", "email": "fifty@example.com"},
+             {"type": "user", "name": "Assigned", "email": "new@example.com"}]
+    response = gateway.post("/import", content="".join(json.dumps(line) + "\n" for line in lines))
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == {"users": 4, "tasks": 1}
+    assert result["updated"] == {"users": 2, "tasks": 1}
+    assert result["message"] == "5 records imported (2 created, 3 updated)."
+    users = gateway.get("/export", params={"resource": "users"}).text.splitlines()
+    assert [json.loads(line)["user_id"] for line in users] == [1, 2, 3, 50, 51]
+
+
+def test_out_of_range_id_stops_the_import_after_the_applied_batches(gateway):
+    body = TASK_HEADER + b"10,A,,,\n11,B,,,\n12,C,,,\n" + f"{MAX_RECORD_ID + 1},D,,,\n".encode()
+    response = gateway.post("/import", params={"format": "csv", "resource": "tasks"}, content=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == (f"Line 5: ID '{MAX_RECORD_ID + 1}' is outside 1..{MAX_RECORD_ID}. "
+                                         f"Imported before it: 2 tasks.")
+
+
+def test_task_batch_rejected_mid_stream_is_a_400(gateway):
+    # The gateway cannot know the TaskService has no IDs left after MAX_RECORD_ID; the second
+    # batch is rejected by the backend, after the first one was applied.
+    body = TASK_HEADER + b"10,A,,,\n11,B,,,\n" + f"{MAX_RECORD_ID},Max,,,\n,No ID left,,,\n".encode()
+    response = gateway.post("/import", params={"format": "csv", "resource": "tasks"}, content=body)
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert f"no task IDs left above {MAX_RECORD_ID}" in detail
+    assert "(2 tasks imported before this batch)" in detail
+    assert sorted(export_tasks(gateway)) == [1, 2, 3, 4, 5, 10, 11]
+
+
+def test_user_batch_rejected_mid_stream_is_a_400(gateway):
+    lines = [{"user_id": 10, "name": "A", "email": "a@example.com"},
+             {"user_id": 11, "name": "B", "email": "b@example.com"},
+             {"user_id": MAX_RECORD_ID, "name": "Max", "email": "max@example.com"},
+             {"name": "No ID left", "email": "none@example.com"}]
+    response = gateway.post("/import", params={"resource": "users"},
+                            content="".join(json.dumps(line) + "\n" for line in lines))
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert f"no user IDs left above {MAX_RECORD_ID}" in detail
+    assert detail.endswith("Imported before it: 2 users.")
@@ -0,0 +1,115 @@
+# tests/test_deadlines.py
+import asyncio
+import time
+
+import grpc
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from deadlines import (
+    BULK_DEADLINE_SECONDS, DEFAULT_DEADLINE_SECONDS, MAX_DEADLINE_SECONDS, DeadlineMiddleware, backend_timeout,
+    deadline_for_scope,
+)
+from resilience import Backend, CircuitBreaker
+
+
+def scope(method: str, path: str, timeout: str = None) -> dict:
+    headers = [(b"x-request-timeout", timeout.encode())] if timeout is not None else []
+    return {"type": "http", "method": method, "path": path, "headers": headers}
+
+
+def test_budget_from_header_route_default_and_caps():
+    assert deadline_for_scope(scope("GET", "/tasks/7")).budget == 2.0
+    assert deadline_for_scope(scope("GET", "/tasks")).budget == DEFAULT_DEADLINE_SECONDS
+    assert deadline_for_scope(scope("GET", "/tasks", "0.25")).budget == 0.25
+    assert deadline_for_scope(scope("GET", "/tasks", "9999")).budget == MAX_DEADLINE_SECONDS
+    assert deadline_for_scope(scope("GET", "/export", "9999")).budget == BULK_DEADLINE_SECONDS
+    for ignored in ("soon", "0", "-1"):
+        assert deadline_for_scope(scope("GET", "/tasks", ignored)).budget == DEFAULT_DEADLINE_SECONDS
+
+
+def test_only_a_budget_below_the_route_default_is_client_supplied():
+    assert deadline_for_scope(scope("GET", "/tasks", "0.25")).client_supplied
+    assert not deadline_for_scope(scope("GET", "/tasks", "10")).client_supplied
+    assert not deadline_for_scope(scope("GET", "/tasks")).client_supplied
+
+
+def deadline_app(route):
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware)
+    app.get("/users")(route)
+    return TestClient(app)
+
+
+def test_middleware_answers_504_and_cancels_the_handler_when_the_budget_runs_out():
+    cancelled = []
+
+    async def slow_route():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    started = time.monotonic()
+    response = deadline_app(slow_route).get("/users", headers={"X-Request-Timeout": "0.1"})
+    assert response.status_code == 504
+    assert time.monotonic() - started < 2
+    assert cancelled
+
+
+def test_backend_timeout_is_504_once_the_budget_is_spent():
+    def spent_route():
+        time.sleep(0.06) # Spends the budget without yielding to the middleware
+        return {"timeout": backend_timeout()}
+
+    response = deadline_app(spent_route).get("/users", headers={"X-Request-Timeout": "0.05"})
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Gateway Timeout: request deadline exceeded."
+
+
+def timing_out_backend_app(backend: Backend, error: Exception):
+    async def failing_call():
+        raise error
+
+    async def route():
+        try:
+            await backend.call(failing_call, "list_users")
+        except (httpx.TimeoutException, grpc.RpcError):
+            raise HTTPException(status_code=504, detail="Gateway Timeout: backend did not answer in time.")
+
+    return deadline_app(route)
+
+
+# (failure classifier used by main.py, the timeout its backend client raises)
+BACKEND_TIMEOUTS = [
+    (main.is_soap_failure, httpx.ReadTimeout("timed out")),
+    (main.is_grpc_failure,
+     grpc.aio.AioRpcError(grpc.StatusCode.DEADLINE_EXCEEDED, grpc.aio.Metadata(), grpc.aio.Metadata())),
+]
+
+
+def breaker_backend(is_failure) -> Backend:
+    return Backend("test", is_failure, breaker=CircuitBreaker(min_calls=4, open_seconds=60))
+
+
+def test_timeouts_on_a_client_shortened_deadline_are_not_backend_failures():
+    for is_failure, error in BACKEND_TIMEOUTS:
+        backend = breaker_backend(is_failure)
+        client = timing_out_backend_app(backend, error)
+        for _ in range(10):
+            assert client.get("/users", headers={"X-Request-Timeout": "0.5"}).status_code == 504
+        assert backend.counters["failed"] == 0
+        assert backend.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_timeouts_on_the_route_deadline_open_the_circuit():
+    for is_failure, error in BACKEND_TIMEOUTS:
+        backend = breaker_backend(is_failure)
+        client = timing_out_backend_app(backend, error)
+        statuses = [client.get("/users", headers={"X-Request-Timeout": "10"}).status_code for _ in range(5)]
+        assert statuses == [504, 504, 504, 504, 503]
+        assert backend.counters["failed"] == 4
+        assert backend.breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,164 @@
+# tests/test_resilience.py
+import asyncio
+import time
+
+import pytest
+
+from resilience import AdaptiveLimiter, Backend, BackendUnavailable, CircuitBreaker
+
+
+def fail_calls(breaker: CircuitBreaker, count: int):
+    for _ in range(count):
+        assert breaker.allow()
+        breaker.record(True)
+
+
+def test_breaker_opens_when_the_window_fails_enough():
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_ratio=0.5, open_seconds=60)
+    fail_calls(breaker, 3)
+    assert breaker.state == CircuitBreaker.CLOSED # Fewer than min_calls
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN # 3 of 4 failed
+
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_ratio=0.5, open_seconds=60)
+    for failed in (True, False, False, False, True):
+        breaker.record(failed)
+    assert breaker.state == CircuitBreaker.CLOSED # 2 of 5 failed
+    fail_calls(breaker, 1)
+    assert breaker.state == CircuitBreaker.OPEN # 3 of 6
+    assert not breaker.allow()
+    assert 59 < breaker.retry_after() <= 60
+
+
+def test_breaker_half_open_lets_a_few_probes_in_and_closes_on_success():
+    breaker = CircuitBreaker(min_calls=2, open_seconds=0.05, half_open_probes=2)
+    fail_calls(breaker, 2)
+    assert not breaker.allow()
+    time.sleep(0.06)
+
+    assert breaker.allow() and breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow() # Both probes are in flight
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_opens_again():
+    breaker = CircuitBreaker(min_calls=2, open_seconds=0.05, half_open_probes=2)
+    fail_calls(breaker, 2)
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 2
+    assert not breaker.allow()
+
+
+def test_cancelled_probe_frees_its_slot():
+    breaker = CircuitBreaker(min_calls=2, open_seconds=0.05, half_open_probes=1)
+    fail_calls(breaker, 2)
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def release(limiter: AdaptiveLimiter, rtt: float, operation: str = "GetTask"):
+    assert limiter.try_acquire()
+    limiter.release(rtt, operation=operation)
+
+
+def test_limit_grows_while_latency_stays_near_the_best():
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=50)
+    for _ in range(200):
+        release(limiter, 0.010)
+    assert limiter.limit == 50
+
+
+def test_limit_converges_under_rising_latency():
+    limiter = AdaptiveLimiter(initial_limit=50, min_limit=2, max_limit=50)
+    release(limiter, 0.010)
+    limits = []
+    for i in range(100): # 10ms -> 100ms
+        release(limiter, 0.010 + 0.0009 * i)
+        limits.append(limiter.limit)
+    for _ in range(50):
+        release(limiter, 0.100)
+        limits.append(limiter.limit)
+
+    assert all(later <= earlier for earlier, later in zip(limits, limits[1:]))
+    # At 10x the best latency the gradient bottoms out at 0.5: limit = 0.5 * limit + sqrt(limit) -> 4
+    assert 4 <= limiter.limit < 4.1
+    assert limits[-10] - limits[-1] < 0.05
+
+
+def test_limit_compares_latency_per_operation():
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=50)
+    for _ in range(200):
+        release(limiter, 0.002, "GetTask")
+        release(limiter, 0.050, "ListTasks") # Slow, but as fast as ListTasks gets
+    assert limiter.limit == 50
+
+
+def test_failures_back_off_multiplicatively():
+    limiter = AdaptiveLimiter(initial_limit=20, min_limit=2, backoff_ratio=0.5)
+    for expected in (10, 5, 2.5, 2, 2):
+        assert limiter.try_acquire()
+        limiter.release(failed=True)
+        assert limiter.limit == expected
+
+
+def test_backend_fails_fast_while_open():
+    backend = Backend("test", lambda error, result: error is not None,
+                      breaker=CircuitBreaker(min_calls=2, open_seconds=30))
+    calls = 0
+
+    async def broken():
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("refused")
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await backend.call(broken, "GetTask")
+        with pytest.raises(BackendUnavailable) as raised:
+            await backend.call(broken, "GetTask")
+        return raised.value
+
+    unavailable = asyncio.run(run())
+    assert calls == 2
+    assert unavailable.status_code == 503
+    assert unavailable.headers["Retry-After"] == "30"
+    assert backend.counters["rejected_open"] == 1
+
+
+def test_backend_sheds_calls_above_the_limit_once_the_wait_runs_out():
+    backend = Backend("test", lambda error, result: False,
+                      limiter=AdaptiveLimiter(initial_limit=2, min_limit=2, max_queue=1), max_wait=0.05)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    async def run():
+        running = [asyncio.create_task(backend.call(slow)) for _ in range(2)]
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(backend.call(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(BackendUnavailable, match="overloaded"): # Queue (1) is full
+            await backend.call(slow)
+        with pytest.raises(BackendUnavailable, match="overloaded"): # Waited 50ms without a free slot
+            await queued
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(run()) == ["ok", "ok"]
+    assert backend.counters["shed"] == 2
@@ -0,0 +1,46 @@
+# tests/test_trace_exporter.py
+import json
+import time
+
+from tracing import SPAN_KIND_INTERNAL, OtlpJsonExporter, Span
+
+
+def finished_span(name: str) -> Span:
+    span = Span(name, SPAN_KIND_INTERNAL, "0af7651916cd43dd8448eb211c80319c")
+    span.end_ns = span.start_ns + 1000
+    return span
+
+
+def exported_names(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        documents = [json.loads(line) for line in f]
+    return [span["name"] for document in documents
+            for resource in document["resourceSpans"] for scope in resource["scopeSpans"] for span in scope["spans"]]
+
+
+def test_flush_writes_the_batch_the_thread_is_collecting(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = OtlpJsonExporter("test", path=str(path))
+    for i in range(5):
+        exporter.export(finished_span(f"span-{i}"))
+
+    # Once the thread has taken the spans off the queue, within its flush interval: at exit they
+    # are in its batch, not in the queue.
+    while exporter.snapshot()["queued"]:
+        time.sleep(0.01)
+    assert exporter.exported == 0
+    exporter.flush()
+
+    assert exported_names(path) == [f"span-{i}" for i in range(5)]
+    assert exporter.exported == 5
+
+
+def test_export_after_flush_starts_a_new_thread(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = OtlpJsonExporter("test", path=str(path))
+    exporter.export(finished_span("before"))
+    exporter.flush()
+    exporter.export(finished_span("after"))
+    exporter.flush()
+
+    assert exported_names(path) == ["before", "after"]
@@ -0,0 +1,50 @@
+# tests/test_user_client_soap.py
+# UserServiceClient over SOAP (no MessagePack-RPC) against the service run as a script, where Spyne
+# would otherwise put the User type in the '__main__' namespace.
+import asyncio
+
+import pytest
+
+import user_client
+from resilience import Backend
+from user_client import SOAP, UserServiceClient, UserServiceFault
+
+
+def soap_client(monkeypatch, url):
+    monkeypatch.setattr(user_client, "USER_RPC_ENABLED", False)
+    client = UserServiceClient(url, Backend("SOAP User Service", lambda error, result: False), lambda: 5.0)
+    assert client.protocol == SOAP
+    return client
+
+
+async def with_client(client, calls):
+    await client.connect()
+    try:
+        return await calls(client)
+    finally:
+        await client.close()
+
+
+def test_import_users_over_soap(monkeypatch, user_service_url):
+    client = soap_client(monkeypatch, user_service_url)
+
+    async def calls(client):
+        first = await client.import_users([{"user_id": 7001, "name": "Ana", "email": "ana@example.com"},
+                                           {"name": "Bia", "email": "bia@example.com"}])
+        second = await client.import_users([{"user_id": 7001, "name": "Ana Lima", "email": "ana@example.com"}])
+        return first, second, await client.get_users([7001])
+
+    first, second, users = asyncio.run(with_client(client, calls))
+    assert first == {"imported": 2, "created": 2, "updated": 0}
+    assert second == {"imported": 1, "created": 0, "updated": 1}
+    assert users[7001]["name"] == "Ana Lima"
+    assert client.calls[SOAP] == 3
+
+
+def test_import_users_fault_over_soap(monkeypatch, user_service_url):
+    client = soap_client(monkeypatch, user_service_url)
+
+    with pytest.raises(UserServiceFault) as raised:
+        asyncio.run(with_client(client, lambda client: client.import_users(
+            [{"user_id": 2**31, "name": "Out", "email": "out@example.com"}])))
+    assert raised.value.faultcode.endswith("InvalidId")
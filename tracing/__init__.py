@@ -0,0 +1,10 @@
+# tracing/__init__.py
+# Distributed tracing (W3C trace context, OTLP/JSON export) shared by the API Gateway and the
+# SOAP UserService; the Go TaskService has its own small equivalent (go_server/tracing.go).
+from tracing.core import (
+    SPAN_KIND_CLIENT, SPAN_KIND_INTERNAL, SPAN_KIND_SERVER, TRACEPARENT_HEADER, Sampler, Span,
+    SpanContext, Tracer, current_span, parse_traceparent, reset_current_span, set_current_span,
+    tracer_from_env,
+)
+from tracing.exporter import OtlpJsonExporter
+from tracing.spyne_events import instrument_spyne
@@ -0,0 +1,186 @@
+# tracing/core.py
+# Spans, W3C trace context ('traceparent') and sampling.
+#
+# traceparent: "00-<32 hex trace id>-<16 hex parent span id>-<2 hex flags>", flag 01 = sampled.
+# A trace is sampled once, where it enters the system: the gateway keeps TRACE_SAMPLE_RATIO of
+# new traces (or follows the sampled flag of a client's traceparent), and every hop behind it
+# follows the flag it receives. On top of that a token bucket admits at most
+# TRACE_MAX_PER_SECOND new traces per process, so the cost stays bounded under full load.
+import contextvars
+import os
+import random
+import threading
+import time
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+def parse_traceparent(value):
+    """SpanContext from a traceparent value, or None if it is missing or malformed."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[0] == "ff" or parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return SpanContext(parts[1].lower(), parts[2].lower(), bool(flags & 1))
+
+
+def new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns",
+                 "attributes", "error")
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_span_id: str = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {}
+        self.error = None # Status message when the operation failed
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id, True)
+
+    def traceparent(self) -> str:
+        """traceparent for calls made on behalf of this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.error = message or "error"
+
+
+class Sampler:
+    def __init__(self, ratio: float, max_per_second: float):
+        self.ratio = ratio
+        self.max_per_second = max_per_second
+        self._tokens = max_per_second
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.sampled = 0
+        self.rate_limited = 0
+
+    def sample(self, parent: SpanContext = None) -> bool:
+        """Whether a trace entering this process (with an optional remote parent) is recorded."""
+        if parent is not None:
+            if not parent.sampled:
+                return False
+        elif self.ratio <= 0 or (self.ratio < 1 and random.random() >= self.ratio):
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.max_per_second, self._tokens + (now - self._refilled_at) * self.max_per_second)
+            self._refilled_at = now
+            if self._tokens < 1:
+                self.rate_limited += 1
+                return False
+            self._tokens -= 1
+            self.sampled += 1
+            return True
+
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span():
+    """The span of the work being done in this context (request, task or thread), or None."""
+    return _current_span.get()
+
+
+def set_current_span(span):
+    return _current_span.set(span)
+
+
+def reset_current_span(token):
+    _current_span.reset(token)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter. Disabled (every method a cheap
+    no-op returning None) when no exporter is configured."""
+
+    def __init__(self, service_name: str, exporter=None, sampler: Sampler = None):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sampler = sampler or Sampler(1.0, 100.0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_server_span(self, name: str, parent: SpanContext = None):
+        """Span for a request entering this process, if the sampler keeps it."""
+        if self.exporter is None or not self.sampler.sample(parent):
+            return None
+        if parent is None:
+            return Span(name, SPAN_KIND_SERVER, new_trace_id())
+        return Span(name, SPAN_KIND_SERVER, parent.trace_id, parent.span_id)
+
+    def start_child_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, parent: Span = None):
+        """Span for work done on behalf of 'parent' (default: the current span); None outside a trace."""
+        parent = parent or current_span()
+        if parent is None or self.exporter is None:
+            return None
+        return Span(name, kind, parent.trace_id, parent.span_id)
+
+    def end_span(self, span: Span, end_ns: int = None):
+        if span is None:
+            return
+        span.end_ns = end_ns or time.time_ns()
+        self.exporter.export(span)
+
+    def snapshot(self) -> dict:
+        snapshot = {"enabled": self.enabled, "sample_ratio": self.sampler.ratio,
+                    "max_traces_per_second": self.sampler.max_per_second,
+                    "sampled": self.sampler.sampled, "rate_limited": self.sampler.rate_limited}
+        if self.exporter is not None:
+            snapshot.update(self.exporter.snapshot())
+        return snapshot
+
+
+def tracer_from_env(service_name: str) -> Tracer:
+    """Tracer configured from the environment shared by all services:
+    TRACE_EXPORT_FILE (OTLP/JSON lines), TRACE_OTLP_ENDPOINT (OTLP/HTTP JSON, e.g.
+    http://localhost:4318/v1/traces), TRACE_SAMPLE_RATIO (default 0.1) and
+    TRACE_MAX_PER_SECOND (default 100). Without a file or endpoint tracing is off."""
+    from tracing.exporter import OtlpJsonExporter
+
+    path = os.environ.get("TRACE_EXPORT_FILE")
+    endpoint = os.environ.get("TRACE_OTLP_ENDPOINT")
+    sampler = Sampler(float(os.environ.get("TRACE_SAMPLE_RATIO", "0.1")),
+                      float(os.environ.get("TRACE_MAX_PER_SECOND", "100")))
+    exporter = OtlpJsonExporter(service_name, path=path, endpoint=endpoint) if (path or endpoint) else None
+    return Tracer(service_name, exporter, sampler)
@@ -0,0 +1,167 @@
+# tracing/exporter.py
+# Batching OTLP/JSON exporter.
+# Finished spans go into a bounded queue (full queue: the span is dropped and counted, never
+# blocking a request) and a background thread writes them in batches as OTLP/JSON
+# ExportTraceServiceRequest documents:
+# - to a file, one document per line (the OpenTelemetry Collector 'file' exporter format,
+#   readable by its 'otlpjsonfile' receiver), and/or
+# - with a POST to an OTLP/HTTP endpoint (JSON encoding, e.g. http://localhost:4318/v1/traces).
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+
+from tracing.core import Span
+
+MAX_QUEUE_SIZE = 4096
+MAX_BATCH_SIZE = 512
+FLUSH_INTERVAL_SECONDS = 1.0
+HTTP_TIMEOUT_SECONDS = 5.0
+_STOP = object() # Queued by flush(): the thread writes its pending batch and exits
+
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)} # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(span: Span) -> dict:
+    document = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in span.attributes.items()],
+    }
+    if span.parent_span_id:
+        document["parentSpanId"] = span.parent_span_id
+    if span.error is not None:
+        document["status"] = {"code": 2, "message": span.error} # STATUS_CODE_ERROR
+    return document
+
+
+def export_request(service_name: str, spans) -> dict:
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": service_name}},
+            {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+        ]},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [otlp_span(span) for span in spans]}],
+    }]}
+
+
+class OtlpJsonExporter:
+    def __init__(self, service_name: str, path: str = None, endpoint: str = None):
+        self.service_name = service_name
+        self.path = path
+        self.endpoint = endpoint
+        self._queue = queue.Queue(maxsize=MAX_QUEUE_SIZE)
+        self._thread = None
+        self._pid = None # The thread does not survive a fork; workers start their own
+        self._start_lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        atexit.register(self.flush)
+
+    def export(self, span: Span):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def snapshot(self) -> dict:
+        return {"exported": self.exported, "dropped": self.dropped, "failed_batches": self.failed,
+                "queued": self._queue.qsize(), "file": self.path, "endpoint": self.endpoint}
+
+    def flush(self):
+        """Writes every span exported so far (at exit; the thread is a daemon). Stops the thread so
+        that it writes the batch it is collecting; a later export starts a new one."""
+        pending = self._queue
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            try:
+                pending.put(_STOP, timeout=HTTP_TIMEOUT_SECONDS)
+            except queue.Full:
+                pass
+            else:
+                thread.join(timeout=HTTP_TIMEOUT_SECONDS + FLUSH_INTERVAL_SECONDS)
+                if not thread.is_alive():
+                    self._pid = None
+        batch = self._drain(pending, MAX_QUEUE_SIZE)
+        if batch:
+            self._write(batch)
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=MAX_QUEUE_SIZE)
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _drain(pending: queue.Queue, limit: int) -> list:
+        batch = []
+        while len(batch) < limit:
+            try:
+                span = pending.get_nowait()
+            except queue.Empty:
+                break
+            if span is not _STOP:
+                batch.append(span)
+        return batch
+
+    def _run(self):
+        while True:
+            span = self._queue.get()
+            if span is _STOP:
+                return
+            batch = [span]
+            # Collect for up to FLUSH_INTERVAL_SECONDS after the first span, so a steady trickle
+            # of spans becomes one write per interval rather than one per span.
+            flush_at = time.monotonic() + FLUSH_INTERVAL_SECONDS
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = flush_at - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    span = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if span is _STOP:
+                    self._write(batch) # flush() is waiting for the batch collected so far
+                    return
+                batch.append(span)
+            self._write(batch)
+
+    def _write(self, batch: list):
+        body = json.dumps(export_request(self.service_name, batch), separators=(",", ":"))
+        try:
+            if self.path:
+                # One write per batch with O_APPEND, so several processes can share the file.
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(body + "\n")
+            if self.endpoint:
+                request = urllib.request.Request(self.endpoint, data=body.encode(), method="POST",
+                                                 headers={"Content-Type": "application/json"})
+                with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT_SECONDS):
+                    pass
+            self.exported += len(batch)
+        except OSError as e:
+            self.failed += 1
+            logging.warning(f"Tracing: could not export {len(batch)} spans: {e}")
@@ -0,0 +1,45 @@
+# tracing/spyne_events.py
+# Server spans for a Spyne WsgiApplication (the SOAP and MessagePack-RPC UserService).
+# The caller's trace context comes from a 'traceparent' SOAP header element (read from the raw
+# header, so the WSDL does not change) or, for MessagePack-RPC, which has no headers of its
+# own, from the 'traceparent' HTTP header.
+from tracing.core import TRACEPARENT_HEADER, Tracer, parse_traceparent
+
+TRACEPARENT_ENVIRON = "HTTP_TRACEPARENT"
+
+
+def _header_traceparent(ctx):
+    for element in ctx.in_header_doc or ():
+        tag = getattr(element, "tag", None)
+        if isinstance(tag, str) and tag.rsplit("}", 1)[-1] == TRACEPARENT_HEADER:
+            return element.text
+    return None
+
+
+def instrument_spyne(wsgi_application, tracer: Tracer, service_name: str, rpc_system: str):
+    """Records one span per call that continues a sampled trace, from the start of the request
+    to the end of the response. Calls without a trace context are not traced here: the service
+    sits behind the gateway, which makes the sampling decision."""
+    if not tracer.enabled:
+        return
+
+    def on_close(ctx):
+        method = ctx.method_request_string
+        if not method:
+            return # e.g. a WSDL request
+        parent = parse_traceparent(_header_traceparent(ctx) or ctx.transport.req_env.get(TRACEPARENT_ENVIRON))
+        if parent is None:
+            return
+        method = method.rsplit("}", 1)[-1]
+        span = tracer.start_server_span(f"{service_name}/{method}", parent)
+        if span is None:
+            return
+        span.start_ns = int(ctx.call_start * 1e9)
+        span.set_attribute("rpc.system", rpc_system)
+        span.set_attribute("rpc.service", service_name)
+        span.set_attribute("rpc.method", method)
+        if ctx.out_error is not None:
+            span.set_error(str(ctx.out_error))
+        tracer.end_span(span)
+
+    wsgi_application.event_manager.add_listener("wsgi_close", on_close)
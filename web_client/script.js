@@ -95,7 +95,7 @@ function renderTasksList(tasks) {
                     <p class="task-description">${task.description}</p>
                 </div>
                 <div class="task-footer">
-                    <span class="task-created-by">Criado por: ${task.created_by}</span>
+                    <span class="task-created-by">Criado por: ${creatorLabel(task)}</span>
                     <div class="task-actions">
                         <button onclick="fillTaskFormForUpdate(${task.id}, '${task.title.replace(/'/g, "\\'")}', '${task.description.replace(/'/g, "\\'")}', '${task.status}')">Editar</button>
                         <button onclick="fillTaskFormForDelete(${task.id})">Excluir</button>
@@ -108,6 +108,12 @@ function renderTasksList(tasks) {
     tasksListContainer.innerHTML = taskListHtml;
 }
 
+// Creator name when the task came with ?expand=created_by, otherwise the raw created_by value
+function creatorLabel(task) {
+    const creator = task._embedded && task._embedded.created_by;
+    return creator ? `${creator.name} (#${creator.user_id})` : task.created_by;
+}
+
 // NEW: Function to render a single task visually
 function renderSingleTask(task) {
     tasksListContainer.innerHTML = '';
@@ -218,7 +224,8 @@ async function createTask() {
 async function listTasks() {
     log("Listing tasks...", 'info');
     try {
-        const response = await fetch(`${API_GATEWAY_URL}/tasks`);
+        // expand=created_by: the gateway embeds each creator, so no GET /users/{id} per task
+        const response = await fetch(`${API_GATEWAY_URL}/tasks?expand=created_by`);
         await handleResponse(response, tasksOutput);
     } catch (error) {
         log(`Network error listing tasks: ${error.message}`, 'error');